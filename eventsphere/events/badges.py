@@ -0,0 +1,180 @@
+# events/badges.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Sum
+
+from .models import Ticket
+from .qr_codes import qr_payload
+from .qr_render import render_png_batch
+
+logger = logging.getLogger(__name__)
+
+# Codes handed to a worker at a time, and batches queued per worker; the
+# queue bounds how far rendering can run ahead of a slow download
+BATCH_SIZE = 16
+BATCHES_PER_WORKER = 2
+
+stats = {"exports": 0, "codes": 0, "seconds": 0.0}
+
+
+def badge_holders(event):
+    """(filename, QR payload) for every ticket holder of `event`, by username."""
+    holders = (
+        Ticket.objects.filter(event=event)
+        .values("user__username")
+        .annotate(total_quantity=Sum("quantity"))
+        .order_by("user__username")
+    )
+    return [
+        (
+            f"{holder['user__username']}.png",
+            qr_payload(holder["user__username"], event.name, holder["total_quantity"]),
+        )
+        for holder in holders
+    ]
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        end = start + size
+        yield items[start:end]
+
+
+def badge_workers():
+    return getattr(settings, "BADGE_WORKERS", None) or os.cpu_count() or 1
+
+
+def _start_method():
+    # Forking a threaded server process can copy a lock mid-use into the
+    # child, so workers start from a clean interpreter instead
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_render_pool(workers):
+    """
+    A pool of `workers` processes, started on first use and shared by every
+    export after that. Workers only import qr_render, never Django.
+    """
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(_start_method()),
+            )
+        return _pools[workers]
+
+
+def _discard_pool(workers, pool):
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def render_badges(holders, workers=None):
+    """
+    Yield (filename, PNG bytes) for `holders` in order without blocking the
+    event loop. With more than one worker the codes are rendered on the
+    shared process pool, at most a few batches ahead of the consumer;
+    otherwise each batch is rendered on a thread.
+    """
+    if workers is None:
+        workers = badge_workers()
+    if workers <= 1:
+        render = sync_to_async(render_png_batch, thread_sensitive=False)
+        for batch in _batches(holders, BATCH_SIZE):
+            pngs = await render([payload for _, payload in batch])
+            for (filename, _), png in zip(batch, pngs):
+                yield filename, png
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = get_render_pool(workers)
+    pending = deque()
+    try:
+        for batch in _batches(holders, BATCH_SIZE):
+            filenames = [filename for filename, _ in batch]
+            payloads = [payload for _, payload in batch]
+            future = loop.run_in_executor(pool, render_png_batch, payloads)
+            pending.append((filenames, future))
+            if len(pending) < workers * BATCHES_PER_WORKER:
+                continue
+            filenames, future = pending.popleft()
+            for filename, png in zip(filenames, await future):
+                yield filename, png
+        while pending:
+            filenames, future = pending.popleft()
+            for filename, png in zip(filenames, await future):
+                yield filename, png
+    except BrokenProcessPool:
+        # A worker died; the next export starts a fresh pool
+        _discard_pool(workers, pool)
+        raise
+    finally:
+        # Batches queued for a download that was abandoned
+        for _, future in pending:
+            future.cancel()
+
+
+class _ZipStream:
+    """Write-only file the ZIP writer appends to; written bytes are drained as chunks."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+async def stream_badge_zip(event, workers=None):
+    """
+    A ZIP of every ticket holder's QR code for `event`, yielded a file at a
+    time so the archive is never held in memory. Logs throughput once done.
+    """
+    holders = await sync_to_async(badge_holders)(event)
+    started = time.perf_counter()
+    stream = _ZipStream()
+    # PNGs are already compressed, so entries are stored as-is
+    with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for filename, png in render_badges(holders, workers):
+            archive.writestr(filename, png)
+            yield stream.drain()
+    yield stream.drain()
+
+    elapsed = time.perf_counter() - started
+    stats["exports"] += 1
+    stats["codes"] += len(holders)
+    stats["seconds"] += elapsed
+    logger.info(
+        "Exported %d badge codes for event %s in %.2fs (%.1f codes/sec)",
+        len(holders),
+        event.id,
+        elapsed,
+        len(holders) / elapsed if elapsed else 0.0,
+    )
@@ -1,16 +1,29 @@
 # events/consumers.py
 
+import asyncio
 import json
-from better_profanity import profanity
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
-from .models import ChatRoom, ChatMessage, RoomMember, Notification
+from . import moderation
+from .delivery import notification_queue
+from .throttling import check_chat_rate, chat_role
+from .models import (
+    ChatRoom,
+    ChatMessage,
+    RoomMember,
+    Notification,
+    NotificationCounter,
+)
+from .write_behind import chat_message_buffer
 
-profanity.load_censor_words()
+# Max number of channel layer sends in flight per notification fan-out
+NOTIFY_SEND_CONCURRENCY = 100
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -18,13 +31,17 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.room_id = self.scope["url_route"]["kwargs"]["room_id"]
         self.room_group_name = f"chat_{self.room_id}"
 
-        chat_room = await self.get_chat_room(self.room_id)
-        if not chat_room:
+        # Room, event name and membership are loaded once and kept for the life
+        # of the socket; kicks are picked up through the user_kicked group event
+        self.chat_room = await self.get_chat_room(self.room_id)
+        if not self.chat_room:
             await self.close()
             return
+        self.event_name = self.chat_room.event.name
 
         user_id = self.scope["user"].id
-        self.user_member = await self.get_room_member(chat_room, user_id)
+        self.role = chat_role(self.scope["user"], self.chat_room)
+        self.user_member = await self.get_room_member(self.chat_room, user_id)
         if not self.user_member or self.user_member.is_kicked:
             await self.close()
             return
@@ -33,21 +50,46 @@ class ChatConsumer(AsyncWebsocketConsumer):
         await self.accept()
 
     async def disconnect(self, close_code):
+        if getattr(settings, "CHAT_WRITE_BEHIND", False):
+            await chat_message_buffer.flush(self.room_id)
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data):
         data = json.loads(text_data)
         # message = data.get("message")
         message = data.get("message")
-        censored_message = profanity.censor(message)
 
         user = self.scope["user"]
-        if message:
-            await self.save_message(censored_message, user)
-            chat_room = await self.get_chat_room(self.room_id)
-            await notify_group_members(
-                chat_room, user, censored_message, "chat_message"
+        if self.user_member.is_kicked:
+            return
+        if message is not None and not isinstance(message, str):
+            await self.send(
+                text_data=json.dumps(
+                    {"type": "invalid_message", "error": "Messages must be text."}
+                )
             )
+            return
+        if message:
+            # Each message fans out to the whole room, so floods are turned
+            # away before any of that work starts
+            retry_after = await check_chat_rate(self.room_id, user.id, self.role)
+            if retry_after:
+                await self.send(
+                    text_data=json.dumps(
+                        {
+                            "type": "rate_limited",
+                            "error": "You're sending messages too quickly. "
+                            "Please wait a moment.",
+                            "retry_after": round(retry_after, 1),
+                        }
+                    )
+                )
+                return
+            censored_message = moderation.censor(message)
+            if getattr(settings, "CHAT_WRITE_BEHIND", False):
+                await chat_message_buffer.add(self.room_id, user, censored_message)
+            else:
+                await self.save_message(censored_message, user)
             await self.channel_layer.group_send(
                 self.room_group_name,
                 {
@@ -57,6 +99,16 @@ class ChatConsumer(AsyncWebsocketConsumer):
                     "timestamp": timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
                 },
             )
+            # Persisting and fanning out notifications happens in the background
+            # so the live broadcast doesn't wait on the size of the room
+            await notification_queue.enqueue(
+                notify_group_members,
+                self.chat_room,
+                user,
+                censored_message,
+                "chat_message",
+                self.event_name,
+            )
 
     async def chat_message(self, event):
         await self.send(
@@ -72,13 +124,19 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def user_kicked(self, event):
         """Handle user kick event"""
         if event["user_id"] == self.scope["user"].id:
+            # Drop the cached membership so no further frames are accepted
+            self.user_member.is_kicked = True
             # Notify the user that they are kicked and redirect them
             await self.send(text_data=json.dumps({"type": "user_kicked"}))
             await self.close()
 
     @database_sync_to_async
     def get_chat_room(self, room_id):  # pragma: no cover
-        return ChatRoom.objects.filter(id=room_id).first()
+        return (
+            ChatRoom.objects.select_related("event", "creator")
+            .filter(id=room_id)
+            .first()
+        )
 
     @database_sync_to_async
     def get_room_member(self, chat_room, user_id):  # pragma: no cover
@@ -86,8 +144,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def save_message(self, content, user):  # pragma: no cover
-        chat_room = ChatRoom.objects.get(id=self.room_id)
-        ChatMessage.objects.create(room=chat_room, user=user, content=content)
+        ChatMessage.objects.create(room_id=self.room_id, user=user, content=content)
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -116,46 +173,70 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         await self.send(text_data=json.dumps(event["data"]))
 
 
-async def notify_group_members(room, sender, message, msg_type):
+async def notify_group_members(room, sender, message, msg_type, event_name=None):
     channel_layer = get_channel_layer()
     members = await get_all_members_except_sender(room, sender)
-    event_name = await get_event_name(room)
+    if not members:
+        return
+
+    if event_name is None:
+        event_name = await get_event_name(room)
     url_path = f"{room.id}"
+    title_val = "New Message" if msg_type == "chat_message" else "New Announcement"
 
-    for member in members:
-        title_val = "New Message" if msg_type == "chat_message" else "New Announcement"
-        notif_id = await save_notification(
-            room, member, message, title_val, event_name, url_path
-        )
-        await channel_layer.group_send(
-            f"notifications_{member.user.id}",
+    # One bulk INSERT for the whole room instead of one round trip per member
+    notif_ids = await save_notifications(
+        members, message, title_val, event_name, url_path
+    )
+    timestamp = timezone.now().isoformat()
+
+    notifications = [
+        (
+            f"notifications_{member.user_id}",
             {
                 "type": "send_notification",
                 "data": {
                     "title": title_val,
                     "sub_title": event_name,
                     "message": message,
-                    "timestamp": timezone.now().isoformat(),
+                    "timestamp": timestamp,
                     "url_link": url_path,
                     "id": notif_id,
                     "msg_type": msg_type,
                 },
             },
         )
+        for member, notif_id in zip(members, notif_ids)
+    ]
+    # Send concurrently, but in chunks so a huge room doesn't open thousands
+    # of channel layer operations at once
+    for start in range(0, len(notifications), NOTIFY_SEND_CONCURRENCY):
+        end = start + NOTIFY_SEND_CONCURRENCY
+        chunk = notifications[start:end]
+        await asyncio.gather(
+            *(channel_layer.group_send(group, payload) for group, payload in chunk)
+        )
 
 
 @database_sync_to_async
-def save_notification(
-    room, member, message, title, sub_title, url_path
+def save_notifications(
+    members, message, title, sub_title, url_path
 ):  # pragma: no cover
-    notif = Notification.objects.create(
-        user=member.user,
-        message=message,
-        title=title,
-        sub_title=sub_title,
-        url_link=url_path,
-    )
-    return notif.id
+    with transaction.atomic():
+        notifs = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=member.user_id,
+                    message=message,
+                    title=title,
+                    sub_title=sub_title,
+                    url_link=url_path,
+                )
+                for member in members
+            ]
+        )
+        NotificationCounter.increment(member.user_id for member in members)
+    return [notif.id for notif in notifs]
 
 
 @database_sync_to_async
@@ -0,0 +1,128 @@
+# events/delivery.py
+
+import asyncio
+import contextlib
+import logging
+import sys
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryQueue:
+    """
+    Bounded in-process queue of coroutine jobs drained by a single background
+    task, so slow work (e.g. notification fan-out) stays off the request path.
+    When the buffer is full, enqueue() waits for room instead of dropping jobs.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.stats = {
+            "enqueued": 0,
+            "delivered": 0,
+            "failed": 0,
+            "blocked": 0,  # enqueue() calls that had to wait for a free slot
+            "max_depth": 0,
+        }
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    @property
+    def depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The queue and its worker are bound to the event loop that
+            # created them (tests spin up a fresh loop per test case)
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._worker = None
+            self._loop = loop
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+    async def enqueue(self, func, *args):
+        self._ensure_worker()
+        if self._queue.full():
+            self.stats["blocked"] += 1
+        await self._queue.put((func, args))
+        self.stats["enqueued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+
+    async def _run(self):
+        while True:
+            func, args = await self._queue.get()
+            try:
+                await func(*args)
+                self.stats["delivered"] += 1
+            except Exception:
+                self.stats["failed"] += 1
+                logger.exception("Background delivery of %s failed", func.__name__)
+            finally:
+                self._queue.task_done()
+
+    async def drain(self):
+        """Wait until every job queued on the current loop has been processed."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def shutdown(self):
+        await self.drain()
+        if self._worker is not None and self._loop is asyncio.get_running_loop():
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+
+
+notification_queue = DeliveryQueue(
+    maxsize=getattr(settings, "NOTIFICATION_QUEUE_SIZE", 1000)
+)
+
+# Coroutine functions awaited when the ASGI server shuts down
+shutdown_hooks = [notification_queue.shutdown]
+
+
+async def run_shutdown_hooks():
+    for hook in shutdown_hooks:
+        try:
+            await hook()
+        except Exception:
+            logger.exception("Shutdown hook %s failed", hook.__qualname__)
+
+
+async def lifespan(scope, receive, send):
+    """ASGI lifespan handler that drains background work on shutdown."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await run_shutdown_hooks()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def install_reactor_shutdown_trigger():
+    """
+    Run the shutdown hooks when daphne stops. Daphne doesn't implement the
+    ASGI lifespan protocol, so they hang off its Twisted reactor instead,
+    which waits for them before shutting down while its event loop still
+    runs. Does nothing under servers that don't run a reactor.
+    """
+    # Daphne installs its asyncio reactor on import; importing the reactor
+    # module ourselves would install the default one instead
+    reactor = sys.modules.get("twisted.internet.reactor")
+    if reactor is None:
+        return False
+    from twisted.internet.defer import Deferred
+
+    def drain():
+        return Deferred.fromFuture(asyncio.ensure_future(run_shutdown_hooks()))
+
+    reactor.addSystemEventTrigger("before", "shutdown", drain)
+    return True
@@ -0,0 +1,91 @@
+# events/detail_cache.py
+
+import time
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Exists, OuterRef, Value
+from django.template.loader import render_to_string
+
+from .models import Event, Favorite
+
+DETAIL_CACHE_TIMEOUT = 60 * 60
+
+stats = {"hits": 0, "misses": 0}
+
+
+def version_key(event_id):
+    return f"event_detail:version:{event_id}"
+
+
+def detail_cache_key(event_id, version):
+    return f"event_detail:{event_id}:{version}"
+
+
+def _new_version():
+    # Seeded from the clock so a version key that was evicted can never come
+    # back at a number an older cached body is still stored under
+    return time.time_ns()
+
+
+def current_version(event_id):
+    key = version_key(event_id)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate_event_detail(event_id):
+    """Move the event to a new version; bodies cached under the old one are never read again."""
+    try:
+        cache.incr(version_key(event_id))
+    except ValueError:
+        cache.set(version_key(event_id), _new_version(), None)
+
+
+def get_event_detail(event_id):
+    """
+    The event and its rendered body from the cache, rendering and storing
+    them on a miss. Returns None if the event does not exist.
+    """
+    key = detail_cache_key(event_id, current_version(event_id))
+    detail = cache.get(key)
+    if detail is not None:
+        stats["hits"] += 1
+        return detail
+
+    stats["misses"] += 1
+    event = Event.objects.filter(id=event_id).first()
+    if event is None:
+        return None
+    detail = {
+        "event": event,
+        "body": render_to_string("events/event_detail_body.html", {"event": event}),
+    }
+    cache.set(key, detail, DETAIL_CACHE_TIMEOUT)
+    return detail
+
+
+def live_event_state(event_id, user):
+    """
+    The parts of the page that change without an Event save: ticket counts
+    (bumped with queryset updates) and whether `user` favorited the event.
+    One query; None if the event does not exist.
+    """
+    if user.is_authenticated:
+        is_favorited = Exists(Favorite.objects.filter(user=user, event=OuterRef("pk")))
+    else:
+        is_favorited = Value(False, output_field=BooleanField())
+    return (
+        Event.objects.filter(id=event_id)
+        .annotate(is_favorited=is_favorited)
+        .values("numTickets", "ticketsSold", "is_favorited")
+        .first()
+    )
+
+
+def hit_rate():
+    total = stats["hits"] + stats["misses"]
+    return stats["hits"] / total if total else 0.0
@@ -6,7 +6,14 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, MaxLengthValidator
 
-from .models import AdminProfile, UserProfile, CreatorProfile, Event, Ticket
+from .mail import queue_templated_mail
+from .models import (
+    UserProfile,
+    CreatorProfile,
+    Event,
+    RegisteredEmail,
+    Ticket,
+)
 
 phone_number_validator = RegexValidator(
     r"^\d{10,12}$", "Enter a valid phone number (10-12 digits)."
@@ -215,34 +222,14 @@ class CustomPasswordResetForm(PasswordResetForm):
 
     def clean_email(self):
         email = self.cleaned_data["email"]
-        users = set()
-
-        # Search in AdminProfile
-        admin_users = AdminProfile.objects.filter(email__iexact=email).values_list(
-            "admin", flat=True
-        )
-        users.update(User.objects.filter(id__in=admin_users))
-
-        # Search in UserProfile
-        user_users = UserProfile.objects.filter(email__iexact=email).values_list(
-            "user", flat=True
-        )
-        users.update(User.objects.filter(id__in=user_users))
-
-        # Search in CreatorProfile (organization_email)
-        creator_users = CreatorProfile.objects.filter(
-            organization_email__iexact=email
-        ).values_list("creator", flat=True)
-        users.update(User.objects.filter(id__in=creator_users))
-
-        if not users:
+        # Profile address of every user registered under this email
+        self.reset_addresses = RegisteredEmail.reset_addresses(email)
+        if not self.reset_addresses:
             raise ValidationError("No user is associated with this email address.")
-
-        self.users_cache = users  # Cache the users for use in the view
         return email
 
     def get_users(self, email):
-        return self.users_cache
+        return list(self.reset_addresses)
 
     def send_mail(
         self,
@@ -253,31 +240,15 @@ class CustomPasswordResetForm(PasswordResetForm):
         to_email,
         html_email_template_name=None,
     ):
-        for user in self.get_users(self.cleaned_data["email"]):
-            try:
-                admin_profile = user.adminprofile
-                profile_email = admin_profile.email
-            except AdminProfile.DoesNotExist:
-                try:
-                    user_profile = user.userprofile
-                    profile_email = user_profile.email
-                except UserProfile.DoesNotExist:
-                    try:
-                        creator_profile = user.creatorprofile
-                        profile_email = creator_profile.organization_email
-                    except CreatorProfile.DoesNotExist:
-                        print("No profile found for user:", user.username)
-                        continue
-
-            if profile_email:
-                try:
-                    super().send_mail(
-                        subject_template_name,
-                        email_template_name,
-                        context,
-                        from_email,
-                        profile_email,
-                        html_email_template_name,
-                    )
-                except Exception as e:
-                    print(f"Failed to send email to {profile_email}: {e}")
+        # Each user's reset link goes to their own profile address; the
+        # outbox worker delivers it outside the request
+        profile_email = self.reset_addresses.get(context["user"])
+        if profile_email:
+            queue_templated_mail(
+                subject_template_name,
+                email_template_name,
+                context,
+                profile_email,
+                html_email_template_name,
+                from_email,
+            )
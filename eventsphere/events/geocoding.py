@@ -0,0 +1,222 @@
+# events/geocoding.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import GeocodeCache
+
+logger = logging.getLogger(__name__)
+
+# Recency is only written back this often, so cache hits stay read-only
+TOUCH_INTERVAL = timedelta(hours=1)
+
+stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0, "throttled": 0}
+
+
+class GeocodingError(Exception):
+    """The provider could not be reached or sent back an unusable response."""
+
+
+class GeocodingThrottled(GeocodingError):
+    """The provider's rate limit is used up; try again after `retry_after` seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Geocoder is rate limited for {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class Throttle:
+    """
+    Spaces calls at least `interval` seconds apart across threads. Callers
+    that find no free slot are turned away rather than put to sleep, so a
+    burst of lookups never parks request threads on the limit.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self):
+        """Take the next slot; returns 0 on success, else seconds until one is free."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_at:
+                return self._next_at - now
+            self._next_at = now + self.interval
+            return 0.0
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim, limited to one request a second per its usage policy."""
+
+    url = "https://nominatim.openstreetmap.org/search"
+
+    def __init__(self, interval=1.0, timeout=5):
+        self.user_agent = getattr(settings, "GEOCODER_USER_AGENT", "EventSphere")
+        self.throttle = Throttle(interval)
+        self.timeout = timeout
+
+    def search(self, query, country_codes=None, limit=5):
+        params = {"q": query, "format": "jsonv2", "limit": limit}
+        if country_codes:
+            params["countrycodes"] = country_codes
+        request = Request(
+            f"{self.url}?{urlencode(params)}", headers={"User-Agent": self.user_agent}
+        )
+
+        retry_after = self.throttle.acquire()
+        if retry_after:
+            raise GeocodingThrottled(retry_after)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                data = json.load(response)
+            return [
+                {
+                    "display_name": item["display_name"],
+                    "lat": float(item["lat"]),
+                    "lon": float(item["lon"]),
+                }
+                for item in data
+            ]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise GeocodingError(f"Nominatim lookup failed: {e}") from e
+
+
+class StaticGeocoder:
+    """Answers from a fixed table of places; a local stand-in for tests and offline work."""
+
+    default_places = {
+        "Washington Square Park, New York, NY": (40.7308, -73.9973),
+        "Madison Square Garden, New York, NY": (40.7505, -73.9934),
+        "Barclays Center, Brooklyn, NY": (40.6826, -73.9754),
+        "Central Park, New York, NY": (40.7829, -73.9654),
+    }
+
+    def __init__(self):
+        self.places = getattr(settings, "GEOCODER_STATIC_PLACES", self.default_places)
+        self.calls = 0
+
+    def search(self, query, country_codes=None, limit=5):
+        self.calls += 1
+        needle = " ".join(query.lower().split())
+        return [
+            {"display_name": name, "lat": lat, "lon": lon}
+            for name, (lat, lon) in self.places.items()
+            if needle in name.lower()
+        ][:limit]
+
+
+_geocoders = {}
+
+
+def get_geocoder():
+    path = getattr(settings, "GEOCODER", "events.geocoding.NominatimGeocoder")
+    if path not in _geocoders:
+        _geocoders[path] = import_string(path)()
+    return _geocoders[path]
+
+
+def cache_key(query, country_codes=None):
+    normalized = " ".join(query.lower().split())
+    if not normalized:
+        return None
+    # Hashed so long queries fit the column without colliding on a prefix
+    key = f"{country_codes or ''}|{normalized}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _cached_results(key):
+    entry = (
+        GeocodeCache.objects.filter(query=key)
+        .values_list("id", "results", "last_used_at")
+        .first()
+    )
+    if entry is None:
+        return None
+    entry_id, results, last_used_at = entry
+    now = timezone.now()
+    if now - last_used_at > TOUCH_INTERVAL:
+        GeocodeCache.objects.filter(id=entry_id).update(last_used_at=now)
+    return results
+
+
+def _store(key, results):
+    GeocodeCache.objects.update_or_create(
+        query=key, defaults={"results": results, "last_used_at": timezone.now()}
+    )
+    evict_least_recently_used(getattr(settings, "GEOCODE_CACHE_MAX_ENTRIES", 10000))
+
+
+def evict_least_recently_used(max_entries):
+    excess = GeocodeCache.objects.count() - max_entries
+    if excess > 0:
+        oldest = GeocodeCache.objects.order_by("last_used_at").values_list(
+            "id", flat=True
+        )[:excess]
+        GeocodeCache.objects.filter(id__in=list(oldest)).delete()
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def geocode(query, country_codes=None):
+    """
+    Suggestions for `query` as dicts with display_name, lat and lon. Results
+    are cached in the database; concurrent lookups of the same query in this
+    process share a single provider call. Raises GeocodingError.
+    """
+    key = cache_key(query, country_codes)
+    if key is None:
+        return []
+    results = _cached_results(key)
+    if results is not None:
+        stats["hits"] += 1
+        return results
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        stats["coalesced"] += 1
+        return future.result()
+
+    stats["misses"] += 1
+    try:
+        results = get_geocoder().search(query, country_codes)
+        _store(key, results)
+        future.set_result(results)
+        return results
+    except Exception as e:
+        stats["throttled" if isinstance(e, GeocodingThrottled) else "errors"] += 1
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+def geocode_address(address):
+    """(latitude, longitude) of the best match for `address`, or None."""
+    try:
+        results = geocode(address)
+    except GeocodingError:
+        logger.warning("Could not geocode %r", address, exc_info=True)
+        return None
+    if not results:
+        return None
+    return results[0]["lat"], results[0]["lon"]
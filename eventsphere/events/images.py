@@ -0,0 +1,406 @@
+# events/images.py
+
+import base64
+import hashlib
+import logging
+import math
+import posixpath
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import boto3
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core import signing
+from django.db import connections, transaction
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+from .detail_cache import invalidate_event_detail
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+# Event field -> (longest side in pixels, format) for each generated variant
+VARIANTS = {
+    "thumbnail_url": (400, "JPEG"),
+    "thumbnail_webp_url": (400, "WEBP"),
+    "image_webp_url": (1200, "WEBP"),
+}
+CONTENT_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp"}
+QUALITY = 80
+
+BLURHASH_COMPONENTS = (4, 3)
+# Placeholders are computed from a tiny copy of the image; detail is lost anyway
+BLURHASH_SAMPLE_SIZE = 32
+
+# Uploads are stored under the SHA-256 of their content, so identical images
+# share one object and different images can never overwrite each other
+UPLOAD_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+UPLOAD_KEY_PATTERN = re.compile(
+    r"^events/(?P<digest>[0-9a-f]{64})\.(jpg|png|webp|gif)$"
+)
+UPLOAD_EXPIRES = 10 * 60
+UPLOAD_TOKEN_SALT = "events.images.upload"
+
+stats = {"processed": 0, "failed": 0, "rejected": 0}
+
+
+class ImageIntegrityError(Exception):
+    """A stored upload does not match the digest in its key."""
+
+
+def max_upload_size():
+    return getattr(settings, "IMAGE_UPLOAD_MAX_SIZE", 10 * 1024 * 1024)
+
+
+def upload_key(digest, content_type):
+    return f"events/{digest}.{UPLOAD_EXTENSIONS[content_type]}"
+
+
+def key_digest(key):
+    """The SHA-256 a content-addressed key names, or None if `key` is not one."""
+    match = UPLOAD_KEY_PATTERN.match(key or "")
+    return match["digest"] if match else None
+
+
+class S3ImageStore:
+    def __init__(self, bucket=None):
+        self.bucket = bucket or getattr(settings, "IMAGE_BUCKET", "eventsphere-images")
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client("s3")
+        return self._client
+
+    def save(self, key, data, content_type):
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            # Keys are content-addressed, so an object never changes
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    def read(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presigned_post(self, key, content_type):
+        """
+        URL and form fields a browser posts the file to, straight to the
+        bucket. The policy pins the SHA-256 named by `key`, so S3 rejects any
+        post, including a repeat of this one, whose bytes don't match it.
+        """
+        checksum = base64.b64encode(bytes.fromhex(key_digest(key))).decode()
+        return self.client.generate_presigned_post(
+            self.bucket,
+            key,
+            Fields={
+                "Content-Type": content_type,
+                "Cache-Control": "public, max-age=31536000, immutable",
+                "x-amz-checksum-algorithm": "SHA256",
+                "x-amz-checksum-sha256": checksum,
+            },
+            Conditions=[
+                {"Content-Type": content_type},
+                {"Cache-Control": "public, max-age=31536000, immutable"},
+                {"x-amz-checksum-algorithm": "SHA256"},
+                {"x-amz-checksum-sha256": checksum},
+                ["content-length-range", 1, max_upload_size()],
+            ],
+            ExpiresIn=UPLOAD_EXPIRES,
+        )
+
+    def url(self, key):
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+
+class LocalImageStore:
+    """Keeps images on the local filesystem; for development and tests."""
+
+    def __init__(self, root=None, base_url=None):
+        self.root = Path(
+            root or getattr(settings, "IMAGE_STORE_ROOT", settings.BASE_DIR / "media")
+        )
+        self.base_url = base_url or getattr(settings, "IMAGE_STORE_URL", "/media/")
+
+    def save(self, key, data, content_type):
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def read(self, key):
+        return (self.root / key).read_bytes()
+
+    def exists(self, key):
+        return (self.root / key).is_file()
+
+    def delete(self, key):
+        (self.root / key).unlink(missing_ok=True)
+
+    def presigned_post(self, key, content_type):
+        # Stands in for S3: the local_image_upload view accepts the same form
+        token = signing.dumps(
+            {"key": key, "content_type": content_type}, salt=UPLOAD_TOKEN_SALT
+        )
+        return {
+            "url": reverse("local_image_upload"),
+            "fields": {"key": key, "Content-Type": content_type, "token": token},
+        }
+
+    def url(self, key):
+        return f"{self.base_url}{key}"
+
+
+_stores = {}
+
+
+def get_image_store():
+    path = getattr(settings, "IMAGE_STORE", "events.images.S3ImageStore")
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+def variant_key(image_key, size, fmt):
+    stem = posixpath.splitext(posixpath.basename(image_key))[0]
+    directory = posixpath.dirname(image_key)
+    return posixpath.join(directory, "variants", f"{stem}-{size}.{EXTENSIONS[fmt]}")
+
+
+def _open(data, size):
+    image = Image.open(BytesIO(data))
+    # Let JPEG decode straight to a reduced size instead of the full original
+    image.draft("RGB", (size, size))
+    image = ImageOps.exif_transpose(image)
+    return image.convert("RGB")
+
+
+def render_variants(data):
+    """{field: (bytes, format)} for each variant, plus the image's blurhash."""
+    image = _open(data, max(size for size, _ in VARIANTS.values()))
+    variants = {}
+    for field, (size, fmt) in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        buffered = BytesIO()
+        resized.save(buffered, format=fmt, quality=QUALITY, optimize=fmt == "JPEG")
+        variants[field] = (buffered.getvalue(), fmt)
+
+    sample = image.copy()
+    sample.thumbnail((BLURHASH_SAMPLE_SIZE, BLURHASH_SAMPLE_SIZE))
+    return variants, encode_blurhash(sample, *BLURHASH_COMPONENTS)
+
+
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _base83(value, length):
+    return "".join(
+        BASE83[value // 83 ** (length - i) % 83] for i in range(1, length + 1)
+    )
+
+
+def _srgb_to_linear(value):
+    value /= 255
+    return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value):
+    value = min(max(value, 0.0), 1.0)
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def encode_blurhash(image, x_components, y_components):
+    """The blurhash (https://blurha.sh) string for an RGB PIL image."""
+    width, height = image.size
+    linear = [_srgb_to_linear(channel) for channel in image.tobytes()]
+    pixels = list(zip(linear[0::3], linear[1::3], linear[2::3]))
+    cos_x = [
+        [math.cos(math.pi * i * x / width) for x in range(width)]
+        for i in range(x_components)
+    ]
+    cos_y = [
+        [math.cos(math.pi * j * y / height) for y in range(height)]
+        for j in range(y_components)
+    ]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                for x in range(width):
+                    basis = cos_x[i][x] * cos_y[j][y]
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = normalisation / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    blurhash = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        actual_max = max(abs(value) for factor in ac for value in factor)
+        quantised_max = max(0, min(82, int(actual_max * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+    else:
+        quantised_max, max_value = 0, 1
+    blurhash += _base83(quantised_max, 1)
+    blurhash += _base83(
+        (_linear_to_srgb(dc[0]) << 16)
+        + (_linear_to_srgb(dc[1]) << 8)
+        + _linear_to_srgb(dc[2]),
+        4,
+    )
+    for factor in ac:
+        r, g, b = (
+            max(0, min(18, int(_sign_pow(value / max_value, 0.5) * 9 + 9.5)))
+            for value in factor
+        )
+        blurhash += _base83(r * 19 * 19 + g * 19 + b, 2)
+    return blurhash
+
+
+def clear_image_variants(event):
+    """Forget the variants of a replaced image until the new ones are ready."""
+    for field in VARIANTS:
+        setattr(event, field, None)
+    event.image_blurhash = ""
+
+
+def save_uploaded_image(image, store=None):
+    """
+    Store an image posted through the form under its content-addressed key,
+    skipping the write if the same image is already stored. Returns the key
+    and the bytes.
+    """
+    store = store or get_image_store()
+    data = image.read()
+    content_type = (
+        image.content_type
+        if image.content_type in UPLOAD_EXTENSIONS
+        else "image/jpeg"  # EventForm already checked it is an image
+    )
+    key = upload_key(hashlib.sha256(data).hexdigest(), content_type)
+    if not store.exists(key):
+        store.save(key, data, content_type)
+    return key, data
+
+
+def verify_upload(key, data, store=None):
+    """
+    Check bytes uploaded straight to storage against the digest in their key.
+    A mismatching object is deleted and unlinked from every event using it,
+    so nobody can plant different content under another image's key.
+    """
+    if hashlib.sha256(data).hexdigest() == key_digest(key):
+        return
+    store = store or get_image_store()
+    store.delete(key)
+    stats["rejected"] += 1
+    cleared = {field: None for field in VARIANTS}
+    affected = Event.objects.filter(image_url=store.url(key))
+    event_ids = list(affected.values_list("id", flat=True))
+    affected.update(image_url=None, image_blurhash="", **cleared)
+    for event_id in event_ids:
+        invalidate_event_detail(event_id)
+    raise ImageIntegrityError(f"{key} does not match its content")
+
+
+def process_event_image(event_id, image_url, image_key, data=None, store=None):
+    """
+    Store the variants of an uploaded event image and record their URLs and
+    blurhash on the event. `data` is read back from storage (and verified)
+    for direct uploads. Skipped if the event's image changed meanwhile.
+    """
+    store = store or get_image_store()
+    if data is None:
+        data = store.read(image_key)
+        verify_upload(image_key, data, store)
+    variants, blurhash = render_variants(data)
+    fields = {"image_blurhash": blurhash}
+    for field, (content, fmt) in variants.items():
+        key = variant_key(image_key, VARIANTS[field][0], fmt)
+        store.save(key, content, CONTENT_TYPES[fmt])
+        fields[field] = store.url(key)
+
+    if Event.objects.filter(id=event_id, image_url=image_url).update(**fields):
+        invalidate_event_detail(event_id)
+    stats["processed"] += 1
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "IMAGE_WORKERS", 2),
+                thread_name_prefix="images",
+            )
+        return _executor
+
+
+def _process(event_id, image_url, image_key, data, in_worker):
+    try:
+        process_event_image(event_id, image_url, image_key, data)
+    except Exception:
+        stats["failed"] += 1
+        logger.exception("Could not process the image for event %s", event_id)
+    finally:
+        if in_worker:
+            connections.close_all()
+
+
+def queue_event_image(event, image_key, data=None):
+    """
+    Process `event`'s newly uploaded image once the current transaction
+    commits, on the image worker pool (or inline when IMAGE_WORKERS is 0).
+    """
+    args = (event.id, event.image_url, image_key, data)
+
+    def submit():
+        if getattr(settings, "IMAGE_WORKERS", 2):
+            _get_executor().submit(_process, *args, True)
+        else:
+            _process(*args, False)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,48 @@
+# events/inventory.py
+
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.db.models import F
+
+from .models import Event
+
+
+def reserve_tickets(event_id, quantity):
+    """
+    Atomically add `quantity` to the event's sold count if enough tickets are
+    left. The check and the increment happen in a single conditional UPDATE,
+    so concurrent buyers can never oversell and the row lock is only held for
+    that one statement. Returns True if the tickets were reserved.
+    """
+    return bool(
+        Event.objects.filter(
+            id=event_id, numTickets__gte=F("ticketsSold") + quantity
+        ).update(ticketsSold=F("ticketsSold") + quantity)
+    )
+
+
+def purchase_tickets(ticket, event_id):
+    """
+    Reserve `ticket.quantity` tickets for the event and save the ticket in one
+    transaction. Lock timeouts and serialization failures are retried with
+    jittered exponential backoff. Returns False if the event is sold out.
+    """
+    attempts = getattr(settings, "TICKET_PURCHASE_RETRIES", 5)
+    backoff = getattr(settings, "TICKET_PURCHASE_BACKOFF", 0.01)
+
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                if not reserve_tickets(event_id, ticket.quantity):
+                    return False
+                ticket.event_id = event_id
+                ticket.save()
+            return True
+        except OperationalError:
+            ticket.pk = None
+            if attempt == attempts - 1:
+                raise
+            time.sleep(backoff * (2**attempt) * random.uniform(0.5, 1.5))
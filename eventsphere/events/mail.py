@@ -0,0 +1,184 @@
+# events/mail.py
+
+import contextlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between two attempts at the same message
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+# How long a claimed message stays with its worker before it's due again
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0}
+
+
+def queue_mail(subject, body, to, html_body="", from_email=None):
+    """
+    Add a message to the outbox. Requests only pay for the insert; delivery
+    happens in the send_queued_mail worker.
+    """
+    stats["queued"] += 1
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        to=to,
+        from_email=from_email or "",
+    )
+
+
+def queue_templated_mail(
+    subject_template_name,
+    email_template_name,
+    context,
+    to,
+    html_email_template_name=None,
+    from_email=None,
+):
+    """Render a subject/body template pair and add the message to the outbox."""
+    # Email subject *must not* contain newlines
+    subject = "".join(render_to_string(subject_template_name, context).splitlines())
+    body = render_to_string(email_template_name, context)
+    html_body = ""
+    if html_email_template_name is not None:
+        html_body = render_to_string(html_email_template_name, context)
+    return queue_mail(subject, body, to, html_body, from_email)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: MAIL_RETRY_DELAY seconds, doubled per failed attempt."""
+    base = getattr(settings, "MAIL_RETRY_DELAY", 60)
+    return min(timedelta(seconds=base * 2 ** (attempts - 1)), MAX_RETRY_DELAY)
+
+
+def _build_message(outbound, connection):
+    message = EmailMultiAlternatives(
+        outbound.subject,
+        outbound.body,
+        outbound.from_email or None,
+        [outbound.to],
+        connection=connection,
+    )
+    if outbound.html_body:
+        message.attach_alternative(outbound.html_body, "text/html")
+    return message
+
+
+def _record_failure(outbound, error, now):
+    outbound.status = OutboundEmail.PENDING
+    outbound.attempts += 1
+    outbound.last_error = f"{type(error).__name__}: {error}"
+    if outbound.attempts >= getattr(settings, "MAIL_MAX_ATTEMPTS", 5):
+        outbound.status = OutboundEmail.FAILED
+        stats["failed"] += 1
+        logger.error(
+            "Giving up on email %s to %s after %d attempts: %s",
+            outbound.id,
+            outbound.to,
+            outbound.attempts,
+            outbound.last_error,
+        )
+    else:
+        outbound.next_attempt_at = now + retry_delay(outbound.attempts)
+        stats["retried"] += 1
+        logger.warning(
+            "Email %s to %s failed, retrying at %s: %s",
+            outbound.id,
+            outbound.to,
+            outbound.next_attempt_at,
+            outbound.last_error,
+        )
+
+
+def claim_batch(batch_size, now):
+    """
+    Mark up to `batch_size` due messages as being sent, in a transaction that
+    only lasts as long as the claim. Messages whose claim ran out are due
+    again, so a worker that died mid-batch doesn't strand them.
+    """
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=[OutboundEmail.PENDING, OutboundEmail.SENDING],
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        OutboundEmail.objects.filter(id__in=[outbound.id for outbound in batch]).update(
+            status=OutboundEmail.SENDING, next_attempt_at=now + CLAIM_TIMEOUT
+        )
+    return batch
+
+
+def send_batch(connection, batch_size=None):
+    """
+    Claim up to `batch_size` due messages and send them over `connection`.
+    Sending happens outside any transaction, and each result is saved as
+    soon as it is known. Returns the number of messages attempted.
+    """
+    batch_size = batch_size or getattr(settings, "MAIL_BATCH_SIZE", 50)
+    now = timezone.now()
+    batch = claim_batch(batch_size, now)
+    for outbound in batch:
+        try:
+            _build_message(outbound, connection).send()
+        except Exception as e:
+            _record_failure(outbound, e, now)
+            # The server may have hung up; reconnect for the rest of the
+            # batch, which fails message by message if it stays down
+            connection.close()
+            with contextlib.suppress(OSError):
+                connection.open()
+        else:
+            outbound.attempts += 1
+            outbound.status = OutboundEmail.SENT
+            outbound.sent_at = timezone.now()
+            outbound.last_error = ""
+            stats["sent"] += 1
+        outbound.save(
+            update_fields=[
+                "status",
+                "attempts",
+                "next_attempt_at",
+                "last_error",
+                "sent_at",
+            ]
+        )
+    return len(batch)
+
+
+def send_queued_mail(batch_size=None, connection=None):
+    """
+    Deliver every message that is due, a batch at a time, reusing a single
+    connection to the mail server. Returns the number of messages attempted.
+    """
+    batch_size = batch_size or getattr(settings, "MAIL_BATCH_SIZE", 50)
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except OSError:
+        logger.warning("Mail server unreachable, leaving the outbox", exc_info=True)
+        return 0
+
+    attempted = 0
+    try:
+        while True:
+            count = send_batch(connection, batch_size)
+            attempted += count
+            # Failed messages are rescheduled, so a short batch means we're done
+            if count < batch_size:
+                return attempted
+    finally:
+        connection.close()
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events import geocoding
+from events.detail_cache import invalidate_event_detail
+from events.maps import invalidate_clusters
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Geocode events saved without coordinates. Each distinct location is "
+        "looked up once, through the geocode cache, and provider calls are "
+        "spaced --delay seconds apart. Throttled lookups wait and retry."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delay", type=float, default=1.0)
+        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        missing = Event.objects.filter(latitude__isnull=True).exclude(location="")
+        locations = list(
+            missing.order_by("location").values_list("location", flat=True).distinct()
+        )[: options["limit"]]
+
+        updated = failed = 0
+        for location in locations:
+            coordinates = self.geocode(location, options["delay"])
+
+            if coordinates is None:
+                failed += 1
+                self.stdout.write(f"No match for {location!r}")
+                continue
+            if not options["dry_run"]:
+                latitude, longitude = coordinates
+                event_ids = list(
+                    missing.filter(location=location).values_list("id", flat=True)
+                )
+                updated += Event.objects.filter(id__in=event_ids).update(
+                    latitude=latitude, longitude=longitude
+                )
+                # Queryset updates skip the post_save handlers that do this
+                for event_id in event_ids:
+                    invalidate_event_detail(event_id)
+
+        if updated:
+            invalidate_clusters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Geocoded {len(locations) - failed} of {len(locations)} locations, "
+                f"updated {updated} events."
+            )
+        )
+
+    def geocode(self, location, delay):
+        """(latitude, longitude) for `location`, waiting out the provider's limit."""
+        while True:
+            misses = geocoding.stats["misses"]
+            try:
+                results = geocoding.geocode(location)
+            except geocoding.GeocodingThrottled as e:
+                time.sleep(e.retry_after)
+                continue
+            except geocoding.GeocodingError as e:
+                self.stderr.write(f"Lookup failed for {location!r}: {e}")
+                results = []
+            if geocoding.stats["misses"] != misses:
+                # Only lookups that reached the provider need spacing out
+                time.sleep(delay)
+            if not results:
+                return None
+            return results[0]["lat"], results[0]["lon"]
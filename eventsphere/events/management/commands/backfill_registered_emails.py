@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.models import AdminProfile, CreatorProfile, RegisteredEmail, UserProfile
+
+# (source, profile queryset, user id field, email field)
+PROFILE_EMAILS = [
+    (RegisteredEmail.ADMIN, AdminProfile.objects, "admin_id", "email"),
+    (RegisteredEmail.USER, UserProfile.objects, "user_id", "email"),
+    (
+        RegisteredEmail.CREATOR,
+        CreatorProfile.objects,
+        "creator_id",
+        "organization_email",
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the registered email table from the admin, user and creator "
+        "profiles. Migration 0034 fills it once; this repairs it later. Safe "
+        "to re-run; rows are upserted and stale ones removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = 0
+        with transaction.atomic():
+            for source, profiles, user_field, email_field in PROFILE_EMAILS:
+                with_email = profiles.exclude(
+                    **{f"{email_field}__isnull": True}
+                ).exclude(**{email_field: ""})
+                rows = [
+                    RegisteredEmail(
+                        user_id=user_id,
+                        source=source,
+                        email=email,
+                        normalized_email=RegisteredEmail.normalize(email),
+                    )
+                    for user_id, email in with_email.values_list(
+                        user_field, email_field
+                    ).iterator(chunk_size=options["batch_size"])
+                ]
+                RegisteredEmail.objects.bulk_create(
+                    rows,
+                    batch_size=options["batch_size"],
+                    update_conflicts=True,
+                    unique_fields=["user", "source"],
+                    update_fields=["email", "normalized_email"],
+                )
+                removed, _ = (
+                    RegisteredEmail.objects.filter(source=source)
+                    .exclude(user_id__in=with_email.values(user_field))
+                    .delete()
+                )
+                total += len(rows)
+                self.stdout.write(
+                    f"{source}: {len(rows)} registered, {removed} stale removed"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Registered {total} profile emails."))
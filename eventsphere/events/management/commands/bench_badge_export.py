@@ -0,0 +1,59 @@
+import os
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events.badges import stream_badge_zip
+from events.models import Event, Ticket
+
+
+async def archive_size(event, workers):
+    size = 0
+    async for chunk in stream_badge_zip(event, workers):
+        size += len(chunk)
+    return size
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the creator badge export in-process and on a process pool. "
+        "Reports codes/sec for each. Creates a throwaway event with --holders "
+        "ticket holders and removes it afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--holders", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        prefix = f"bench_badge_{int(time.time())}"
+        event = Event.objects.create(
+            name="Badge export benchmark",
+            location="Benchmark Arena",
+            date_time=timezone.now() + timezone.timedelta(days=1),
+            schedule="Schedule",
+            speakers="Speaker",
+        )
+        User.objects.bulk_create(
+            User(username=f"{prefix}_{i}") for i in range(options["holders"])
+        )
+        users = User.objects.filter(username__startswith=prefix)
+        Ticket.objects.bulk_create(
+            Ticket(user=user, event=event, quantity=1) for user in users
+        )
+
+        try:
+            for workers in sorted({1, options["workers"]}):
+                started = time.perf_counter()
+                size = async_to_sync(archive_size)(event, workers)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{workers} worker(s): {options['holders'] / elapsed:.1f} codes/sec "
+                    f"({size / 1024:.0f} KiB archive)"
+                )
+        finally:
+            event.delete()
+            users.delete()
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events.models import ChatMessage, ChatRoom, CreatorProfile, Event
+from events.write_behind import ChatMessageBuffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare chat message persistence throughput (messages/sec) with the "
+        "write-behind buffer on and off. Creates a throwaway room and removes "
+        "it afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--senders", type=int, default=20)
+        parser.add_argument("--messages", type=int, default=100)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--flush-interval", type=float, default=0.5)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username=f"bench_chat_{int(time.time())}")
+        try:
+            creator = CreatorProfile.objects.create(creator=user)
+            event = Event.objects.create(
+                name="Chat write benchmark",
+                location="Benchmark",
+                date_time=timezone.now(),
+                schedule="",
+                speakers="",
+                created_by=creator,
+            )
+            room = ChatRoom.objects.get(event=event)
+            total = options["senders"] * options["messages"]
+
+            for label, run in (("direct", self._direct), ("buffered", self._buffered)):
+                started = time.perf_counter()
+                async_to_sync(run)(room.id, user, options)
+                elapsed = time.perf_counter() - started
+                written = ChatMessage.objects.filter(room=room).count()
+                self.stdout.write(
+                    f"{label:>9}: {total / elapsed:10.1f} messages/sec "
+                    f"({written} rows)"
+                )
+                ChatMessage.objects.filter(room=room).delete()
+        finally:
+            user.delete()
+
+    async def _direct(self, room_id, user, options):
+        create = database_sync_to_async(ChatMessage.objects.create)
+
+        async def sender(n):
+            for i in range(options["messages"]):
+                await create(room_id=room_id, user=user, content=f"{n}:{i}")
+
+        await asyncio.gather(*(sender(n) for n in range(options["senders"])))
+
+    async def _buffered(self, room_id, user, options):
+        buffer = ChatMessageBuffer(
+            max_size=options["batch_size"], flush_interval=options["flush_interval"]
+        )
+
+        async def sender(n):
+            for i in range(options["messages"]):
+                await buffer.add(room_id, user, f"{n}:{i}")
+                # Yield like a real socket would between frames
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(sender(n) for n in range(options["senders"])))
+        await buffer.flush_all()
@@ -0,0 +1,68 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events import detail_cache
+from events.models import Event, Favorite
+
+UNCACHED = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark event_detail with the cache disabled and enabled. Reports "
+        "requests/sec for each and the cache hit rate. Creates a throwaway "
+        "event and user and removes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--schedule-paragraphs", type=int, default=50)
+
+    def handle(self, *args, **options):
+        prefix = f"bench_detail_{int(time.time())}"
+        event = Event.objects.create(
+            name="Event detail benchmark",
+            location="Benchmark Arena",
+            date_time=timezone.now() + timezone.timedelta(days=1),
+            schedule="\n\n".join(
+                f"Session {i}: talks, panels and a long description of each."
+                for i in range(options["schedule_paragraphs"])
+            ),
+            speakers="Speaker One, Speaker Two",
+            numTickets=1000,
+        )
+        user = User.objects.create_user(username=prefix)
+        Favorite.objects.create(user=user, event=event)
+        client = Client(HTTP_HOST="127.0.0.1")
+        client.force_login(user)
+        url = reverse("event_detail", args=[event.id])
+
+        try:
+            with override_settings(CACHES=UNCACHED):
+                uncached = self.run(client, url, options["requests"])
+            hits, misses = detail_cache.stats["hits"], detail_cache.stats["misses"]
+            cached = self.run(client, url, options["requests"])
+            hits = detail_cache.stats["hits"] - hits
+            misses = detail_cache.stats["misses"] - misses
+
+            self.stdout.write(f"uncached: {uncached:.1f} requests/sec")
+            self.stdout.write(f"cached:   {cached:.1f} requests/sec")
+            self.stdout.write(
+                f"hit rate: {hits / (hits + misses):.1%} ({hits} hits, {misses} misses)"
+            )
+        finally:
+            event.delete()
+            user.delete()
+
+    def run(self, client, url, requests):
+        client.get(url)  # warm up
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+        return requests / (time.perf_counter() - started)
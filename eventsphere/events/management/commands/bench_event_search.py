@@ -0,0 +1,109 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from events.models import Event
+from events.search import install_search_index, upcoming_and_past_events
+
+MARKER = "bench_event_search"
+
+WORDS = [
+    "jazz", "rock", "python", "django", "summit", "festival", "expo", "night",
+    "marathon", "gallery", "startup", "workshop", "comedy", "opera", "film",
+    "food", "wine", "robotics", "yoga", "poetry", "hackathon", "design",
+]  # fmt: skip
+CITIES = ["New York", "Brooklyn", "Boston", "Chicago", "Austin", "Seattle"]
+CATEGORIES = ["Music", "Tech", "Art", "Sports", "Food", "Education"]
+
+
+def legacy_search(query, now):
+    """The previous implementation: two leading-wildcard LIKE scans."""
+    matches = (
+        Q(name__icontains=query)
+        | Q(location__icontains=query)
+        | Q(category__icontains=query)
+    )
+    upcoming = list(Event.objects.filter(date_time__gte=now).filter(matches))
+    past = list(Event.objects.filter(date_time__lt=now).filter(matches))
+    return upcoming, past
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark event search against the previous icontains queries. Tops "
+        "the database up to --events synthetic events (kept between runs; pass "
+        "--cleanup to remove them) and reports the average time per search."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--queries", nargs="+", default=["jazz", "pyth", "rock festival", "zzz"]
+        )
+        parser.add_argument("--skip-legacy", action="store_true")
+        parser.add_argument("--cleanup", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            deleted, _ = Event.objects.filter(schedule=MARKER).delete()
+            self.stdout.write(f"Removed {deleted} rows.")
+            return
+
+        install_search_index()
+        self.populate(options["events"], options["batch_size"])
+        now = timezone.now()
+
+        for query in options["queries"]:
+            search_ms, results = self.time(
+                lambda: upcoming_and_past_events(query, now=now), options["repeat"]
+            )
+            line = (
+                f"{query!r}: {len(results[0])} upcoming / {len(results[1])} past, "
+                f"search {search_ms:.1f} ms"
+            )
+            if not options["skip_legacy"]:
+                legacy_ms, _ = self.time(
+                    lambda: legacy_search(query, now), options["repeat"]
+                )
+                line += f", icontains {legacy_ms:.1f} ms"
+            self.stdout.write(line)
+
+    def time(self, func, repeat):
+        result = func()  # warm up caches
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        return (time.perf_counter() - started) * 1000 / repeat, result
+
+    def populate(self, target, batch_size):
+        existing = Event.objects.filter(schedule=MARKER).count()
+        if existing >= target:
+            return
+        rng = random.Random(existing)
+        now = timezone.now()
+        started = time.perf_counter()
+        for offset in range(existing, target, batch_size):
+            size = min(batch_size, target - offset)
+            Event.objects.bulk_create(
+                [
+                    Event(
+                        name=" ".join(rng.sample(WORDS, 3)).title(),
+                        location=f"{rng.randint(1, 999)} Main St, {rng.choice(CITIES)}",
+                        category=rng.choice(CATEGORIES),
+                        date_time=now
+                        + timezone.timedelta(minutes=rng.randint(-525600, 525600)),
+                        schedule=MARKER,
+                        speakers="",
+                    )
+                    for _ in range(size)
+                ]
+            )
+        self.stdout.write(
+            f"Created {target - existing} events in "
+            f"{time.perf_counter() - started:.1f}s."
+        )
@@ -0,0 +1,73 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events.consumers import notify_group_members
+from events.models import ChatRoom, CreatorProfile, Event, Notification, RoomMember
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-message latency of notify_group_members against room size. "
+        "Creates throwaway users, an event and a chat room, and removes them "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--members",
+            type=int,
+            nargs="+",
+            default=[10, 100, 500, 2000],
+            help="Room sizes to benchmark.",
+        )
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=5,
+            help="Messages sent per room size.",
+        )
+
+    def handle(self, *args, **options):
+        prefix = f"bench_fanout_{int(time.time())}"
+        creator_user = User.objects.create_user(username=f"{prefix}_creator")
+        try:
+            creator = CreatorProfile.objects.create(creator=creator_user)
+            event = Event.objects.create(
+                name="Fan-out benchmark",
+                location="Benchmark",
+                date_time=timezone.now(),
+                schedule="",
+                speakers="",
+                created_by=creator,
+            )
+            room = ChatRoom.objects.get(event=event)
+
+            self.stdout.write(f"{'members':>8} {'ms/message':>12}")
+            for size in options["members"]:
+                self._resize_room(room, prefix, size)
+                started = time.perf_counter()
+                for i in range(options["messages"]):
+                    async_to_sync(notify_group_members)(
+                        room, creator_user, f"benchmark {i}", "chat_message"
+                    )
+                elapsed = time.perf_counter() - started
+                per_message = elapsed * 1000 / options["messages"]
+                self.stdout.write(f"{size:>8} {per_message:>12.2f}")
+        finally:
+            Notification.objects.filter(user__username__startswith=prefix).delete()
+            User.objects.filter(username__startswith=prefix).delete()
+
+    def _resize_room(self, room, prefix, size):
+        existing = RoomMember.objects.filter(room=room).count()
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}_{i}") for i in range(existing, size)]
+        )
+        # bulk_create doesn't return ids on every backend, so look them up
+        users = User.objects.filter(username__in=[user.username for user in users])
+        RoomMember.objects.bulk_create(
+            [RoomMember(room=room, user=user) for user in users]
+        )
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from events.inventory import purchase_tickets
+from events.models import Event, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress-test concurrent ticket purchases for one event. Reports "
+        "purchases/sec and checks that the event was not oversold. Creates a "
+        "throwaway event and buyers and removes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buyers", type=int, default=50)
+        parser.add_argument("--purchases", type=int, default=10)
+        parser.add_argument("--tickets", type=int, default=300)
+        parser.add_argument("--quantity", type=int, default=1)
+
+    def handle(self, *args, **options):
+        prefix = f"bench_tickets_{int(time.time())}"
+        event = Event.objects.create(
+            name="Ticket drop benchmark",
+            location="Benchmark",
+            date_time=timezone.now() + timezone.timedelta(days=1),
+            schedule="",
+            speakers="",
+            numTickets=options["tickets"],
+        )
+        users = [
+            User.objects.create(username=f"{prefix}_{i}")
+            for i in range(options["buyers"])
+        ]
+        outcomes = {"sold": 0, "rejected": 0, "errors": 0}
+        lock = threading.Lock()
+        start = threading.Barrier(len(users))
+
+        def buyer(user):
+            try:
+                start.wait()
+                for _ in range(options["purchases"]):
+                    ticket = Ticket(user=user, quantity=options["quantity"])
+                    try:
+                        outcome = (
+                            "sold" if purchase_tickets(ticket, event.id) else "rejected"
+                        )
+                    except Exception:
+                        outcome = "errors"
+                    with lock:
+                        outcomes[outcome] += 1
+            finally:
+                connection.close()
+
+        try:
+            threads = [threading.Thread(target=buyer, args=(user,)) for user in users]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            event.refresh_from_db()
+            ticket_total = (
+                Ticket.objects.filter(event=event).aggregate(total=Sum("quantity"))[
+                    "total"
+                ]
+                or 0
+            )
+            attempts = sum(outcomes.values())
+            self.stdout.write(
+                f"{attempts} attempts in {elapsed:.2f}s "
+                f"({attempts / elapsed:.1f} purchases/sec), "
+                f"sold={outcomes['sold']} rejected={outcomes['rejected']} "
+                f"errors={outcomes['errors']}"
+            )
+            self.stdout.write(
+                f"capacity={event.numTickets} ticketsSold={event.ticketsSold} "
+                f"ticket rows={ticket_total}"
+            )
+            if (
+                event.ticketsSold > event.numTickets
+                or ticket_total != event.ticketsSold
+            ):
+                self.stderr.write(self.style.ERROR("Inventory is inconsistent!"))
+            else:
+                self.stdout.write(self.style.SUCCESS("No overselling detected."))
+        finally:
+            event.delete()
+            User.objects.filter(username__startswith=prefix).delete()
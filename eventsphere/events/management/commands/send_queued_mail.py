@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events import mail
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver due messages from the email outbox in batches over one mail "
+        "server connection. Failed messages are retried with exponential "
+        "backoff. With --loop, keeps polling every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument("--interval", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = mail.stats["sent"], mail.stats["failed"]
+            attempted = mail.send_queued_mail(options["batch_size"])
+            if attempted or not options["loop"]:
+                self.stdout.write(
+                    f"Attempted {attempted} messages: "
+                    f"{mail.stats['sent'] - sent} sent, "
+                    f"{mail.stats['failed'] - failed} given up"
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,258 @@
+# events/maps.py
+
+import json
+import math
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, IntegerField, Min, Q
+from django.db.models.functions import Cast, Floor
+from django.utils import timezone
+
+from .models import Event
+
+MIN_ZOOM, MAX_ZOOM = 0, 19
+
+# Hard cap on markers per response, whatever the viewport
+MAX_MAP_FEATURES = 5000
+
+# Rows fetched per trip to the database while streaming markers
+FEATURE_CHUNK_SIZE = 500
+
+# Descriptions only feed the preview card, so keep them short
+DESCRIPTION_LENGTH = 200
+
+# Zoom levels up to this one get clusters instead of individual markers
+CLUSTER_MAX_ZOOM = 13
+
+# Clusters are computed on a lat/lng grid; each tile spans 360 / 2**zoom
+# degrees and is split into CELLS_PER_TILE x CELLS_PER_TILE cells
+CELLS_PER_TILE = 4
+MAX_CLUSTER_TILES = 400
+
+# Cached tiles only list upcoming events, so let them age out eventually
+CLUSTER_CACHE_TIMEOUT = 10 * 60
+CLUSTER_VERSION_KEY = "map_clusters:version"
+
+FEATURE_FIELDS = (
+    "id",
+    "name",
+    "latitude",
+    "longitude",
+    "location",
+    "image_url",
+    "schedule",
+)
+
+
+def parse_bbox(value):
+    """
+    Parse a "west,south,east,north" bounding box as sent by Leaflet. Returns
+    (south, north, ranges) where ranges holds one (west, east) longitude span,
+    or two when the box crosses the antimeridian. Raises ValueError.
+    """
+    try:
+        west, south, east, north = (float(part) for part in value.split(","))
+    except (AttributeError, ValueError):
+        raise ValueError("bbox must be 'west,south,east,north'.")
+    if south > north:
+        raise ValueError("bbox south must not exceed north.")
+    south, north = max(south, -90.0), min(north, 90.0)
+
+    if east - west >= 360:
+        return south, north, [(-180.0, 180.0)]
+    # Leaflet reports longitudes beyond +/-180 after panning across the date line
+    west = (west + 180) % 360 - 180
+    east = (east + 180) % 360 - 180
+    if west <= east:
+        return south, north, [(west, east)]
+    return south, north, [(west, 180.0), (-180.0, east)]
+
+
+def parse_zoom(value):
+    zoom = int(value)
+    if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+        raise ValueError(f"zoom must be between {MIN_ZOOM} and {MAX_ZOOM}.")
+    return zoom
+
+
+def events_in_bbox(south, north, ranges, now=None):
+    """Upcoming events with coordinates inside the bounding box."""
+    longitude = Q()
+    for west, east in ranges:
+        longitude |= Q(longitude__gte=west, longitude__lte=east)
+    return Event.objects.filter(
+        longitude,
+        latitude__gte=south,
+        latitude__lte=north,
+        date_time__gte=now or timezone.now(),
+    )
+
+
+def feature(row):
+    event_id, name, latitude, longitude, location, image_url, schedule = row
+    return {
+        "type": "Feature",
+        "id": event_id,
+        "geometry": {
+            "type": "Point",
+            "coordinates": [round(longitude, 6), round(latitude, 6)],
+        },
+        "properties": {
+            "name": name,
+            "location": location,
+            "image_url": image_url,
+            "description": schedule[:DESCRIPTION_LENGTH],
+        },
+    }
+
+
+async def stream_feature_collection(events, limit=MAX_MAP_FEATURES):
+    """
+    Yield a GeoJSON FeatureCollection chunk by chunk. Rows come from a
+    server-side iterator advanced one chunk at a time off the event loop, so
+    ASGI servers can send each chunk as soon as it is read instead of
+    buffering the whole body.
+    """
+    rows = events.values_list(*FEATURE_FIELDS)[:limit].iterator(
+        chunk_size=FEATURE_CHUNK_SIZE
+    )
+    next_chunk = sync_to_async(lambda: list(islice(rows, FEATURE_CHUNK_SIZE)))
+    yield '{"type":"FeatureCollection","features":['
+    try:
+        separator = ""
+        while chunk := await next_chunk():
+            yield separator + ",".join(
+                json.dumps(feature(row), separators=(",", ":")) for row in chunk
+            )
+            separator = ","
+    finally:
+        # Release the cursor even if the client went away mid-stream
+        await sync_to_async(rows.close)()
+    yield "]}"
+
+
+def cluster_version():
+    return cache.get_or_set(CLUSTER_VERSION_KEY, 1, None)
+
+
+def invalidate_clusters():
+    """Drop every cached cluster tile by moving to a new version."""
+    try:
+        cache.incr(CLUSTER_VERSION_KEY)
+    except ValueError:
+        cache.set(CLUSTER_VERSION_KEY, 1, None)
+
+
+def tile_size(zoom):
+    return 360.0 / 2**zoom
+
+
+def tiles_in_bbox(south, north, ranges, zoom):
+    """(x, y) grid tiles at `zoom` covering the bounding box."""
+    size = tile_size(zoom)
+    last = math.ceil(360 / size) - 1
+    ys = range(
+        max(int((south + 90) // size), 0), min(int((north + 90) // size), last) + 1
+    )
+    tiles = []
+    for west, east in ranges:
+        xs = range(
+            max(int((west + 180) // size), 0), min(int((east + 180) // size), last) + 1
+        )
+        tiles.extend((x, y) for x in xs for y in ys)
+    if len(tiles) > MAX_CLUSTER_TILES:
+        raise ValueError("bbox is too large for this zoom level.")
+    return tiles
+
+
+def tile_cache_key(version, zoom, x, y):
+    return f"map_clusters:{version}:{zoom}:{x}:{y}"
+
+
+def clustered_features(south, north, ranges, zoom, now=None):
+    """
+    GeoJSON features for the viewport with nearby events merged into
+    clusters. Tiles are cached until an event with coordinates changes, and
+    all uncached tiles are computed with one GROUP BY over grid cells.
+    """
+    tiles = tiles_in_bbox(south, north, ranges, zoom)
+    version = cluster_version()
+    keys = {tile: tile_cache_key(version, zoom, *tile) for tile in tiles}
+    cached = cache.get_many(keys.values())
+
+    missing = [tile for tile in tiles if keys[tile] not in cached]
+    if missing:
+        computed = compute_tiles(missing, zoom, now)
+        cache.set_many(
+            {keys[tile]: computed[tile] for tile in missing}, CLUSTER_CACHE_TIMEOUT
+        )
+        cached.update({keys[tile]: computed[tile] for tile in missing})
+
+    return [feature for tile in tiles for feature in cached[keys[tile]]]
+
+
+def compute_tiles(tiles, zoom, now=None):
+    size = tile_size(zoom)
+    cell = size / CELLS_PER_TILE
+    min_x, max_x = min(x for x, _ in tiles), max(x for x, _ in tiles)
+    min_y, max_y = min(y for _, y in tiles), max(y for _, y in tiles)
+
+    # One query over the rectangle enclosing the missing tiles. The last
+    # column also takes events lying exactly on the antimeridian.
+    east = (max_x + 1) * size - 180
+    events = Event.objects.filter(
+        Q(longitude__lt=east) if east < 180 else Q(longitude__lte=180),
+        longitude__gte=min_x * size - 180,
+        latitude__gte=min_y * size - 90,
+        latitude__lt=(max_y + 1) * size - 90,
+        date_time__gte=now or timezone.now(),
+    )
+    rows = (
+        events.annotate(
+            cell_x=Cast(Floor((F("longitude") + 180) / cell), IntegerField()),
+            cell_y=Cast(Floor((F("latitude") + 90) / cell), IntegerField()),
+        )
+        .values("cell_x", "cell_y")
+        .annotate(
+            count=Count("id"),
+            latitude=Avg("latitude"),
+            longitude=Avg("longitude"),
+            event_id=Min("id"),
+        )
+    )
+
+    computed = {tile: [] for tile in tiles}
+    singles = {}
+    for row in rows:
+        # Rounding can floor a row on a tile edge into the next cell over,
+        # but the filter already put it inside the rectangle
+        tile = (
+            min(max(row["cell_x"] // CELLS_PER_TILE, min_x), max_x),
+            min(max(row["cell_y"] // CELLS_PER_TILE, min_y), max_y),
+        )
+        if tile not in computed:
+            continue
+        if row["count"] == 1:
+            singles[row["event_id"]] = tile
+            continue
+        computed[tile].append(
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [
+                        round(row["longitude"], 6),
+                        round(row["latitude"], 6),
+                    ],
+                },
+                "properties": {"cluster": True, "count": row["count"]},
+            }
+        )
+
+    # Lone events are sent as regular markers
+    if singles:
+        for row in Event.objects.filter(id__in=singles).values_list(*FEATURE_FIELDS):
+            computed[singles[row[0]]].append(feature(row))
+    return computed
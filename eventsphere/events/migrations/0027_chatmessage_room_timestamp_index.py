@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0026_adminprofile"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["room", "timestamp", "id"], name="chatmsg_room_ts_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0027_chatmessage_room_timestamp_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["date_time"], name="event_date_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "is_read", "-created_at"],
+                name="notif_user_read_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["user", "-created_at"],
+                name="notif_unread_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="roommember",
+            index=models.Index(
+                fields=["room", "is_kicked"], name="roommember_room_kicked_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["event", "created_at"], name="ticket_event_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unread_counts(apps, schema_editor):
+    Notification = apps.get_model("events", "Notification")
+    NotificationCounter = apps.get_model("events", "NotificationCounter")
+    unread = (
+        Notification.objects.filter(is_read=False)
+        .values("user_id")
+        .annotate(total=Count("id"))
+    )
+    NotificationCounter.objects.bulk_create(
+        [
+            NotificationCounter(user_id=row["user_id"], unread=row["total"])
+            for row in unread
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0028_hot_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("unread", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_counter",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
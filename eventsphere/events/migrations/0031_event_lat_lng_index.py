@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0030_event_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="event_lat_lng_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.2 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0032_geocodecache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="image_blurhash",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="image_webp_url",
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="thumbnail_url",
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="thumbnail_webp_url",
+            field=models.URLField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.1.2 on 2026-10-18 14:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+
+def register_profile_emails(apps, schema_editor):
+    RegisteredEmail = apps.get_model("events", "RegisteredEmail")
+    for source, model_name, user_field, email_field in [
+        ("admin", "AdminProfile", "admin_id", "email"),
+        ("user", "UserProfile", "user_id", "email"),
+        ("creator", "CreatorProfile", "creator_id", "organization_email"),
+    ]:
+        profiles = (
+            apps.get_model("events", model_name)
+            .objects.exclude(**{f"{email_field}__isnull": True})
+            .exclude(**{email_field: ""})
+        )
+        RegisteredEmail.objects.bulk_create(
+            [
+                RegisteredEmail(
+                    user_id=user_id,
+                    source=source,
+                    email=email,
+                    normalized_email=email.strip().lower(),
+                )
+                for user_id, email in profiles.values_list(user_field, email_field)
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0033_event_image_variants"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegisteredEmail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("admin", "admin"),
+                            ("user", "user"),
+                            ("creator", "creator"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("email", models.EmailField(max_length=255)),
+                ("normalized_email", models.CharField(db_index=True, max_length=255)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="registered_emails",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "source"), name="registered_email_per_profile"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(register_profile_emails, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from django.core.validators import RegexValidator
 from django.core.validators import MinValueValidator
@@ -51,6 +53,11 @@ class Event(models.Model):
     image_url = models.URLField(
         blank=True, null=True
     )  # Add this field for S3 image link
+    # Resized copies of image_url, filled in by events.images after upload
+    thumbnail_url = models.URLField(blank=True, null=True)
+    thumbnail_webp_url = models.URLField(blank=True, null=True)
+    image_webp_url = models.URLField(blank=True, null=True)
+    image_blurhash = models.CharField(max_length=100, blank=True, default="")
     latitude = models.FloatField(null=True, blank=True)  # For latitude
     longitude = models.FloatField(null=True, blank=True)  # For longitude
     created_at = models.DateTimeField(auto_now_add=True)
@@ -61,6 +68,14 @@ class Event(models.Model):
     numTickets = models.IntegerField(null=True, blank=True)
     ticketsSold = models.IntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            # Upcoming/past splits in user_event_list and map_view
+            models.Index(fields=["date_time"], name="event_date_time_idx"),
+            # Viewport lookups in map_events
+            models.Index(fields=["latitude", "longitude"], name="event_lat_lng_idx"),
+        ]
+
     @property
     def tickets_left(self):
         return (
@@ -117,6 +132,14 @@ class Ticket(models.Model):
     quantity = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Per-event sales over time in fetch_filter_wise_data
+            models.Index(
+                fields=["event", "created_at"], name="ticket_event_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.event.name} - {self.user.username}"
 
@@ -138,7 +161,16 @@ class ChatMessage(models.Model):
     )
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add, so write-behind batches keep the time each was sent
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a room's history
+            models.Index(
+                fields=["room", "timestamp", "id"], name="chatmsg_room_ts_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Message from {self.user.username} in {self.room}"
@@ -150,6 +182,13 @@ class RoomMember(models.Model):
     joined_at = models.DateTimeField(auto_now_add=True)
     is_kicked = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["room", "is_kicked"], name="roommember_room_kicked_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.username} in {self.room}"
 
@@ -166,5 +205,176 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "is_read", "-created_at"],
+                name="notif_user_read_created_idx",
+            ),
+            # Most notifications end up read; keep the unread lookups small
+            models.Index(
+                fields=["user", "-created_at"],
+                condition=models.Q(is_read=False),
+                name="notif_unread_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Notification for {self.user.username}"
+
+
+class NotificationCounter(models.Model):
+    """Denormalized count of a user's unread notifications for the navbar badge."""
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="notification_counter"
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def increment(cls, user_ids):
+        user_ids = list(user_ids)
+        with transaction.atomic():
+            # Make sure every user has a counter row, then bump them all at once
+            cls.objects.bulk_create(
+                [cls(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+            )
+            cls.objects.filter(user_id__in=user_ids).update(unread=F("unread") + 1)
+
+    @classmethod
+    def decrement(cls, user, count=1):
+        if count:
+            cls.objects.filter(user=user).update(
+                unread=Greatest(F("unread") - count, 0)
+            )
+
+    @classmethod
+    def unread_for(cls, user):
+        return (
+            cls.objects.filter(user=user).values_list("unread", flat=True).first() or 0
+        )
+
+    def __str__(self):
+        return f"{self.user.username}: {self.unread} unread"
+
+
+class GeocodeCache(models.Model):
+    """Geocoder results keyed by a hash of the normalized query, evicted LRU."""
+
+    query = models.CharField(max_length=255, unique=True)
+    results = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["last_used_at"], name="geocode_last_used_idx"),
+        ]
+
+    def __str__(self):
+        return self.query
+
+
+class RegisteredEmail(models.Model):
+    """
+    Every profile email, normalized for lookup, so signup and password reset
+    resolve an address with one indexed query instead of one per profile
+    table. Kept in sync from the profile models by signals.
+    """
+
+    ADMIN = "admin"
+    USER = "user"
+    CREATOR = "creator"
+    # Address a password reset goes to when a user has several profiles
+    SOURCES = [ADMIN, USER, CREATOR]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="registered_emails"
+    )
+    source = models.CharField(max_length=10, choices=[(s, s) for s in SOURCES])
+    email = models.EmailField(max_length=255)
+    normalized_email = models.CharField(max_length=255, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "source"], name="registered_email_per_profile"
+            ),
+        ]
+
+    @staticmethod
+    def normalize(email):
+        return email.strip().lower()
+
+    @classmethod
+    def sync(cls, source, user_id, email):
+        """Record `email` as the `source` profile's address, or drop it if blank."""
+        if email:
+            cls.objects.update_or_create(
+                user_id=user_id,
+                source=source,
+                defaults={"email": email, "normalized_email": cls.normalize(email)},
+            )
+        else:
+            cls.objects.filter(user_id=user_id, source=source).delete()
+
+    @classmethod
+    def in_use(cls, email):
+        return cls.objects.filter(normalized_email=cls.normalize(email)).exists()
+
+    @classmethod
+    def reset_addresses(cls, email):
+        """
+        {user: address} for every user with a profile registered under
+        `email`, each at the address of their highest-ranked profile.
+        """
+        matches = cls.objects.filter(normalized_email=cls.normalize(email))
+        rows = cls.objects.filter(user__in=matches.values("user_id")).select_related(
+            "user"
+        )
+        addresses = {}
+        for row in sorted(rows, key=lambda row: cls.SOURCES.index(row.source)):
+            addresses.setdefault(row.user, row.email)
+        return addresses
+
+    def __str__(self):
+        return f"{self.email} ({self.source})"
+
+
+class OutboundEmail(models.Model):
+    """A message waiting in the outbox; the send_queued_mail worker delivers it."""
+
+    PENDING = "pending"
+    # Claimed by a worker until next_attempt_at; due again after that, in
+    # case the worker died mid-send
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    to = models.EmailField(max_length=255)
+    from_email = models.CharField(max_length=255, blank=True)
+    subject = models.TextField()
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="outbound_email_due_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to} ({self.status})"
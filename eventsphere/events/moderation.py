@@ -0,0 +1,159 @@
+# events/moderation.py
+
+import re
+import threading
+from functools import lru_cache
+
+from better_profanity.constants import ALLOWED_CHARACTERS
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+
+CENSOR = "****"
+
+# Characters commonly typed in place of a letter, as in better_profanity
+LEETSPEAK = {
+    "a": ("@", "*", "4"),
+    "i": ("*", "l", "1"),
+    "o": ("*", "0", "@"),
+    "u": ("*", "v"),
+    "v": ("*", "u"),
+    "l": ("1",),
+    "e": ("*", "3"),
+    "s": ("$", "5"),
+    "t": ("7",),
+}
+
+# Distinct words cached with their verdict; chat vocabulary repeats a lot
+WORD_CACHE_SIZE = 50000
+
+_END = ""
+_WORD = re.compile(
+    "[" + "".join(re.escape(c) for c in sorted(ALLOWED_CHARACTERS)) + "]+"
+)
+
+
+def _readings():
+    """Every letter a typed character may stand for, itself included."""
+    readings = {}
+    for letter, substitutes in LEETSPEAK.items():
+        for substitute in substitutes:
+            readings.setdefault(substitute, {substitute}).add(letter)
+    return {char: tuple(letters) for char, letters in readings.items()}
+
+
+def _as_text(value):
+    """Message payloads come from clients as JSON; check whatever arrives."""
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+
+class ProfanityFilter:
+    """
+    Whole-word profanity matcher over a trie compiled from a wordlist.
+    Leetspeak is resolved while walking the trie instead of expanding every
+    variant of every word up front. Phrases in the list ("blow job",
+    "f.u.c.k") match across consecutive words, with or without the
+    separators between them.
+    """
+
+    def __init__(self, words):
+        self.trie = {}
+        self.max_words = 1
+        for word in {word.lower() for word in words}:
+            node = self.trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[_END] = True
+            words_in_phrase = len(_WORD.findall(word)) or 1
+            self.max_words = max(self.max_words, words_in_phrase)
+        self.readings = _readings()
+        self.is_profane_word = lru_cache(maxsize=WORD_CACHE_SIZE)(self._match_word)
+
+    def _walk(self, nodes, text):
+        readings = self.readings
+        for char in text.lower():
+            letters = readings.get(char, (char,))
+            nodes = [node[c] for node in nodes for c in letters if c in node]
+            if not nodes:
+                break
+        return nodes
+
+    @staticmethod
+    def _accepts(nodes):
+        return any(_END in node for node in nodes)
+
+    def _match_word(self, word):
+        return self._accepts(self._walk([self.trie], word))
+
+    def _phrase_end(self, text, words, i):
+        """Index of the last word of a listed phrase starting at words[i], or None."""
+        plain = spaced = self._walk([self.trie], words[i].group())
+        for j in range(i + 1, min(len(words), i + self.max_words)):
+            word = words[j].group()
+            gap_start, gap_end = words[j - 1].end(), words[j].start()
+            separator = text[gap_start:gap_end]
+            plain = self._walk(plain, word)
+            spaced = self._walk(self._walk(spaced, separator), word)
+            if self._accepts(plain) or self._accepts(spaced):
+                return j
+            if not plain and not spaced:
+                return None
+        return None
+
+    def _matches(self, text):
+        """Yield (start, end) of each profane word or phrase in `text`."""
+        text = _as_text(text)
+        words = list(_WORD.finditer(text))
+        i = 0
+        while i < len(words):
+            end = None
+            if self.max_words > 1:
+                end = self._phrase_end(text, words, i)
+            if end is None and self.is_profane_word(words[i].group()):
+                end = i
+            if end is None:
+                i += 1
+                continue
+            yield words[i].start(), words[end].end()
+            i = end + 1
+
+    def censor(self, text):
+        text = _as_text(text)
+        pieces = []
+        position = 0
+        for start, end in self._matches(text):
+            pieces.append(text[position:start])
+            pieces.append(CENSOR)
+            position = end
+        if not pieces:
+            return text
+        pieces.append(text[position:])
+        return "".join(pieces)
+
+    def contains_profanity(self, text):
+        return next(self._matches(text), None) is not None
+
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def get_profanity_filter():
+    """The shared filter, compiled from the bundled wordlist on first use."""
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                words = read_wordlist(
+                    get_complete_path_of_file("profanity_wordlist.txt")
+                )
+                _filter = ProfanityFilter(words)
+    return _filter
+
+
+def censor(text):
+    return get_profanity_filter().censor(text)
+
+
+def contains_profanity(text):
+    return get_profanity_filter().contains_profanity(text)
@@ -0,0 +1,103 @@
+# events/qr_codes.py
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Sum
+
+from .models import Ticket
+from .qr_render import render_qr
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("png", "svg")
+QR_CACHE_TIMEOUT = 60 * 60 * 24
+
+stats = {"hits": 0, "misses": 0, "coalesced": 0, "pending": 0, "errors": 0}
+
+
+def ticket_qr_payload(user, event_id):
+    """The text encoded in a user's QR code for an event, or None if they hold no tickets."""
+    tickets = Ticket.objects.filter(user=user, event_id=event_id).aggregate(
+        event_name=Max("event__name"), total_quantity=Sum("quantity")
+    )
+    if tickets["total_quantity"] is None:
+        return None
+    return qr_payload(user.username, tickets["event_name"], tickets["total_quantity"])
+
+
+def qr_payload(username, event_name, total_quantity):
+    return f"User: {username}\nEvent: {event_name}\nTotal Tickets: {total_quantity}"
+
+
+def qr_cache_key(payload, fmt):
+    # Keyed by content, so buying more tickets naturally moves to a new code
+    return f"ticket_qr:{fmt}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+_executor = None
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _inflight_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "QR_WORKERS", 2),
+                thread_name_prefix="qr",
+            )
+        return _executor
+
+
+def _render_and_store(key, payload, fmt):
+    try:
+        image = render_qr(payload, fmt)
+        cache.set(key, image, QR_CACHE_TIMEOUT)
+        return image
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def get_qr_code(payload, fmt="png", wait=None):
+    """
+    The QR code for `payload` from the cache, or rendered on the worker pool
+    on a miss. Concurrent misses for the same code share one render. Returns
+    None if the render takes longer than `wait` seconds; it finishes in the
+    background and later calls find it in the cache. A failed render is
+    logged and also returns None, so the next call tries again.
+    """
+    key = qr_cache_key(payload, fmt)
+    image = cache.get(key)
+    if image is not None:
+        stats["hits"] += 1
+        return image
+
+    executor = _get_executor()
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            stats["misses"] += 1
+            future = _inflight[key] = executor.submit(
+                _render_and_store, key, payload, fmt
+            )
+        else:
+            stats["coalesced"] += 1
+
+    if wait is None:
+        wait = getattr(settings, "QR_WAIT_SECONDS", 2)
+    try:
+        return future.result(timeout=wait)
+    except TimeoutError:
+        stats["pending"] += 1
+        return None
+    except Exception:
+        stats["errors"] += 1
+        logger.exception("Rendering QR code %s failed", key)
+        return None
@@ -0,0 +1,39 @@
+# events/qr_render.py
+
+# QR rendering only; nothing here imports Django, so process pool workers can
+# load it without setting up the project
+
+import base64
+from io import BytesIO
+
+import qrcode  # type: ignore
+import qrcode.image.svg  # type: ignore
+
+
+def _make_qr(payload):
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    return qr
+
+
+def render_qr_png(payload):
+    buffered = BytesIO()
+    _make_qr(payload).make_image(fill="black", back_color="white").save(
+        buffered, format="PNG"
+    )
+    return buffered.getvalue()
+
+
+def render_qr(payload, fmt="png"):
+    """A base64-encoded PNG, or the SVG markup, for `payload`."""
+    if fmt == "svg":
+        image = _make_qr(payload).make_image(
+            image_factory=qrcode.image.svg.SvgPathImage
+        )
+        return image.to_string(encoding="unicode")
+    return base64.b64encode(render_qr_png(payload)).decode("utf-8")
+
+
+def render_png_batch(payloads):
+    return [render_qr_png(payload) for payload in payloads]
@@ -0,0 +1,60 @@
+# events/querysets.py
+
+from django.db.models import Exists, OuterRef, Prefetch
+from django.db.models.functions import Substr
+
+from .models import ChatRoom, Favorite, RoomMember, Ticket
+
+# Columns the event cards render; schedule is replaced by a short summary
+EVENT_CARD_FIELDS = (
+    "id",
+    "name",
+    "location",
+    "date_time",
+    "category",
+    "image_url",
+    "thumbnail_url",
+    "thumbnail_webp_url",
+    "image_blurhash",
+)
+SUMMARY_LENGTH = 300
+
+
+def event_cards(events, user=None):
+    """
+    Shape an Event queryset for the card grids: only the columns the cards
+    show, the schedule cut down to `summary`, and an `is_favorited` flag for
+    `user` computed in the same query.
+    """
+    events = events.only(*EVENT_CARD_FIELDS).annotate(
+        summary=Substr("schedule", 1, SUMMARY_LENGTH)
+    )
+    if user is not None and user.is_authenticated:
+        events = events.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, event=OuterRef("pk"))
+            )
+        )
+    return events
+
+
+def chat_rooms_for(user):
+    return (
+        ChatRoom.objects.filter(members__user=user)
+        .select_related("event")
+        .only("id", "event__name")
+        .distinct()
+    )
+
+
+def tickets_for(user):
+    return Ticket.objects.filter(user=user).select_related("event")
+
+
+def chat_room_with_members():
+    """Chat rooms with their event, creator and every member's user loaded up front."""
+    return ChatRoom.objects.select_related(
+        "event", "creator__creator"
+    ).prefetch_related(
+        Prefetch("members", queryset=RoomMember.objects.select_related("user"))
+    )
@@ -0,0 +1,115 @@
+# events/roles.py
+
+from dataclasses import dataclass
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.utils.functional import SimpleLazyObject
+
+from .models import CreatorProfile, UserProfile
+
+# Profile changes invalidate the entry straight away; the timeout only
+# bounds how long an entry lingers for users who have gone quiet
+ROLE_CACHE_TIMEOUT = 10 * 60
+
+stats = {"hits": 0, "misses": 0}
+
+
+@dataclass(frozen=True)
+class Role:
+    """What the signed-in user may do, resolved once per request."""
+
+    is_admin: bool = False
+    creator_id: int | None = None
+    user_profile_id: int | None = None
+
+    @property
+    def is_creator(self):
+        return self.creator_id is not None
+
+    @property
+    def is_user(self):
+        return self.user_profile_id is not None
+
+    @property
+    def home(self):
+        """URL name of the landing page for this role."""
+        if self.is_admin:
+            return "event_list"
+        if self.is_creator:
+            return "creator_dashboard"
+        return "user_home"
+
+
+ANONYMOUS = Role()
+
+
+def role_cache_key(user_id):
+    return f"role:{user_id}"
+
+
+def invalidate_role(user_id):
+    if user_id is not None:
+        cache.delete(role_cache_key(user_id))
+
+
+def _profile_ids(user):
+    """(creator profile id, user profile id) for `user` in a single query."""
+    row = (
+        User.objects.filter(pk=user.pk)
+        .annotate(
+            creator_id=Subquery(
+                CreatorProfile.objects.filter(creator=OuterRef("pk")).values("id")[:1]
+            ),
+            user_profile_id=Subquery(
+                UserProfile.objects.filter(user=OuterRef("pk")).values("id")[:1]
+            ),
+        )
+        .values_list("creator_id", "user_profile_id")
+        .first()
+    )
+    return row or (None, None)
+
+
+def get_role(user):
+    if not user.is_authenticated:
+        return ANONYMOUS
+
+    # The profile ids are cached with the account's join time so a reused
+    # primary key can't inherit a deleted account's role
+    key = role_cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == user.date_joined:
+        stats["hits"] += 1
+        _, creator_id, user_profile_id = cached
+    else:
+        stats["misses"] += 1
+        creator_id, user_profile_id = _profile_ids(user)
+        cache.set(
+            key, (user.date_joined, creator_id, user_profile_id), ROLE_CACHE_TIMEOUT
+        )
+    # Superuser status is on the user row already loaded for the request
+    return Role(user.is_superuser, creator_id, user_profile_id)
+
+
+def request_role(request):
+    """`request.role`, resolving it for requests that skipped the middleware."""
+    role = getattr(request, "role", None)
+    if role is None:
+        role = request.role = get_role(request.user)
+    return role
+
+
+class RoleMiddleware:
+    """
+    Exposes the user's role as `request.role`. It is resolved on first use,
+    so views that never check it don't touch the cache.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.role = SimpleLazyObject(lambda: get_role(request.user))
+        return self.get_response(request)
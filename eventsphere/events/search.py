@@ -0,0 +1,196 @@
+# events/search.py
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import Event
+from .querysets import event_cards
+
+# Longer queries add little and make the match expression expensive
+MAX_SEARCH_TERMS = 8
+
+EVENT_TABLE = Event._meta.db_table
+FTS_TABLE = f"{EVENT_TABLE}_fts"
+
+# Postgres keeps a weighted tsvector as a generated column and trigram
+# indexes for typo-tolerant matches on name and location
+POSTGRES_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    ALTER TABLE {EVENT_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'C')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS event_search_vector_idx ON {EVENT_TABLE} USING GIN (search_vector)",
+    f"CREATE INDEX IF NOT EXISTS event_name_trgm_idx ON {EVENT_TABLE} USING GIN (name gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS event_location_trgm_idx ON {EVENT_TABLE} USING GIN (location gin_trgm_ops)",
+]
+
+POSTGRES_DROP_SQL = [
+    "DROP INDEX IF EXISTS event_location_trgm_idx",
+    "DROP INDEX IF EXISTS event_name_trgm_idx",
+    "DROP INDEX IF EXISTS event_search_vector_idx",
+    f"ALTER TABLE {EVENT_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite mirrors the searchable columns into an external-content FTS5 table
+# kept in sync by triggers
+SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {EVENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, location, category)
+            VALUES (new.id, new.name, new.location, new.category);
+        END
+    """,
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {EVENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, location, category)
+            VALUES ('delete', old.id, old.name, old.location, old.category);
+        END
+    """,
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {EVENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, location, category)
+            VALUES ('delete', old.id, old.name, old.location, old.category);
+            INSERT INTO {FTS_TABLE}(rowid, name, location, category)
+            VALUES (new.id, new.name, new.location, new.category);
+        END
+    """,
+}
+
+
+def install_search_index(conn=connection):
+    """
+    Create the search index for the current database if it is missing.
+    Safe to run repeatedly; on SQLite it also restores the sync triggers,
+    which are dropped whenever a migration rebuilds the event table.
+    """
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            for sql in POSTGRES_SEARCH_SQL:
+                cursor.execute(sql)
+        elif conn.vendor == "sqlite" and EVENT_TABLE in conn.introspection.table_names(
+            cursor
+        ):
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"name, location, category, content='{EVENT_TABLE}', "
+                "content_rowid='id', tokenize='unicode61 remove_diacritics 2', "
+                "prefix='2 3')"
+            )
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+                [EVENT_TABLE],
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = [
+                sql for name, sql in SQLITE_TRIGGERS.items() if name not in existing
+            ]
+            for sql in missing:
+                cursor.execute(sql)
+            if missing:
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+                )
+
+
+def remove_search_index(conn=connection):
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            for sql in POSTGRES_DROP_SQL:
+                cursor.execute(sql)
+        elif conn.vendor == "sqlite":
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def search_terms(query):
+    return re.findall(r"\w+", query.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_events(events, query):
+    """
+    Filter `events` to those matching `query` and annotate a `search_rank`
+    (higher is better). Every term is matched as a prefix so results update
+    as the user types.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return events.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if connection.vendor == "postgresql":
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        text = " ".join(terms)
+        return events.filter(
+            RawSQL(
+                f"{EVENT_TABLE}.search_vector @@ to_tsquery('english', %s) "
+                f"OR {EVENT_TABLE}.name %% %s OR {EVENT_TABLE}.location %% %s",
+                [tsquery, text, text],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({EVENT_TABLE}.search_vector, to_tsquery('english', %s)) "
+                f"+ greatest(similarity({EVENT_TABLE}.name, %s), "
+                f"similarity({EVENT_TABLE}.location, %s))",
+                [tsquery, text, text],
+                output_field=FloatField(),
+            )
+        )
+
+    if connection.vendor == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        # The FTS table has no model, so join it in with extra(); bm25() only
+        # works on the table being matched, and is lower for better matches
+        return events.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f"{FTS_TABLE}.rowid = {EVENT_TABLE}.id",
+                f"{FTS_TABLE} MATCH %s",
+            ],
+            params=[match],
+            select={"search_rank": f"-bm25({FTS_TABLE}, 10.0, 2.0, 5.0)"},
+        )
+
+    # No search index on this database: fall back to substring matching
+    matches = Q()
+    for term in terms:
+        matches &= (
+            Q(name__icontains=term)
+            | Q(location__icontains=term)
+            | Q(category__icontains=term)
+        )
+    return events.filter(matches).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+def upcoming_and_past_events(query=None, category=None, now=None, user=None):
+    """
+    Upcoming and past events matching the search, fetched with one query and
+    split in Python. Upcoming events come soonest first and past events most
+    recent first, with better matches ahead of both when searching.
+    """
+    now = now or timezone.now()
+    events = event_cards(Event.objects.all(), user)
+    if category:
+        events = events.filter(category__iexact=category)
+    if query:
+        events = search_events(events, query).order_by("-search_rank", "date_time")
+    else:
+        events = events.order_by("date_time")
+
+    upcoming, past = [], []
+    for event in events:
+        (upcoming if event.date_time >= now else past).append(event)
+    if not query:
+        past.reverse()
+    return upcoming, past
@@ -1,6 +1,19 @@
-from django.db.models.signals import post_save
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
-from .models import Event, ChatRoom
+from .dashboard import invalidate_creator_summary
+from .detail_cache import invalidate_event_detail
+from .maps import invalidate_clusters
+from .roles import invalidate_role
+from .search import install_search_index
+from .models import (
+    AdminProfile,
+    ChatRoom,
+    CreatorProfile,
+    Event,
+    RegisteredEmail,
+    UserProfile,
+)
 
 
 @receiver(post_save, sender=Event)
@@ -8,3 +21,69 @@ def create_chat_room(sender, instance, created, **kwargs):
     # Check if the event is newly created and has a valid 'created_by' field
     if created and instance.created_by:
         ChatRoom.objects.create(event=instance, creator=instance.created_by)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def refresh_creator_summary(sender, instance, **kwargs):
+    invalidate_creator_summary(instance.created_by_id)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def refresh_event_detail(sender, instance, **kwargs):
+    invalidate_event_detail(instance.id)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def refresh_map_clusters(sender, instance, signal, created=False, **kwargs):
+    # An edit may have removed coordinates, so any update invalidates too
+    if instance.latitude is not None or (signal is post_save and not created):
+        invalidate_clusters()
+
+
+@receiver(post_save, sender=CreatorProfile)
+@receiver(post_delete, sender=CreatorProfile)
+def reset_creator_summary(sender, instance, **kwargs):
+    invalidate_creator_summary(instance.id)
+
+
+@receiver(post_save, sender=CreatorProfile)
+@receiver(post_delete, sender=CreatorProfile)
+def reset_creator_role(sender, instance, **kwargs):
+    invalidate_role(instance.creator_id)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def reset_user_role(sender, instance, **kwargs):
+    invalidate_role(instance.user_id)
+
+
+@receiver(post_save, sender=AdminProfile)
+@receiver(post_delete, sender=AdminProfile)
+def register_admin_email(sender, instance, signal, **kwargs):
+    email = instance.email if signal is post_save else None
+    RegisteredEmail.sync(RegisteredEmail.ADMIN, instance.admin_id, email)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def register_user_email(sender, instance, signal, **kwargs):
+    email = instance.email if signal is post_save else None
+    RegisteredEmail.sync(RegisteredEmail.USER, instance.user_id, email)
+
+
+@receiver(post_save, sender=CreatorProfile)
+@receiver(post_delete, sender=CreatorProfile)
+def register_creator_email(sender, instance, signal, **kwargs):
+    email = instance.organization_email if signal is post_save else None
+    RegisteredEmail.sync(RegisteredEmail.CREATOR, instance.creator_id, email)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, app_config, using, **kwargs):
+    # SQLite drops the sync triggers whenever a migration rebuilds the table
+    if app_config.name == "events":
+        install_search_index(connections[using])
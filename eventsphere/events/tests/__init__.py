@@ -0,0 +1,12 @@
+from asgiref.sync import async_to_sync
+
+
+def streamed_content(response):
+    """The full body of a streaming response, whether it streams sync or async."""
+    if not response.is_async:
+        return b"".join(response.streaming_content)
+
+    async def collect():
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    return async_to_sync(collect)()
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.analytics import bucket_series, ticket_timeseries, truncate
+from events.models import Event, Ticket
+
+
+class BucketSeriesTest(TestCase):
+    def test_day_series_is_oldest_first_and_inclusive(self):
+        end = timezone.now()
+        series = bucket_series(end - timedelta(days=7), end, "day")
+        self.assertEqual(len(series), 8)
+        self.assertEqual(series[-1], truncate(end, "day"))
+        self.assertEqual(series, sorted(series))
+
+    def test_week_buckets_start_on_monday(self):
+        end = timezone.now()
+        series = bucket_series(end - timedelta(weeks=4), end, "week")
+        self.assertTrue(all(week.weekday() == 0 for week in series))
+        self.assertTrue(all(week.hour == 0 for week in series))
+
+    def test_too_many_buckets(self):
+        end = timezone.now()
+        with self.assertRaises(ValueError):
+            bucket_series(end - timedelta(days=365), end, "hour")
+
+
+class TicketTimeseriesTest(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Series Event",
+            location="Hall",
+            date_time=timezone.now() + timedelta(days=10),
+            schedule="All day",
+            speakers="Someone",
+            numTickets=100,
+        )
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        self.now = timezone.now()
+
+    def buy(self, user, quantity, days_ago):
+        ticket = Ticket.objects.create(user=user, event=self.event, quantity=quantity)
+        Ticket.objects.filter(pk=ticket.pk).update(
+            created_at=self.now - timedelta(days=days_ago)
+        )
+
+    def test_metrics_in_one_query(self):
+        self.buy(self.alice, 2, days_ago=0)
+        self.buy(self.alice, 1, days_ago=0)
+        self.buy(self.bob, 3, days_ago=0)
+        self.buy(self.bob, 4, days_ago=2)
+        self.buy(self.bob, 9, days_ago=30)
+
+        with self.assertNumQueries(1):
+            series = ticket_timeseries(
+                Ticket.objects.filter(event=self.event),
+                self.now - timedelta(days=7),
+                self.now,
+                "day",
+            )
+
+        self.assertEqual(len(series["labels"]), 8)
+        self.assertEqual(series["tickets_sold"][-1], 6)
+        self.assertEqual(series["unique_users"][-1], 2)
+        self.assertEqual(series["orders"][-1], 3)
+        self.assertEqual(series["tickets_sold"][-3], 4)
+        self.assertEqual(sum(series["tickets_sold"]), 10)
+
+    def test_unknown_bucket(self):
+        with self.assertRaises(ValueError):
+            ticket_timeseries(Ticket.objects.all(), self.now, self.now, "month")
+
+    def test_view_params(self):
+        self.buy(self.alice, 2, days_ago=0)
+        client = Client()
+        url = reverse("fetch_filter_wise_data")
+
+        data = client.get(url, {"event_id": self.event.id, "days": 2}).json()
+        self.assertEqual(len(data["labels"]), 2)
+        self.assertEqual(data["ticket_sales_data"], [0, 2])
+        self.assertEqual(data["orders_data"], [0, 1])
+
+        data = client.get(url, {"days": 2, "bucket": "hour"}).json()
+        self.assertEqual(len(data["labels"]), 48)
+        self.assertEqual(len(data["ticket_sales_data"]), 48)
+        self.assertEqual(sum(data["ticket_sales_data"]), 2)
+
+        start = (self.now - timedelta(days=3)).date().isoformat()
+        data = client.get(url, {"start": start}).json()
+        self.assertEqual(len(data["labels"]), 4)
+
+    def test_view_rejects_bad_params(self):
+        client = Client()
+        url = reverse("fetch_filter_wise_data")
+        for params in (
+            {"bucket": "month"},
+            {"days": "0"},
+            {"days": "many"},
+            {"start": "yesterday"},
+            {"start": "2030-01-01", "end": "2029-01-01"},
+            {"days": "3650", "bucket": "hour"},
+        ):
+            response = client.get(url, params)
+            self.assertEqual(response.status_code, 400, params)
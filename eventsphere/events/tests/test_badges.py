@@ -0,0 +1,110 @@
+import io
+import zipfile
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events import badges
+from events.badges import badge_holders, stream_badge_zip
+from events.models import CreatorProfile, Event, Ticket
+from events.qr_render import render_qr_png
+from events.tests import streamed_content
+
+
+class BadgeExportTest(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username="host", password="pass")
+        profile = CreatorProfile.objects.create(creator=self.creator)
+        self.event = Event.objects.create(
+            name="Conference",
+            location="Hall",
+            date_time=timezone.now() + timezone.timedelta(days=1),
+            schedule="Schedule",
+            speakers="Speaker",
+            created_by=profile,
+        )
+        for i in range(20):
+            user = User.objects.create_user(username=f"attendee{i:02d}")
+            Ticket.objects.create(user=user, event=self.event, quantity=1)
+        Ticket.objects.create(
+            user=User.objects.get(username="attendee00"), event=self.event, quantity=2
+        )
+        self.url = reverse("export_event_badges", args=[self.event.id])
+
+    def read_archive(self, chunks):
+        return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    def export(self, workers):
+        async def collect():
+            return [chunk async for chunk in stream_badge_zip(self.event, workers)]
+
+        return async_to_sync(collect)()
+
+    def test_one_code_per_holder(self):
+        holders = badge_holders(self.event)
+        self.assertEqual(len(holders), 20)
+        self.assertEqual(
+            holders[0],
+            ("attendee00.png", "User: attendee00\nEvent: Conference\nTotal Tickets: 3"),
+        )
+
+        with self.assertLogs("events.badges", "INFO") as logs:
+            chunks = self.export(workers=1)
+        archive = self.read_archive(chunks)
+
+        self.assertEqual(archive.namelist(), [name for name, _ in holders])
+        self.assertEqual(archive.read("attendee00.png"), render_qr_png(holders[0][1]))
+        self.assertIn("codes/sec", logs.output[0])
+
+    def test_archive_is_streamed_a_file_at_a_time(self):
+        chunks = self.export(workers=1)
+        self.assertGreater(len(chunks), 20)
+        self.assertLess(max(len(chunk) for chunk in chunks), 10 * 1024)
+
+    def test_process_pool_matches_in_process(self):
+        codes = badges.stats["codes"]
+        with self.assertLogs("events.badges", "INFO"):
+            pooled = self.read_archive(self.export(workers=2))
+            serial = self.read_archive(self.export(workers=1))
+
+        self.assertEqual(pooled.namelist(), serial.namelist())
+        for name in serial.namelist():
+            self.assertEqual(pooled.read(name), serial.read(name))
+        self.assertEqual(badges.stats["codes"], codes + 40)
+
+        # Later exports reuse the same long-lived pool
+        pool = badges.get_render_pool(2)
+        with self.assertLogs("events.badges", "INFO"):
+            self.export(workers=2)
+        self.assertIs(badges.get_render_pool(2), pool)
+        self.assertNotEqual(pool._mp_context.get_start_method(), "fork")
+
+    def test_view_streams_zip_to_owner(self):
+        client = Client()
+        client.login(username="host", password="pass")
+        with self.assertLogs("events.badges", "INFO"):
+            response = client.get(self.url)
+            self.assertTrue(response.is_async)
+            content = streamed_content(response)
+
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertIn("badges-", response["Content-Disposition"])
+        self.assertEqual(len(self.read_archive([content]).namelist()), 20)
+
+    def test_view_limited_to_event_owner(self):
+        other = User.objects.create_user(username="rival", password="pass")
+        CreatorProfile.objects.create(creator=other)
+        client = Client()
+        client.login(username="rival", password="pass")
+        self.assertEqual(client.get(self.url).status_code, 404)
+
+        attendee = Client()
+        attendee.force_login(User.objects.get(username="attendee01"))
+        self.assertRedirects(
+            attendee.get(self.url),
+            reverse("not_authorized"),
+            fetch_redirect_response=False,
+        )
@@ -2,14 +2,27 @@ import unittest
 import datetime as dt
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
 from channels.testing import WebsocketCommunicator
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from events.consumers import ChatConsumer
 from events.consumers import NotificationConsumer, notify_group_members, json
+from events.consumers import save_notifications
 
-from events.models import ChatRoom, RoomMember
+from events.models import (
+    ChatRoom,
+    CreatorProfile,
+    Event,
+    Notification,
+    NotificationCounter,
+    RoomMember,
+)
 
 
 class ChatConsumerTestCase(unittest.IsolatedAsyncioTestCase):
@@ -154,6 +167,153 @@ class ChatConsumerTestCase(unittest.IsolatedAsyncioTestCase):
 
         await communicator.disconnect()
 
+    @patch("events.consumers.notification_queue.enqueue", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_chat_room", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_room_member", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.save_message", new_callable=AsyncMock)
+    async def test_receive_uses_cached_room(
+        self,
+        mock_save_message,
+        mock_get_room_member,
+        mock_get_chat_room,
+        mock_enqueue,
+    ):
+        """Messages reuse the room and event name loaded on connect."""
+        mock_chat_room = MagicMock(spec=ChatRoom)
+        mock_chat_room.event.name = "Cached Event"
+        mock_get_chat_room.return_value = mock_chat_room
+        mock_get_room_member.return_value = MagicMock(spec=RoomMember, is_kicked=False)
+
+        communicator = WebsocketCommunicator(
+            application=ChatConsumer.as_asgi(),
+            path=f"/ws/chat/{self.room_id}/",
+        )
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = self.url_route
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        for text in ("first", "second"):
+            await communicator.send_json_to({"message": text})
+            response = json.loads(await communicator.receive_from())
+            self.assertEqual(response["message"], text)
+
+        mock_get_chat_room.assert_awaited_once()
+        mock_get_room_member.assert_awaited_once()
+        self.assertEqual(mock_save_message.await_count, 2)
+        mock_enqueue.assert_awaited_with(
+            notify_group_members,
+            mock_chat_room,
+            self.user,
+            "second",
+            "chat_message",
+            "Cached Event",
+        )
+
+        await communicator.disconnect()
+
+    @patch("events.consumers.ChatConsumer.get_chat_room", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_room_member", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.save_message", new_callable=AsyncMock)
+    async def test_user_kicked_invalidates_membership(
+        self, mock_save_message, mock_get_room_member, mock_get_chat_room
+    ):
+        """A kick event marks the cached membership and closes the socket."""
+        mock_get_chat_room.return_value = MagicMock(spec=ChatRoom)
+        member = MagicMock(spec=RoomMember, is_kicked=False)
+        mock_get_room_member.return_value = member
+
+        communicator = WebsocketCommunicator(
+            application=ChatConsumer.as_asgi(),
+            path=f"/ws/chat/{self.room_id}/",
+        )
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = self.url_route
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await get_channel_layer().group_send(
+            self.group_name, {"type": "user_kicked", "user_id": self.user.id}
+        )
+
+        response = json.loads(await communicator.receive_from())
+        self.assertEqual(response, {"type": "user_kicked"})
+        self.assertTrue(member.is_kicked)
+        closed = await communicator.receive_output()
+        self.assertEqual(closed["type"], "websocket.close")
+        mock_save_message.assert_not_awaited()
+
+        await communicator.disconnect()
+
+    @override_settings(CHAT_WRITE_BEHIND=True)
+    @patch("events.consumers.notification_queue.enqueue", new_callable=AsyncMock)
+    @patch("events.consumers.chat_message_buffer.flush", new_callable=AsyncMock)
+    @patch("events.consumers.chat_message_buffer.add", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_chat_room", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_room_member", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.save_message", new_callable=AsyncMock)
+    async def test_write_behind_buffers_messages(
+        self,
+        mock_save_message,
+        mock_get_room_member,
+        mock_get_chat_room,
+        mock_buffer_add,
+        mock_buffer_flush,
+        mock_enqueue,
+    ):
+        """With write-behind on, messages are buffered and flushed on disconnect."""
+        mock_get_chat_room.return_value = MagicMock(spec=ChatRoom)
+        mock_get_room_member.return_value = MagicMock(spec=RoomMember, is_kicked=False)
+
+        communicator = WebsocketCommunicator(
+            application=ChatConsumer.as_asgi(),
+            path=f"/ws/chat/{self.room_id}/",
+        )
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = self.url_route
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to({"message": "buffered"})
+        await communicator.receive_from()
+        await communicator.disconnect()
+
+        mock_buffer_add.assert_awaited_once_with(self.room_id, self.user, "buffered")
+        mock_save_message.assert_not_awaited()
+        mock_buffer_flush.assert_awaited_once_with(self.room_id)
+
+    @patch("events.consumers.notification_queue.enqueue", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_chat_room", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_room_member", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.save_message", new_callable=AsyncMock)
+    async def test_non_text_message_is_rejected(
+        self, mock_save_message, mock_get_room_member, mock_get_chat_room, _
+    ):
+        """A message that isn't a string gets an error frame, not a crash."""
+        mock_get_chat_room.return_value = MagicMock(spec=ChatRoom)
+        mock_get_room_member.return_value = MagicMock(spec=RoomMember, is_kicked=False)
+
+        communicator = WebsocketCommunicator(
+            application=ChatConsumer.as_asgi(),
+            path=f"/ws/chat/{self.room_id}/",
+        )
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = self.url_route
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to({"message": 5})
+        response = json.loads(await communicator.receive_from())
+        self.assertEqual(response["type"], "invalid_message")
+
+        # The socket is still usable afterwards
+        await communicator.send_json_to({"message": "hello"})
+        response = json.loads(await communicator.receive_from())
+        self.assertEqual(response["message"], "hello")
+        mock_save_message.assert_awaited_once_with("hello", self.user)
+
+        await communicator.disconnect()
+
 
 class NotificationConsumerTestCase(TestCase):
 
@@ -197,12 +357,12 @@ class NotifyGroupMembersTestCase(unittest.IsolatedAsyncioTestCase):
     @patch("events.consumers.get_channel_layer")
     @patch("events.consumers.get_all_members_except_sender")
     @patch("events.consumers.get_event_name")
-    @patch("events.consumers.save_notification")
+    @patch("events.consumers.save_notifications")
     @patch("django.utils.timezone.now")
     async def test_notify_group_members(
         self,
         mock_now,
-        mock_save_notification,
+        mock_save_notifications,
         mock_get_event_name,
         mock_get_all_members_except_sender,
         mock_get_channel_layer,
@@ -223,9 +383,9 @@ class NotifyGroupMembersTestCase(unittest.IsolatedAsyncioTestCase):
         msg_type = "chat_message"
 
         mock_members = [
-            MagicMock(user=MagicMock(id=1)),
-            MagicMock(user=MagicMock(id=2)),
-            MagicMock(user=MagicMock(id=3)),
+            MagicMock(user_id=1),
+            MagicMock(user_id=2),
+            MagicMock(user_id=3),
         ]
         mock_get_all_members_except_sender.return_value = mock_members
 
@@ -233,7 +393,7 @@ class NotifyGroupMembersTestCase(unittest.IsolatedAsyncioTestCase):
         mock_get_event_name.return_value = mock_event_name
         mock_notif_url_path = "1"
 
-        mock_save_notification.side_effect = [101, 102, 103]
+        mock_save_notifications.return_value = [101, 102, 103]
 
         fixed_time = dt.datetime(
             2024, 4, 1, 12, 0, tzinfo=dt.timezone.utc
@@ -256,21 +416,18 @@ class NotifyGroupMembersTestCase(unittest.IsolatedAsyncioTestCase):
         expected_title = (
             "New Message" if msg_type == "chat_message" else "New Announcement"
         )
-        for member, notif_id in zip(mock_members, [101, 102, 103]):
-            mock_save_notification.assert_any_await(
-                mock_room,
-                member,
-                message,
-                expected_title,
-                mock_event_name,
-                mock_notif_url_path,
-            )
-
-        self.assertEqual(mock_save_notification.await_count, len(mock_members))
+        # All notifications are persisted with a single bulk call
+        mock_save_notifications.assert_awaited_once_with(
+            mock_members,
+            message,
+            expected_title,
+            mock_event_name,
+            mock_notif_url_path,
+        )
 
         for member, notif_id in zip(mock_members, [101, 102, 103]):
             mock_group_send.assert_any_await(
-                f"notifications_{member.user.id}",
+                f"notifications_{member.user_id}",
                 {
                     "type": "send_notification",
                     "data": {
@@ -288,3 +445,81 @@ class NotifyGroupMembersTestCase(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(mock_group_send.await_count, len(mock_members))
 
         mock_get_channel_layer.assert_called_once()
+
+    @patch("events.consumers.get_channel_layer")
+    @patch("events.consumers.get_all_members_except_sender")
+    @patch("events.consumers.get_event_name")
+    @patch("events.consumers.save_notifications")
+    async def test_notify_group_members_no_members(
+        self,
+        mock_save_notifications,
+        mock_get_event_name,
+        mock_get_all_members_except_sender,
+        mock_get_channel_layer,
+    ):
+        """Nothing is written or sent when the sender is alone in the room."""
+        mock_get_all_members_except_sender.return_value = []
+        mock_channel_layer = AsyncMock()
+        mock_get_channel_layer.return_value = mock_channel_layer
+
+        await notify_group_members(MagicMock(id=1), MagicMock(), "Hi", "chat_message")
+
+        mock_save_notifications.assert_not_awaited()
+        mock_get_event_name.assert_not_awaited()
+        mock_channel_layer.group_send.assert_not_awaited()
+
+
+class SaveNotificationsTestCase(TestCase):
+    def setUp(self):
+        self.creator_user = User.objects.create_user(
+            username="creator", password="pass"
+        )
+        creator = CreatorProfile.objects.create(creator=self.creator_user)
+        event = Event.objects.create(
+            name="Fan-out Event",
+            location="Hall",
+            date_time=timezone.now(),
+            schedule="All day",
+            speakers="Someone",
+            created_by=creator,
+        )
+        self.room = ChatRoom.objects.get(event=event)
+        self.members = [
+            RoomMember.objects.create(
+                room=self.room,
+                user=User.objects.create_user(username=f"member{i}", password="p"),
+            )
+            for i in range(5)
+        ]
+
+    def test_save_notifications_is_batched(self):
+        """The number of queries doesn't grow with the number of members."""
+        with CaptureQueriesContext(connection) as single:
+            async_to_sync(save_notifications)(
+                self.members[:1], "Hello", "New Message", "Fan-out Event", "1"
+            )
+        with CaptureQueriesContext(connection) as many:
+            notif_ids = async_to_sync(save_notifications)(
+                self.members, "Hello", "New Message", "Fan-out Event", "1"
+            )
+
+        self.assertEqual(len(single.captured_queries), len(many.captured_queries))
+        self.assertEqual(len(notif_ids), len(self.members))
+        notifs = Notification.objects.filter(id__in=notif_ids)
+        self.assertEqual(
+            sorted(notifs.values_list("user_id", flat=True)),
+            sorted(member.user_id for member in self.members),
+        )
+
+    def test_save_notifications_updates_unread_counters(self):
+        async_to_sync(save_notifications)(
+            self.members, "Hello", "New Message", "Fan-out Event", "1"
+        )
+        async_to_sync(save_notifications)(
+            self.members[:2], "Again", "New Message", "Fan-out Event", "1"
+        )
+
+        counts = [
+            NotificationCounter.unread_for(member.user) for member in self.members
+        ]
+        self.assertEqual(counts, [2, 2, 1, 1, 1])
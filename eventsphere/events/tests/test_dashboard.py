@@ -0,0 +1,108 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.dashboard import compute_creator_summary, get_creator_summary
+from events.models import CreatorProfile, Event, UserProfile
+
+
+class CreatorSummaryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator_user = User.objects.create_user(
+            username="creator", password="creatorpass"
+        )
+        self.creator = CreatorProfile.objects.create(creator=self.creator_user)
+        upcoming = timezone.now() + timezone.timedelta(days=5)
+        past = timezone.now() - timezone.timedelta(days=5)
+        for category, date_time, capacity, sold in (
+            ("Music", upcoming, 100, 25),
+            ("Music", upcoming, 100, 75),
+            ("Sports", upcoming, 50, 0),
+            ("Sports", past, 40, 30),
+        ):
+            self.event = Event.objects.create(
+                name=f"{category} event",
+                location="Venue",
+                date_time=date_time,
+                schedule="Schedule",
+                speakers="Speakers",
+                category=category,
+                numTickets=capacity,
+                ticketsSold=sold,
+                created_by=self.creator,
+            )
+
+    def test_compute_summary(self):
+        summary = compute_creator_summary(self.creator)
+
+        self.assertEqual(summary["categories"], ["Music", "Sports"])
+        self.assertEqual(
+            summary["category_wise_tickets_sold"],
+            [
+                {"category": "Music", "total_sold": 100},
+                {"category": "Sports", "total_sold": 0},
+            ],
+        )
+        self.assertEqual(
+            [
+                row["percentage_sold"]
+                for row in summary["category_wise_percentage_sold"]
+            ],
+            [50.0, 0.0],
+        )
+        self.assertEqual(
+            summary["unsold_tickets_data"],
+            [
+                {
+                    "category": "Sports",
+                    "unsold_tickets": 10,
+                    "total_capacity": 40,
+                    "percentage_unsold": 25.0,
+                }
+            ],
+        )
+
+    def test_summary_is_cached(self):
+        get_creator_summary(self.creator)
+        with self.assertNumQueries(0):
+            get_creator_summary(self.creator)
+
+    def test_event_change_invalidates_summary(self):
+        get_creator_summary(self.creator)
+        self.event.numTickets = 80
+        self.event.save()
+
+        summary = get_creator_summary(self.creator)
+        self.assertEqual(summary["unsold_tickets_data"][0]["unsold_tickets"], 50)
+
+    def test_ticket_purchase_invalidates_summary(self):
+        get_creator_summary(self.creator)
+        buyer = User.objects.create_user(username="buyer", password="buyerpass")
+        UserProfile.objects.create(user=buyer)
+        music_event = Event.objects.filter(category="Music").first()
+
+        client = Client()
+        client.login(username="buyer", password="buyerpass")
+        client.post(
+            reverse("buy_tickets", args=[music_event.id]),
+            {"email": "buyer@example.com", "phone_number": "1234567890", "quantity": 2},
+        )
+
+        summary = get_creator_summary(self.creator)
+        self.assertEqual(summary["category_wise_tickets_sold"][0]["total_sold"], 102)
+
+    def test_dashboard_serves_cached_summary(self):
+        client = Client()
+        client.login(username="creator", password="creatorpass")
+        client.get(reverse("creator_dashboard"))
+
+        with patch("events.dashboard.compute_creator_summary") as mock_compute:
+            response = client.get(reverse("creator_dashboard"))
+
+        mock_compute.assert_not_called()
+        self.assertEqual(len(response.context["category_wise_tickets_sold"]), 2)
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from channels.layers import InMemoryChannelLayer
+from django.conf import settings
+
+from events.consumers import notify_group_members
+from events.delivery import DeliveryQueue, lifespan
+
+
+class DeliveryQueueTestCase(unittest.IsolatedAsyncioTestCase):
+    @patch("events.consumers.get_channel_layer")
+    @patch("events.consumers.get_all_members_except_sender")
+    @patch("events.consumers.get_event_name")
+    @patch("events.consumers.save_notifications")
+    async def test_notifications_delivered_in_background(
+        self,
+        mock_save_notifications,
+        mock_get_event_name,
+        mock_get_all_members_except_sender,
+        mock_get_channel_layer,
+    ):
+        """Queued fan-out jobs reach members' notification groups."""
+        channel_layer = InMemoryChannelLayer()
+        mock_get_channel_layer.return_value = channel_layer
+        mock_get_all_members_except_sender.return_value = [MagicMock(user_id=7)]
+        mock_get_event_name.return_value = "Test Event"
+        mock_save_notifications.return_value = [42]
+
+        channel_name = await channel_layer.new_channel()
+        await channel_layer.group_add("notifications_7", channel_name)
+
+        queue = DeliveryQueue(maxsize=10)
+        await queue.enqueue(
+            notify_group_members, MagicMock(id=1), MagicMock(), "Hi", "chat_message"
+        )
+        await queue.drain()
+
+        received = await channel_layer.receive(channel_name)
+        self.assertEqual(received["type"], "send_notification")
+        self.assertEqual(received["data"]["id"], 42)
+        self.assertEqual(received["data"]["message"], "Hi")
+        self.assertEqual(queue.stats["delivered"], 1)
+        self.assertEqual(queue.depth, 0)
+
+        await queue.shutdown()
+
+    async def test_full_queue_applies_backpressure(self):
+        """Producers wait for a free slot once the buffer is full."""
+        release = asyncio.Event()
+
+        async def wait_for_release():
+            await release.wait()
+
+        job = AsyncMock(side_effect=wait_for_release)
+        queue = DeliveryQueue(maxsize=1)
+
+        await queue.enqueue(job)
+        await asyncio.sleep(0)  # let the worker pick up the first job
+        await queue.enqueue(job)
+        blocked = asyncio.create_task(queue.enqueue(job))
+        await asyncio.sleep(0)
+
+        self.assertFalse(blocked.done())
+        self.assertEqual(queue.stats["blocked"], 1)
+
+        release.set()
+        await blocked
+        await queue.drain()
+
+        self.assertEqual(job.await_count, 3)
+        self.assertEqual(queue.stats["delivered"], 3)
+        self.assertEqual(queue.stats["max_depth"], 1)
+
+        await queue.shutdown()
+
+    async def test_failed_job_does_not_stop_worker(self):
+        failing = AsyncMock(side_effect=RuntimeError("boom"))
+        succeeding = AsyncMock()
+        queue = DeliveryQueue(maxsize=10)
+
+        with self.assertLogs("events.delivery", level="ERROR"):
+            await queue.enqueue(failing)
+            await queue.enqueue(succeeding)
+            await queue.drain()
+
+        succeeding.assert_awaited_once()
+        self.assertEqual(queue.stats["failed"], 1)
+        self.assertEqual(queue.stats["delivered"], 1)
+
+        await queue.shutdown()
+
+    async def test_shutdown_drains_pending_jobs(self):
+        job = AsyncMock()
+        queue = DeliveryQueue(maxsize=10)
+        for _ in range(5):
+            await queue.enqueue(job)
+
+        await queue.shutdown()
+
+        self.assertEqual(job.await_count, 5)
+        self.assertIsNone(queue._worker)
+
+    async def test_lifespan_runs_shutdown_hooks(self):
+        hook = AsyncMock()
+        messages = asyncio.Queue()
+        await messages.put({"type": "lifespan.startup"})
+        await messages.put({"type": "lifespan.shutdown"})
+        send = AsyncMock()
+
+        with patch("events.delivery.shutdown_hooks", [hook]):
+            await lifespan({"type": "lifespan"}, messages.get, send)
+
+        hook.assert_awaited_once()
+        send.assert_any_await({"type": "lifespan.startup.complete"})
+        send.assert_any_await({"type": "lifespan.shutdown.complete"})
+
+
+# Serves the project with daphne, queues a slow job, then sends the process
+# SIGTERM the way a deploy or restart would
+DAPHNE_SHUTDOWN_SCRIPT = textwrap.dedent(
+    """
+    import asyncio, os, signal, sys
+
+    import django
+
+    django.setup()
+    from daphne.server import Server
+    from twisted.internet import reactor
+
+    from eventsphere.asgi import application
+    from events.delivery import notification_queue
+
+    async def job():
+        await asyncio.sleep(0.2)
+        with open(sys.argv[1], "w") as f:
+            f.write("delivered")
+
+    async def enqueue_then_terminate():
+        await notification_queue.enqueue(job)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    reactor.callLater(0.1, lambda: asyncio.ensure_future(enqueue_then_terminate()))
+    Server(application, endpoints=["tcp:port=0:interface=127.0.0.1"]).run()
+    """
+)
+
+
+class DaphneShutdownTestCase(unittest.TestCase):
+    def test_queued_jobs_finish_when_daphne_stops(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            marker = Path(tmp) / "delivered"
+            # "test" in argv selects the test settings in the child too
+            result = subprocess.run(
+                [sys.executable, "-c", DAPHNE_SHUTDOWN_SCRIPT, str(marker), "test"],
+                cwd=settings.BASE_DIR,
+                env={
+                    **os.environ,
+                    "DJANGO_SETTINGS_MODULE": "eventsphere.settings",
+                },
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertTrue(marker.exists(), result.stderr)
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events import detail_cache
+from events.detail_cache import get_event_detail, version_key
+from events.models import Event, Favorite
+
+
+class EventDetailCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(
+            name="Ticket Drop",
+            location="Arena",
+            date_time=timezone.now() + timedelta(days=3),
+            schedule="Doors at 7\n\nHeadliner at 9",
+            speakers="Headliner",
+            numTickets=100,
+            ticketsSold=10,
+        )
+        self.user = User.objects.create_user(username="fan", password="pass")
+        self.client = Client()
+        self.client.login(username="fan", password="pass")
+        self.url = reverse("event_detail", args=[self.event.id])
+
+    def test_body_is_rendered_once(self):
+        hits = detail_cache.stats["hits"]
+        first = get_event_detail(self.event.id)
+        with self.assertNumQueries(0):
+            second = get_event_detail(self.event.id)
+
+        self.assertEqual(first["body"], second["body"])
+        self.assertIn("<p>Headliner at 9</p>", first["body"])
+        self.assertEqual(detail_cache.stats["hits"], hits + 1)
+
+    def test_view_uses_one_query_per_request_when_cached(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertContains(response, "Headliner at 9")
+
+        # Session and user lookups, plus the live ticket/favorite state
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_save_invalidates(self):
+        self.client.get(self.url)
+        self.event.schedule = "Rescheduled to noon"
+        self.event.save()
+
+        response = self.client.get(self.url)
+        self.assertContains(response, "Rescheduled to noon")
+        self.assertNotContains(response, "Headliner at 9")
+
+    def test_tickets_left_and_favorite_are_live(self):
+        self.client.get(self.url)
+        Event.objects.filter(id=self.event.id).update(ticketsSold=F("ticketsSold") + 5)
+        Favorite.objects.create(user=self.user, event=self.event)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["event"].tickets_left, 85)
+        self.assertTrue(response.context["is_favorited"])
+
+        other = Client()
+        User.objects.create_user(username="other", password="pass")
+        other.login(username="other", password="pass")
+        self.assertFalse(other.get(self.url).context["is_favorited"])
+        self.assertFalse(Client().get(self.url).context["is_favorited"])
+
+    def test_deleted_event_is_not_served_from_cache(self):
+        self.client.get(self.url)
+        Event.objects.filter(id=self.event.id).delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_evicted_version_does_not_revive_old_body(self):
+        get_event_detail(self.event.id)
+        Event.objects.filter(id=self.event.id).update(schedule="Changed quietly")
+        cache.delete(version_key(self.event.id))
+
+        self.assertIn("Changed quietly", get_event_detail(self.event.id)["body"])
@@ -0,0 +1,114 @@
+from importlib import import_module
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase
+from django.urls import reverse
+
+from events.mail import send_queued_mail
+from events.models import AdminProfile, CreatorProfile, RegisteredEmail, UserProfile
+
+
+class RegisteredEmailTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="sam", password="pass")
+
+    def test_profiles_are_kept_in_sync(self):
+        profile = UserProfile.objects.create(user=self.user, email=" Sam@Example.com")
+        row = RegisteredEmail.objects.get(user=self.user)
+        self.assertEqual(row.normalized_email, "sam@example.com")
+        self.assertTrue(RegisteredEmail.in_use("SAM@example.COM"))
+
+        profile.email = "sam@new.example.com"
+        profile.save()
+        self.assertFalse(RegisteredEmail.in_use("sam@example.com"))
+        self.assertTrue(RegisteredEmail.in_use("sam@new.example.com"))
+
+        profile.delete()
+        self.assertFalse(RegisteredEmail.objects.exists())
+
+    def test_blank_email_is_not_registered(self):
+        CreatorProfile.objects.create(creator=self.user, organization_email="")
+        self.assertFalse(RegisteredEmail.objects.exists())
+
+    def test_reset_goes_to_highest_ranked_profile(self):
+        AdminProfile.objects.create(admin=self.user, email="admin@example.com")
+        CreatorProfile.objects.create(
+            creator=self.user, organization_email="org@example.com"
+        )
+
+        with self.assertNumQueries(1):
+            addresses = RegisteredEmail.reset_addresses("ORG@example.com")
+        self.assertEqual(addresses, {self.user: "admin@example.com"})
+
+    def test_signup_rejects_address_in_any_case(self):
+        CreatorProfile.objects.create(
+            creator=self.user, organization_email="org@example.com"
+        )
+        response = self.client.post(
+            reverse("signup"),
+            {
+                "username": "newcomer",
+                "email": "Org@Example.com",
+                "password": "pass",
+                "confirm_password": "pass",
+                "user_type": "user",
+            },
+        )
+        self.assertContains(response, "This email is already in use.")
+        self.assertFalse(User.objects.filter(username="newcomer").exists())
+
+    def test_each_user_gets_their_own_reset_link(self):
+        other = User.objects.create_user(username="alex", password="pass")
+        UserProfile.objects.create(user=self.user, email="shared@example.com")
+        CreatorProfile.objects.create(
+            creator=other, organization_email="Shared@example.com"
+        )
+
+        self.client.post(reverse("password_reset"), {"email": "shared@example.com"})
+        send_queued_mail()
+
+        sent = {message.to[0]: message.body for message in mail.outbox}
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn("Hi sam,", sent["shared@example.com"])
+        self.assertIn("Hi alex,", sent["Shared@example.com"])
+
+    def test_backfill_rebuilds_from_profiles(self):
+        UserProfile.objects.create(user=self.user, email="sam@example.com")
+        RegisteredEmail.objects.all().delete()
+        stale = User.objects.create_user(username="gone")
+        RegisteredEmail.objects.create(
+            user=stale, source="user", email="x@y.z", normalized_email="x@y.z"
+        )
+
+        out = StringIO()
+        call_command("backfill_registered_emails", stdout=out)
+        call_command("backfill_registered_emails", stdout=out)
+
+        self.assertEqual(
+            list(RegisteredEmail.objects.values_list("user", "normalized_email")),
+            [(self.user.id, "sam@example.com")],
+        )
+        self.assertIn("Registered 1 profile emails.", out.getvalue())
+
+    def test_migration_registers_existing_profiles(self):
+        UserProfile.objects.create(user=self.user, email=" Sam@Example.com")
+        creator = User.objects.create_user(username="host")
+        CreatorProfile.objects.create(creator=creator, organization_email="")
+        RegisteredEmail.objects.all().delete()
+
+        # Run against the historical models, as it would be during migrate
+        state = MigrationLoader(connection).project_state(
+            ("events", "0034_registered_email")
+        )
+        migration = import_module("events.migrations.0034_registered_email")
+        migration.register_profile_emails(state.apps, None)
+
+        self.assertEqual(
+            list(RegisteredEmail.objects.values_list("user", "normalized_email")),
+            [(self.user.id, "sam@example.com")],
+        )
@@ -16,6 +16,7 @@ from events.models import (
 from django.contrib.auth.models import User
 from django.test import TestCase, Client
 from django.core import mail
+from events.mail import send_queued_mail
 from django.urls import reverse
 from events.forms import (
     UserProfileForm,
@@ -433,6 +434,8 @@ class ForgotPasswordTest(TestCase):
         )
         # Check redirect to 'password_reset_done'
         self.assertRedirects(response, reverse("password_reset_done"))
+        # Deliver the queued message
+        send_queued_mail()
         # Check that one email was sent
         self.assertEqual(len(mail.outbox), 1)
         # Verify email details
@@ -450,6 +453,8 @@ class ForgotPasswordTest(TestCase):
         )
         # Check redirect to 'password_reset_done'
         self.assertRedirects(response, reverse("password_reset_done"))
+        # Deliver the queued message
+        send_queued_mail()
         # Check that one email was sent
         self.assertEqual(len(mail.outbox), 1)
         # Verify email details
@@ -467,6 +472,8 @@ class ForgotPasswordTest(TestCase):
         )
         # Check redirect to 'password_reset_done'
         self.assertRedirects(response, reverse("password_reset_done"))
+        # Deliver the queued message
+        send_queued_mail()
         # Check that one email was sent
         self.assertEqual(len(mail.outbox), 1)
         # Verify email details
@@ -614,6 +621,7 @@ class ForgotPasswordTest(TestCase):
             reverse("password_reset"), {"email": "adminuser@yopmail.com"}
         )
         self.assertRedirects(response, reverse("password_reset_done"))
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
 
         email = mail.outbox[0]
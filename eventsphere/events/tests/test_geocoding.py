@@ -0,0 +1,279 @@
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events import geocoding
+from events.detail_cache import current_version
+from events.geocoding import (
+    GeocodingError,
+    GeocodingThrottled,
+    NominatimGeocoder,
+    Throttle,
+    geocode,
+    geocode_address,
+)
+from events.models import CreatorProfile, Event, GeocodeCache
+
+PLACES = {
+    "Madison Square Garden, New York, NY": (40.7505, -73.9934),
+    "Barclays Center, Brooklyn, NY": (40.6826, -73.9754),
+    "Yankee Stadium, Bronx, NY": (40.8296, -73.9262),
+}
+
+
+@override_settings(
+    GEOCODER="events.geocoding.StaticGeocoder", GEOCODER_STATIC_PLACES=PLACES
+)
+class GeocodeTest(TestCase):
+    def setUp(self):
+        geocoding._geocoders.clear()
+
+    def test_results_are_cached(self):
+        first = geocode("Madison  square GARDEN")
+        second = geocode("madison square garden")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["lat"], 40.7505)
+        self.assertEqual(geocoding.get_geocoder().calls, 1)
+        self.assertEqual(GeocodeCache.objects.count(), 1)
+
+    def test_empty_results_are_cached(self):
+        self.assertEqual(geocode("Nowhere at all"), [])
+        self.assertEqual(geocode("nowhere at all"), [])
+        self.assertEqual(geocoding.get_geocoder().calls, 1)
+
+    def test_country_codes_are_part_of_the_key(self):
+        geocode("Barclays Center", "us")
+        geocode("Barclays Center")
+        self.assertEqual(geocoding.get_geocoder().calls, 2)
+
+    @override_settings(GEOCODE_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_entries_are_evicted(self):
+        geocode("Madison")
+        geocode("Barclays")
+        # Make the first entry stale enough to be touched on its next hit
+        GeocodeCache.objects.filter(query=geocoding.cache_key("Madison")).update(
+            last_used_at=timezone.now() - timedelta(days=1)
+        )
+        GeocodeCache.objects.filter(query=geocoding.cache_key("Barclays")).update(
+            last_used_at=timezone.now() - timedelta(days=2)
+        )
+        geocode("Madison")
+        geocode("Yankee")
+
+        self.assertEqual(
+            set(GeocodeCache.objects.values_list("query", flat=True)),
+            {geocoding.cache_key("Madison"), geocoding.cache_key("Yankee")},
+        )
+
+    def test_long_queries_do_not_collide(self):
+        prefix = "Madison Square Garden " * 20
+        first = geocoding.cache_key(prefix + "north entrance")
+        second = geocoding.cache_key(prefix + "south entrance")
+        self.assertNotEqual(first, second)
+        self.assertLessEqual(len(first), 255)
+
+    def test_provider_errors_are_not_cached(self):
+        with (
+            patch.object(
+                geocoding.StaticGeocoder, "search", side_effect=GeocodingError("down")
+            ),
+            self.assertLogs("events.geocoding", "WARNING"),
+        ):
+            self.assertIsNone(geocode_address("Madison Square Garden"))
+        self.assertFalse(GeocodeCache.objects.exists())
+        self.assertEqual(geocode_address("Madison Square Garden"), (40.7505, -73.9934))
+
+
+class ThrottleTest(TestCase):
+    def test_busy_throttle_turns_callers_away(self):
+        throttle = Throttle(60)
+        self.assertEqual(throttle.acquire(), 0.0)
+        started = time.monotonic()
+        retry_after = throttle.acquire()
+        self.assertGreater(retry_after, 59)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_nominatim_raises_instead_of_sleeping(self):
+        geocoder = NominatimGeocoder(interval=60)
+        geocoder.throttle.acquire()
+        with (
+            patch("events.geocoding.urlopen") as mock_urlopen,
+            self.assertRaises(GeocodingThrottled),
+        ):
+            geocoder.search("Somewhere new")
+        mock_urlopen.assert_not_called()
+
+
+class SlowGeocoder:
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def search(self, query, country_codes=None, limit=5):
+        self.calls += 1
+        self.release.wait(5)
+        return [{"display_name": query, "lat": 1.0, "lon": 2.0}]
+
+
+class CoalescingTest(TransactionTestCase):
+    def test_concurrent_lookups_share_one_call(self):
+        provider = SlowGeocoder()
+        results = []
+        coalesced = geocoding.stats["coalesced"]
+
+        def lookup():
+            try:
+                results.append(geocode("Coalesced Hall"))
+            finally:
+                connection.close()
+
+        with patch("events.geocoding.get_geocoder", return_value=provider):
+            threads = [threading.Thread(target=lookup) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 5
+            while (
+                geocoding.stats["coalesced"] - coalesced < 4
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.01)
+            provider.release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result == results[0] for result in results))
+
+
+@override_settings(
+    GEOCODER="events.geocoding.StaticGeocoder", GEOCODER_STATIC_PLACES=PLACES
+)
+class GeocodeViewsTest(TestCase):
+    def setUp(self):
+        geocoding._geocoders.clear()
+        self.client = Client()
+        user = User.objects.create_user(username="creator", password="pass")
+        self.creator = CreatorProfile.objects.create(creator=user)
+        self.client.login(username="creator", password="pass")
+
+    def test_geocode_search(self):
+        response = self.client.get(reverse("geocode_search"), {"q": "stadium"})
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "display_name": "Yankee Stadium, Bronx, NY",
+                    "lat": 40.8296,
+                    "lon": -73.9262,
+                }
+            ],
+        )
+
+        response = self.client.get(reverse("geocode_search"), {"q": "ya"})
+        self.assertEqual(response.json()["results"], [])
+
+    def test_geocode_search_provider_down(self):
+        with patch.object(
+            geocoding.StaticGeocoder, "search", side_effect=GeocodingError("down")
+        ):
+            response = self.client.get(reverse("geocode_search"), {"q": "stadium"})
+        self.assertEqual(response.status_code, 502)
+
+    def test_geocode_search_throttled(self):
+        geocode("stadium")
+        with patch.object(
+            geocoding.StaticGeocoder, "search", side_effect=GeocodingThrottled(0.4)
+        ):
+            response = self.client.get(reverse("geocode_search"), {"q": "barclays"})
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response["Retry-After"], "1")
+
+            # Queries already in the cache are still answered
+            response = self.client.get(reverse("geocode_search"), {"q": "stadium"})
+            self.assertEqual(response.status_code, 200)
+
+    def test_create_event_geocodes_typed_address(self):
+        self.client.post(
+            reverse("create_event"),
+            {
+                "name": "Typed Address",
+                "location": "Barclays Center",
+                "date_time": "2030-01-01 18:00",
+                "schedule": "Evening",
+                "speakers": "Someone",
+                "category": "Sports",
+                "numTickets": 10,
+            },
+        )
+        event = Event.objects.get(name="Typed Address")
+        self.assertEqual((event.latitude, event.longitude), (40.6826, -73.9754))
+
+    def test_backfill_event_coordinates(self):
+        for name, location in [
+            ("A", "Yankee Stadium"),
+            ("B", "Yankee Stadium"),
+            ("C", "Unknown Venue"),
+        ]:
+            Event.objects.create(
+                name=name,
+                location=location,
+                date_time=timezone.now() + timedelta(days=1),
+                schedule="",
+                speakers="",
+            )
+
+        out = StringIO()
+        call_command("backfill_event_coordinates", delay=0, stdout=out)
+
+        self.assertIn("Geocoded 1 of 2 locations, updated 2 events.", out.getvalue())
+        self.assertEqual(
+            set(Event.objects.values_list("name", "latitude")),
+            {("A", 40.8296), ("B", 40.8296), ("C", None)},
+        )
+        self.assertEqual(geocoding.get_geocoder().calls, 2)
+
+    def test_backfill_retries_throttled_lookups(self):
+        event = Event.objects.create(
+            name="A",
+            location="Barclays Center",
+            date_time=timezone.now() + timedelta(days=1),
+            schedule="",
+            speakers="",
+        )
+        version = current_version(event.id)
+        search = geocoding.StaticGeocoder.search
+        calls = []
+
+        def throttled_once(geocoder, *args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise GeocodingThrottled(0.25)
+            return search(geocoder, *args, **kwargs)
+
+        out = StringIO()
+        with (
+            patch.object(geocoding.StaticGeocoder, "search", throttled_once),
+            patch(
+                "events.management.commands.backfill_event_coordinates.time.sleep"
+            ) as sleep,
+        ):
+            call_command("backfill_event_coordinates", delay=0, stdout=out)
+
+        self.assertEqual(len(calls), 2)
+        sleep.assert_any_call(0.25)
+        self.assertIn("Geocoded 1 of 1 locations, updated 1 events.", out.getvalue())
+        event.refresh_from_db()
+        self.assertEqual((event.latitude, event.longitude), (40.6826, -73.9754))
+        # The cached detail page still had the old (missing) coordinates
+        self.assertNotEqual(current_version(event.id), version)
@@ -0,0 +1,338 @@
+import base64
+import hashlib
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from events import images
+from events.detail_cache import current_version
+from events.images import (
+    BASE83,
+    LocalImageStore,
+    S3ImageStore,
+    encode_blurhash,
+    process_event_image,
+    render_variants,
+    variant_key,
+)
+from events.models import CreatorProfile, Event
+
+
+def make_image(size=(2000, 1000), color=(200, 40, 40), fmt="JPEG"):
+    buffered = BytesIO()
+    Image.new("RGB", size, color).save(buffered, format=fmt)
+    return buffered.getvalue()
+
+
+def decode83(value):
+    result = 0
+    for c in value:
+        result = result * 83 + BASE83.index(c)
+    return result
+
+
+class ImageVariantTest(TestCase):
+    def test_variants_are_resized_and_converted(self):
+        variants, blurhash = render_variants(make_image())
+
+        sizes = {}
+        for field, (content, fmt) in variants.items():
+            image = Image.open(BytesIO(content))
+            self.assertEqual(image.format, fmt)
+            sizes[field] = image.size
+        self.assertEqual(
+            sizes,
+            {
+                "thumbnail_url": (400, 200),
+                "thumbnail_webp_url": (400, 200),
+                "image_webp_url": (1200, 600),
+            },
+        )
+
+    def test_small_images_are_not_upscaled(self):
+        variants, _ = render_variants(make_image(size=(300, 200), fmt="PNG"))
+        content, _ = variants["image_webp_url"]
+        self.assertEqual(Image.open(BytesIO(content)).size, (300, 200))
+
+    def test_blurhash_matches_reference_encoder(self):
+        # Expected values from the reference implementation at blurha.sh
+        red = Image.new("RGB", (32, 32), (255, 0, 0))
+        gradient = Image.linear_gradient("L").resize((32, 24)).convert("RGB")
+
+        self.assertEqual(encode_blurhash(red, 4, 3), "L9TI:j|cfQ|c|co1fQo1fQfQfQfQ")
+        self.assertEqual(
+            encode_blurhash(gradient, 4, 3), "LyHV9woffQof00WBfQWBxuj[fQj["
+        )
+        self.assertEqual(decode83(encode_blurhash(red, 4, 3)[2:6]), 0xFF0000)
+
+    def test_variant_keys(self):
+        self.assertEqual(
+            variant_key("events/photo.final.jpg", 400, "WEBP"),
+            "events/variants/photo.final-400.webp",
+        )
+
+
+class ProcessEventImageTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.store = LocalImageStore(self.root.name, "/media/")
+        self.event = Event.objects.create(
+            name="Gallery Night",
+            location="Museum",
+            date_time=timezone.now() + timezone.timedelta(days=1),
+            schedule="Schedule",
+            speakers="Curator",
+            image_url="https://example.com/events/gallery.jpg",
+        )
+
+    def test_variants_are_stored_on_the_event(self):
+        version = current_version(self.event.id)
+        process_event_image(
+            self.event.id,
+            self.event.image_url,
+            "events/gallery.jpg",
+            make_image(),
+            store=self.store,
+        )
+
+        self.event.refresh_from_db()
+        self.assertEqual(
+            self.event.thumbnail_url, "/media/events/variants/gallery-400.jpg"
+        )
+        self.assertEqual(
+            self.event.thumbnail_webp_url, "/media/events/variants/gallery-400.webp"
+        )
+        self.assertEqual(
+            self.event.image_webp_url, "/media/events/variants/gallery-1200.webp"
+        )
+        self.assertTrue(self.event.image_blurhash)
+        self.assertTrue(
+            (Path(self.root.name) / "events/variants/gallery-1200.webp").exists()
+        )
+        self.assertNotEqual(current_version(self.event.id), version)
+
+    def test_replaced_image_is_not_overwritten(self):
+        Event.objects.filter(id=self.event.id).update(
+            image_url="https://example.com/events/newer.jpg"
+        )
+        process_event_image(
+            self.event.id,
+            self.event.image_url,
+            "events/gallery.jpg",
+            make_image(),
+            store=self.store,
+        )
+
+        self.event.refresh_from_db()
+        self.assertIsNone(self.event.thumbnail_url)
+        self.assertEqual(self.event.image_blurhash, "")
+
+
+class CreateEventImageTest(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        override = override_settings(IMAGE_STORE_ROOT=root.name, IMAGE_WORKERS=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        images._stores.clear()
+        self.addCleanup(images._stores.clear)
+        self.store = images.get_image_store()
+
+        user = User.objects.create_user(username="creator", password="pass")
+        CreatorProfile.objects.create(creator=user)
+        self.client.login(username="creator", password="pass")
+
+    def post_event(self, content=None, image_key=None):
+        data = {
+            "name": "Launch Party",
+            "location": "Rooftop",
+            "date_time": "2030-01-01 19:00",
+            "schedule": "Drinks",
+            "speakers": "Founders",
+            "category": "Entertainment",
+            "latitude": "40.7",
+            "longitude": "-74.0",
+            "numTickets": "50",
+        }
+        if content is not None:
+            data["image"] = SimpleUploadedFile("launch.jpg", content, "image/jpeg")
+        if image_key is not None:
+            data["image_key"] = image_key
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse("create_event"), data)
+
+    def request_upload(self, content, content_type="image/jpeg", **overrides):
+        data = {
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "content_type": content_type,
+            "size": len(content),
+            **overrides,
+        }
+        return self.client.post(reverse("image_upload_url"), data)
+
+    def test_posted_file_is_stored_by_content(self):
+        content = make_image()
+        digest = hashlib.sha256(content).hexdigest()
+        response = self.post_event(content)
+
+        self.assertRedirects(response, reverse("creator_dashboard"))
+        event = Event.objects.get(name="Launch Party")
+        self.assertEqual(event.image_url, f"/media/events/{digest}.jpg")
+        self.assertTrue(self.store.exists(f"events/{digest}.jpg"))
+        self.assertEqual(
+            event.thumbnail_url, f"/media/events/variants/{digest}-400.jpg"
+        )
+        self.assertTrue(event.image_blurhash)
+
+        response = self.client.get(reverse("user_event_list"))
+        self.assertContains(
+            response, f'srcset="/media/events/variants/{digest}-400.webp"'
+        )
+        self.assertContains(response, f'data-blurhash="{event.image_blurhash}"')
+
+    def test_direct_upload_then_confirm_by_key(self):
+        content = make_image()
+        upload = self.request_upload(content).json()
+        self.assertFalse(upload["exists"])
+        self.assertEqual(upload["url"], reverse("local_image_upload"))
+
+        response = self.client.post(
+            upload["url"],
+            {**upload["fields"], "file": SimpleUploadedFile("a.jpg", content)},
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(self.request_upload(content).json()["exists"])
+
+        self.post_event(image_key=upload["key"])
+        event = Event.objects.get(name="Launch Party")
+        self.assertEqual(event.image_url, self.store.url(upload["key"]))
+        self.assertTrue(event.image_webp_url)
+
+    def test_same_image_from_two_events_shares_one_object(self):
+        content = make_image()
+        self.post_event(content)
+        self.post_event(content)
+
+        urls = set(Event.objects.values_list("image_url", flat=True))
+        self.assertEqual(len(urls), 1)
+
+    def test_unconfirmed_key_is_ignored(self):
+        key = f"events/{'0' * 64}.jpg"
+        self.post_event(image_key=key)
+        self.assertIsNone(Event.objects.get(name="Launch Party").image_url)
+
+        self.post_event(image_key="events/../../settings.py")
+        self.assertFalse(Event.objects.exclude(image_url=None).exists())
+
+    def test_upload_requests_are_validated(self):
+        content = make_image()
+        self.assertEqual(
+            self.request_upload(content, content_type="text/html").status_code, 400
+        )
+        self.assertEqual(
+            self.request_upload(content, size=20 * 1024 * 1024).status_code, 400
+        )
+        self.assertEqual(self.request_upload(content, sha256="abc").status_code, 400)
+
+        self.client.logout()
+        self.assertEqual(self.request_upload(content).status_code, 302)
+
+    def test_local_upload_checks_token_and_content(self):
+        content = make_image()
+        upload = self.request_upload(content).json()
+
+        tampered = {**upload["fields"], "token": "forged"}
+        response = self.client.post(
+            upload["url"], {**tampered, "file": SimpleUploadedFile("a.jpg", content)}
+        )
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post(
+            upload["url"],
+            {**upload["fields"], "file": SimpleUploadedFile("a.jpg", b"other")},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.store.exists(upload["key"]))
+
+    def test_mismatched_direct_upload_is_removed(self):
+        content = make_image()
+        key = f"events/{hashlib.sha256(content).hexdigest()}.jpg"
+        # Something other than the named image ended up under its key
+        self.store.save(key, make_image(color=(0, 0, 255)), "image/jpeg")
+
+        with self.assertLogs("events.images", "ERROR"):
+            self.post_event(image_key=key)
+
+        event = Event.objects.get(name="Launch Party")
+        self.assertIsNone(event.image_url)
+        self.assertFalse(self.store.exists(key))
+        self.assertGreaterEqual(images.stats["rejected"], 1)
+
+    def test_processing_runs_on_the_worker_pool(self):
+        with (
+            override_settings(IMAGE_WORKERS=2),
+            patch("events.images._get_executor") as executor,
+        ):
+            self.post_event(make_image())
+
+        event = Event.objects.get(name="Launch Party")
+        executor.return_value.submit.assert_called_once()
+        args = executor.return_value.submit.call_args.args
+        self.assertEqual(args[1:3], (event.id, event.image_url))
+        self.assertIsNone(event.thumbnail_url)
+
+    def test_unreadable_upload_is_logged(self):
+        failed = images.stats["failed"]
+        with self.assertLogs("events.images", "ERROR"):
+            images._process(1, "https://example.com/x.jpg", "x.jpg", b"junk", False)
+        self.assertEqual(images.stats["failed"], failed + 1)
+
+
+class S3ImageStoreTest(TestCase):
+    @patch("events.images.boto3.client")
+    def test_presigned_post_limits_type_and_size(self, mock_boto_client):
+        store = S3ImageStore("bucket")
+        digest = hashlib.sha256(b"image").digest()
+        key = f"events/{digest.hex()}.jpg"
+        store.presigned_post(key, "image/jpeg")
+
+        args, kwargs = mock_boto_client.return_value.generate_presigned_post.call_args
+        self.assertEqual(args, ("bucket", key))
+        self.assertIn({"Content-Type": "image/jpeg"}, kwargs["Conditions"])
+        self.assertIn(
+            ["content-length-range", 1, 10 * 1024 * 1024], kwargs["Conditions"]
+        )
+
+    @patch("events.images.boto3.client")
+    def test_presigned_post_pins_content_checksum(self, mock_boto_client):
+        store = S3ImageStore("bucket")
+        digest = hashlib.sha256(b"image").digest()
+        store.presigned_post(f"events/{digest.hex()}.jpg", "image/jpeg")
+
+        kwargs = mock_boto_client.return_value.generate_presigned_post.call_args.kwargs
+        checksum = base64.b64encode(digest).decode()
+        # S3 checks the posted bytes against the checksum the policy allows
+        self.assertEqual(kwargs["Fields"]["x-amz-checksum-sha256"], checksum)
+        self.assertIn({"x-amz-checksum-sha256": checksum}, kwargs["Conditions"])
+        self.assertIn({"x-amz-checksum-algorithm": "SHA256"}, kwargs["Conditions"])
+
+    @patch("events.images.boto3.client")
+    def test_exists(self, mock_boto_client):
+        store = S3ImageStore("bucket")
+        self.assertTrue(store.exists("events/abc.jpg"))
+
+        mock_boto_client.return_value.head_object.side_effect = ClientError(
+            {"Error": {"Code": "404"}}, "HeadObject"
+        )
+        self.assertFalse(store.exists("events/abc.jpg"))
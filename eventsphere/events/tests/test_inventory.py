@@ -0,0 +1,112 @@
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from events.inventory import purchase_tickets, reserve_tickets
+from events.models import Event, Ticket
+
+
+def create_event(num_tickets):
+    return Event.objects.create(
+        name="Ticket Drop",
+        location="Arena",
+        date_time=timezone.now() + timezone.timedelta(days=5),
+        schedule="Doors at 7",
+        speakers="Headliner",
+        numTickets=num_tickets,
+    )
+
+
+class ReserveTicketsTest(TestCase):
+    def setUp(self):
+        self.event = create_event(num_tickets=3)
+        self.user = User.objects.create(username="buyer")
+
+    def test_reserve_until_sold_out(self):
+        self.assertTrue(reserve_tickets(self.event.id, 2))
+        self.assertFalse(reserve_tickets(self.event.id, 2))
+        self.assertTrue(reserve_tickets(self.event.id, 1))
+        self.assertFalse(reserve_tickets(self.event.id, 1))
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.ticketsSold, 3)
+
+    def test_reserve_without_capacity(self):
+        self.event.numTickets = None
+        self.event.save()
+        self.assertFalse(reserve_tickets(self.event.id, 1))
+
+    def test_sold_out_purchase_saves_nothing(self):
+        self.event.ticketsSold = 3
+        self.event.save()
+
+        ticket = Ticket(user=self.user, quantity=1)
+        self.assertFalse(purchase_tickets(ticket, self.event.id))
+        self.assertFalse(Ticket.objects.exists())
+
+    @override_settings(TICKET_PURCHASE_BACKOFF=0)
+    def test_purchase_retries_lock_errors(self):
+        ticket = Ticket(user=self.user, quantity=1)
+        with patch(
+            "events.inventory.reserve_tickets",
+            side_effect=[OperationalError("database is locked"), True],
+        ) as mock_reserve:
+            self.assertTrue(purchase_tickets(ticket, self.event.id))
+
+        self.assertEqual(mock_reserve.call_count, 2)
+        self.assertTrue(Ticket.objects.filter(pk=ticket.pk).exists())
+
+    @override_settings(TICKET_PURCHASE_RETRIES=2, TICKET_PURCHASE_BACKOFF=0)
+    def test_purchase_gives_up_after_retries(self):
+        ticket = Ticket(user=self.user, quantity=1)
+        with patch(
+            "events.inventory.reserve_tickets",
+            side_effect=OperationalError("database is locked"),
+        ):
+            with self.assertRaises(OperationalError):
+                purchase_tickets(ticket, self.event.id)
+
+
+@override_settings(TICKET_PURCHASE_RETRIES=50)
+class ConcurrentPurchaseTest(TransactionTestCase):
+    """Many buyers racing for the last tickets must never oversell."""
+
+    def test_concurrent_buyers_never_oversell(self):
+        capacity, buyers = 10, 25
+        event = create_event(num_tickets=capacity)
+        users = [User.objects.create(username=f"rush_{i}") for i in range(buyers)]
+        results = []
+        start = threading.Barrier(buyers)
+
+        def buy(user):
+            try:
+                start.wait()
+                ticket = Ticket(user=user, quantity=1 + user.id % 2)
+                results.append((purchase_tickets(ticket, event.id), ticket.quantity))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        event.refresh_from_db()
+        sold = sum(quantity for ok, quantity in results if ok)
+        self.assertEqual(len(results), buyers)
+        self.assertLessEqual(event.ticketsSold, capacity)
+        self.assertEqual(event.ticketsSold, sold)
+        self.assertEqual(
+            Ticket.objects.filter(event=event).aggregate(total=Sum("quantity"))[
+                "total"
+            ],
+            sold,
+        )
+        # Everyone asked for 1 or 2 tickets, so at most one seat can be left
+        self.assertGreaterEqual(event.ticketsSold, capacity - 1)
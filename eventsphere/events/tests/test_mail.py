@@ -0,0 +1,146 @@
+import smtplib
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail as django_mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from events import mail
+from events.mail import queue_mail, retry_delay, send_queued_mail
+from events.models import OutboundEmail
+
+
+class CountingBackend(EmailBackend):
+    """Locmem backend that counts connections and bounces some recipients."""
+
+    def __init__(self, *args, unreachable=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.unreachable = unreachable
+        self.opened = 0
+
+    def open(self):
+        if self.unreachable:
+            raise smtplib.SMTPConnectError(421, "Try again later")
+        self.opened += 1
+
+    def send_messages(self, messages):
+        for message in messages:
+            if "bounce" in message.to[0]:
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, "No")})
+        return super().send_messages(messages)
+
+
+@override_settings(MAIL_BATCH_SIZE=2, MAIL_MAX_ATTEMPTS=3, MAIL_RETRY_DELAY=60)
+class OutboxTest(TestCase):
+    def test_queue_only_stores_the_message(self):
+        outbound = queue_mail("Hello", "Body", "a@example.com", html_body="<p>Hi</p>")
+        self.assertEqual(outbound.status, OutboundEmail.PENDING)
+        self.assertEqual(django_mail.outbox, [])
+
+        send_queued_mail()
+        message = django_mail.outbox[0]
+        self.assertEqual(message.to, ["a@example.com"])
+        self.assertEqual(message.alternatives[0][0], "<p>Hi</p>")
+
+    def test_batches_share_one_connection(self):
+        for i in range(5):
+            queue_mail("Hello", "Body", f"user{i}@example.com")
+        backend = CountingBackend()
+
+        # Three claims, each a locking select and an update inside its own
+        # savepoint, then one update per message sent
+        with self.assertNumQueries(3 * 4 + 5):
+            self.assertEqual(send_queued_mail(connection=backend), 5)
+
+        self.assertEqual(backend.opened, 1)
+        self.assertEqual(len(django_mail.outbox), 5)
+        self.assertFalse(
+            OutboundEmail.objects.exclude(status=OutboundEmail.SENT).exists()
+        )
+
+    def test_failures_back_off_then_give_up(self):
+        outbound = queue_mail("Hello", "Body", "bounce@example.com")
+        queue_mail("Hello", "Body", "ok@example.com")
+
+        with self.assertLogs("events.mail", "WARNING"):
+            send_queued_mail(connection=CountingBackend())
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.attempts, 1)
+        self.assertIn("SMTPRecipientsRefused", outbound.last_error)
+        self.assertGreater(outbound.next_attempt_at, timezone.now())
+        self.assertEqual(len(django_mail.outbox), 1)
+
+        # Not due yet, so another run leaves it alone
+        self.assertEqual(send_queued_mail(connection=CountingBackend()), 0)
+
+        failed = mail.stats["failed"]
+        for _ in range(2):
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            with self.assertLogs("events.mail", "WARNING"):
+                send_queued_mail(connection=CountingBackend())
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.FAILED)
+        self.assertEqual(outbound.attempts, 3)
+        self.assertEqual(mail.stats["failed"], failed + 1)
+
+    def test_messages_are_sent_outside_the_claim(self):
+        outbound = queue_mail("Hello", "Body", "a@example.com")
+        statuses = []
+
+        class InspectingBackend(CountingBackend):
+            def send_messages(self, messages):
+                statuses.append(
+                    (
+                        len(connection.savepoint_ids),
+                        OutboundEmail.objects.get(id=outbound.id).status,
+                    )
+                )
+                return super().send_messages(messages)
+
+        # No transaction is open beyond the one TestCase wraps the test in
+        depth = len(connection.savepoint_ids)
+        send_queued_mail(connection=InspectingBackend())
+
+        self.assertEqual(statuses, [(depth, OutboundEmail.SENDING)])
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.SENT)
+
+    def test_expired_claims_are_picked_up_again(self):
+        outbound = queue_mail("Hello", "Body", "a@example.com")
+        # A worker claimed it and died before recording the result
+        OutboundEmail.objects.update(
+            status=OutboundEmail.SENDING,
+            next_attempt_at=timezone.now() + mail.CLAIM_TIMEOUT,
+        )
+        self.assertEqual(send_queued_mail(connection=CountingBackend()), 0)
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_mail(connection=CountingBackend()), 1)
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.SENT)
+
+    def test_retry_delay_doubles_up_to_a_cap(self):
+        self.assertEqual(retry_delay(1), timedelta(minutes=1))
+        self.assertEqual(retry_delay(3), timedelta(minutes=4))
+        self.assertEqual(retry_delay(20), mail.MAX_RETRY_DELAY)
+
+    def test_unreachable_server_leaves_outbox_untouched(self):
+        outbound = queue_mail("Hello", "Body", "a@example.com")
+        with self.assertLogs("events.mail", "WARNING"):
+            attempted = send_queued_mail(connection=CountingBackend(unreachable=True))
+
+        self.assertEqual(attempted, 0)
+        outbound.refresh_from_db()
+        self.assertEqual(
+            (outbound.status, outbound.attempts), (OutboundEmail.PENDING, 0)
+        )
+
+    def test_command_reports_delivery(self):
+        queue_mail("Hello", "Body", "a@example.com")
+        out = StringIO()
+        call_command("send_queued_mail", stdout=out)
+        self.assertIn("Attempted 1 messages: 1 sent, 0 given up", out.getvalue())
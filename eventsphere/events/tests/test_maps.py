@@ -0,0 +1,152 @@
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.maps import (
+    clustered_features,
+    events_in_bbox,
+    parse_bbox,
+    stream_feature_collection,
+    tiles_in_bbox,
+)
+from events.models import Event
+from events.tests import streamed_content
+
+
+def create_event(name, latitude, longitude, days=1):
+    return Event.objects.create(
+        name=name,
+        location="Somewhere",
+        date_time=timezone.now() + timedelta(days=days),
+        schedule="",
+        speakers="",
+        latitude=latitude,
+        longitude=longitude,
+    )
+
+
+class TileTest(TestCase):
+    def test_tiles_cover_bbox(self):
+        south, north, ranges = parse_bbox("-10,-10,10,10")
+        # Zoom 2 tiles are 90 degrees wide, split at the prime meridian
+        self.assertEqual(
+            sorted(tiles_in_bbox(south, north, ranges, 2)),
+            [(1, 0), (1, 1), (2, 0), (2, 1)],
+        )
+
+    def test_tiles_across_antimeridian(self):
+        south, north, ranges = parse_bbox("170,0,190,10")
+        self.assertEqual(
+            sorted(tiles_in_bbox(south, north, ranges, 3)), [(0, 2), (7, 2)]
+        )
+
+    def test_too_many_tiles(self):
+        south, north, ranges = parse_bbox("-180,-90,180,90")
+        with self.assertRaises(ValueError):
+            tiles_in_bbox(south, north, ranges, 10)
+
+
+class ClusteredFeaturesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.bbox = parse_bbox("-75,40,-73,41")
+        create_event("Midtown A", 40.755, -73.985)
+        create_event("Midtown B", 40.758, -73.987)
+        create_event("Midtown C", 40.751, -73.981)
+        create_event("Past", 40.752, -73.982, days=-1)
+        self.lone = create_event("Montauk", 40.035, -74.95)
+
+    def features(self, zoom=6):
+        return clustered_features(*self.bbox, zoom)
+
+    def test_nearby_events_are_clustered(self):
+        features = self.features()
+        clusters = [f for f in features if f["properties"].get("cluster")]
+        singles = [f for f in features if not f["properties"].get("cluster")]
+
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]["properties"]["count"], 3)
+        lng, lat = clusters[0]["geometry"]["coordinates"]
+        self.assertAlmostEqual(lat, 40.7547, places=3)
+        self.assertAlmostEqual(lng, -73.9843, places=3)
+
+        self.assertEqual(len(singles), 1)
+        self.assertEqual(singles[0]["id"], self.lone.id)
+        self.assertEqual(singles[0]["properties"]["name"], "Montauk")
+
+    def test_tiles_are_cached(self):
+        self.features()
+        with self.assertNumQueries(0):
+            self.features()
+
+    def test_saving_event_with_coordinates_invalidates(self):
+        self.features()
+        self.lone.latitude, self.lone.longitude = 40.753, -73.983
+        self.lone.save()
+
+        clusters = [f for f in self.features() if f["properties"].get("cluster")]
+        self.assertEqual(clusters[0]["properties"]["count"], 4)
+
+    def test_event_without_coordinates_keeps_cache(self):
+        self.features()
+        create_event("Online", None, None)
+        with self.assertNumQueries(0):
+            self.features()
+
+    def test_events_on_tile_edges_are_kept(self):
+        # Just west of the prime meridian, so inside tile (3, 2) at zoom 3,
+        # though longitude + 180 rounds up onto the next tile's first cell
+        edge = create_event("Edge", 5, -1e-20)
+        antimeridian = create_event("Antimeridian", 5, 180)
+
+        features = clustered_features(*parse_bbox("-44,0,-1,10"), 3)
+        self.assertEqual([f["id"] for f in features], [edge.id])
+        features = clustered_features(*parse_bbox("170,0,179,10"), 3)
+        self.assertEqual([f["id"] for f in features], [antimeridian.id])
+
+    def test_map_events_clusters_when_zoomed_out(self):
+        User.objects.create_user(username="viewer", password="pass")
+        client = Client()
+        client.login(username="viewer", password="pass")
+
+        response = client.get(
+            reverse("map_events"), {"bbox": "-75,40,-73,41", "zoom": 6}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)["features"]), 2)
+
+        response = client.get(
+            reverse("map_events"), {"bbox": "-75,40,-73,41", "zoom": 16}
+        )
+        features = json.loads(streamed_content(response))["features"]
+        self.assertEqual(len(features), 4)
+
+
+class StreamFeatureCollectionTest(TestCase):
+    def test_features_stream_asynchronously_in_chunks(self):
+        for index in range(5):
+            create_event(f"Stall {index}", 40.75, -73.98)
+        events = events_in_bbox(*parse_bbox("-75,40,-73,41"))
+
+        async def collect():
+            return [chunk async for chunk in stream_feature_collection(events)]
+
+        with patch("events.maps.FEATURE_CHUNK_SIZE", 2):
+            chunks = async_to_sync(collect)()
+
+        # Opening, three chunks of rows, closing
+        self.assertEqual(len(chunks), 5)
+        features = json.loads("".join(chunks))["features"]
+        self.assertEqual(len(features), 5)
+
+        response = StreamingHttpResponse(stream_feature_collection(events))
+        self.assertTrue(response.is_async)
+        self.assertEqual(len(json.loads(streamed_content(response))["features"]), 5)
@@ -2,7 +2,13 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 from django.utils import timezone
-from events.models import Event, Ticket, UserProfile, AdminProfile
+from events.models import (
+    Event,
+    Ticket,
+    UserProfile,
+    AdminProfile,
+    NotificationCounter,
+)
 
 
 class EventModelTest(TestCase):
@@ -158,3 +164,26 @@ class AdminProfileModelTest(TestCase):
 #         user = User.objects.create(username="creator", password="12345")
 #         profile = CreatorProfile.objects.create(user=user, interests="Art, Music, Tech")
 #         self.assertEqual(profile.interests, "Art, Music, Tech")
+
+
+class NotificationCounterTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f"counter_{i}", password="12345")
+            for i in range(3)
+        ]
+
+    def test_increment_creates_missing_counters(self):
+        NotificationCounter.increment(user.id for user in self.users)
+        NotificationCounter.increment([self.users[0].id])
+
+        self.assertEqual(NotificationCounter.unread_for(self.users[0]), 2)
+        self.assertEqual(NotificationCounter.unread_for(self.users[1]), 1)
+        self.assertEqual(NotificationCounter.objects.count(), 3)
+
+    def test_decrement_never_goes_negative(self):
+        NotificationCounter.increment([self.users[0].id])
+        NotificationCounter.decrement(self.users[0], 5)
+
+        self.assertEqual(NotificationCounter.unread_for(self.users[0]), 0)
+        self.assertEqual(NotificationCounter.unread_for(self.users[1]), 0)
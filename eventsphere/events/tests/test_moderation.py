@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+
+from events import moderation
+from events.moderation import ProfanityFilter, get_profanity_filter
+
+
+class ProfanityFilterTest(SimpleTestCase):
+    def setUp(self):
+        self.filter = ProfanityFilter(["shit", "ass", "blow job", "f.u.c.k", "4r5e"])
+
+    def test_whole_words_are_censored(self):
+        self.assertEqual(self.filter.censor("Oh SHIT, sorry"), "Oh ****, sorry")
+        self.assertEqual(self.filter.censor("class assessment"), "class assessment")
+        self.assertEqual(self.filter.censor("shitshit"), "shitshit")
+
+    def test_leetspeak(self):
+        self.assertEqual(self.filter.censor("sh1t"), "****")
+        self.assertEqual(self.filter.censor("$h*t and @$5"), "**** and ****")
+        # Digits in the list still match literally
+        self.assertEqual(self.filter.censor("4r5e"), "****")
+
+    def test_phrases_span_words(self):
+        self.assertEqual(self.filter.censor("a blow job here"), "a **** here")
+        self.assertEqual(self.filter.censor("say f.u.c.k now"), "say **** now")
+        self.assertEqual(self.filter.censor("f u c k"), "f u c k")
+
+    def test_contains_profanity(self):
+        self.assertTrue(self.filter.contains_profanity("what the sh1t"))
+        self.assertFalse(self.filter.contains_profanity("see you tonight"))
+        self.assertFalse(self.filter.contains_profanity(""))
+
+    def test_non_text_input_is_coerced(self):
+        self.assertEqual(self.filter.censor(5), "5")
+        self.assertEqual(self.filter.censor(None), "")
+        self.assertFalse(self.filter.contains_profanity(5))
+
+    def test_shared_filter_matches_bundled_wordlist(self):
+        self.assertIs(get_profanity_filter(), get_profanity_filter())
+        self.assertEqual(moderation.censor("you are a b1tch"), "you are a ****")
+        self.assertEqual(moderation.censor("hand-job now"), "**** now")
+        self.assertFalse(moderation.contains_profanity("Doors open at 7"))
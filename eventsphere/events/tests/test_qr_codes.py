@@ -0,0 +1,141 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events import qr_codes
+from events.models import Event, Ticket
+from events.qr_codes import get_qr_code, qr_cache_key, render_qr, ticket_qr_payload
+
+
+class QRCodeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="holder", password="pass")
+        self.event = Event.objects.create(
+            name="Door Check",
+            location="Venue",
+            date_time=timezone.now() + timezone.timedelta(days=1),
+            schedule="Schedule",
+            speakers="Speaker",
+            numTickets=100,
+        )
+        Ticket.objects.create(user=self.user, event=self.event, quantity=2)
+        Ticket.objects.create(user=self.user, event=self.event, quantity=1)
+        self.client = Client()
+        self.client.login(username="holder", password="pass")
+        self.url = reverse("generate_event_qr", args=[self.event.id])
+
+    def test_payload_in_one_query(self):
+        with self.assertNumQueries(1):
+            payload = ticket_qr_payload(self.user, self.event.id)
+        self.assertEqual(payload, "User: holder\nEvent: Door Check\nTotal Tickets: 3")
+
+        other = User.objects.create_user(username="nobody")
+        self.assertIsNone(ticket_qr_payload(other, self.event.id))
+
+    def test_cache_key_follows_content(self):
+        payload = ticket_qr_payload(self.user, self.event.id)
+        Ticket.objects.create(user=self.user, event=self.event, quantity=1)
+        self.assertNotEqual(
+            qr_cache_key(payload, "png"),
+            qr_cache_key(ticket_qr_payload(self.user, self.event.id), "png"),
+        )
+        self.assertNotEqual(qr_cache_key(payload, "png"), qr_cache_key(payload, "svg"))
+
+    def test_rendered_once_then_cached(self):
+        with mock.patch("events.qr_codes.render_qr", wraps=render_qr) as render:
+            first = get_qr_code("payload", "svg")
+            second = get_qr_code("payload", "svg")
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("<svg"))
+
+    def test_concurrent_misses_share_one_render(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_render(payload, fmt):
+            started.set()
+            release.wait(5)
+            return "image"
+
+        results = []
+        with mock.patch("events.qr_codes.render_qr", side_effect=slow_render) as render:
+            first = threading.Thread(
+                target=lambda: results.append(get_qr_code("door", wait=5))
+            )
+            first.start()
+            started.wait(5)
+            coalesced = qr_codes.stats["coalesced"]
+            second = threading.Thread(
+                target=lambda: results.append(get_qr_code("door", wait=5))
+            )
+            second.start()
+            while qr_codes.stats["coalesced"] == coalesced:
+                pass
+            release.set()
+            first.join()
+            second.join()
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(results, ["image", "image"])
+
+    def test_view_returns_png_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["format"], "png")
+        self.assertEqual(
+            response.json()["qr_code"],
+            render_qr(ticket_qr_payload(self.user, self.event.id)),
+        )
+
+    def test_view_svg_and_cached_queries(self):
+        self.client.get(self.url, {"format": "svg"})
+        # Session, user and the ticket total
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"format": "svg"})
+        self.assertTrue(response.json()["qr_code"].startswith("<svg"))
+
+    def test_view_rejects_unknown_format(self):
+        response = self.client.get(self.url, {"format": "gif"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(QR_WAIT_SECONDS=0)
+    def test_view_reports_pending_render(self):
+        release = threading.Event()
+
+        def slow_render(payload, fmt):
+            release.wait(5)
+            return "image"
+
+        with mock.patch("events.qr_codes.render_qr", side_effect=slow_render):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response["Retry-After"], "1")
+            key = qr_cache_key(ticket_qr_payload(self.user, self.event.id), "png")
+            render = qr_codes._inflight[key]
+            release.set()
+            render.result(5)
+
+        self.assertEqual(self.client.get(self.url).json()["qr_code"], "image")
+
+    def test_view_retries_after_failed_render(self):
+        errors = qr_codes.stats["errors"]
+        with mock.patch("events.qr_codes.render_qr", side_effect=ValueError("boom")):
+            with self.assertLogs("events.qr_codes", "ERROR"):
+                response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(qr_codes.stats["errors"], errors + 1)
+
+        # Nothing was cached, so the next request renders again
+        self.assertIn("qr_code", self.client.get(self.url).json())
+
+    def test_view_requires_login(self):
+        response = Client().get(self.url)
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import (
+    ChatMessage,
+    ChatRoom,
+    CreatorProfile,
+    Event,
+    Favorite,
+    RoomMember,
+)
+from events.views import profile_favorites
+
+
+class QueryBudgetTest(TestCase):
+    """
+    List views run a fixed number of queries however many rows they show.
+    Each test renders a page, adds more rows, and renders it again under the
+    same budget.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="viewer", password="pass")
+        self.creator = CreatorProfile.objects.create(
+            creator=User.objects.create_user(username="host")
+        )
+        self.client = Client()
+        self.client.login(username="viewer", password="pass")
+        self.count = 0
+
+    def add_events(self, n, favorite=False, chat=False):
+        for _ in range(n):
+            self.count += 1
+            event = Event.objects.create(
+                name=f"Event {self.count}",
+                location="Hall",
+                date_time=timezone.now() + timedelta(days=self.count % 5 - 2),
+                schedule="Doors open early. " * 100,
+                speakers="Someone",
+                category="Music",
+            )
+            if favorite:
+                Favorite.objects.create(user=self.user, event=event)
+            if chat:
+                room = ChatRoom.objects.create(event=event, creator=self.creator)
+                RoomMember.objects.create(room=room, user=self.user)
+
+    def assertBudget(self, budget, render, grow):
+        with self.assertNumQueries(budget):
+            render()
+        grow()
+        with self.assertNumQueries(budget):
+            return render()
+
+    def test_user_event_list(self):
+        self.add_events(3, favorite=True)
+        url = reverse("user_event_list")
+
+        # Session, user, and the events with their favorite flag
+        response = self.assertBudget(
+            3, lambda: self.client.get(url), lambda: self.add_events(5)
+        )
+        self.assertContains(response, "In your favorites", count=3)
+        self.assertNotContains(response, "Doors open early. " * 30)
+
+    def test_user_event_list_search(self):
+        self.add_events(3)
+        url = reverse("user_event_list") + "?q=event"
+        self.assertBudget(3, lambda: self.client.get(url), lambda: self.add_events(5))
+
+    def test_profile_favorites(self):
+        self.add_events(3, favorite=True)
+        request = RequestFactory().get("/profile/favorites/")
+        request.user = self.user
+
+        response = self.assertBudget(
+            1,
+            lambda: profile_favorites(request),
+            lambda: self.add_events(5, favorite=True),
+        )
+        self.assertContains(response, "Event 8")
+
+    def test_profile_chats(self):
+        self.add_events(2, chat=True)
+        url = reverse("profile_chats")
+
+        response = self.assertBudget(
+            3, lambda: self.client.get(url), lambda: self.add_events(4, chat=True)
+        )
+        self.assertContains(response, "Event 6")
+
+    def test_chat_room(self):
+        self.add_events(1, chat=True)
+        room = ChatRoom.objects.get()
+        url = reverse("chat_room", args=[room.id])
+
+        def grow():
+            for i in range(5):
+                member = User.objects.create_user(username=f"member{i}")
+                RoomMember.objects.create(room=room, user=member, is_kicked=i == 0)
+                ChatMessage.objects.create(room=room, user=member, content="hi")
+
+        # Session, user, the room with its event and creator, its members
+        # with their users, one page of messages and one of announcements
+        response = self.assertBudget(6, lambda: self.client.get(url), grow)
+        self.assertContains(response, "member4")
+        self.assertContains(response, "(Kicked)", count=1)
+        self.assertEqual(len(response.context["members"]), 5)
+
+    def test_creator_dashboard(self):
+        client = Client()
+        client.force_login(self.creator.creator)
+        url = reverse("creator_dashboard")
+
+        def grow():
+            for i in range(5):
+                Event.objects.create(
+                    name=f"Hosted {i}",
+                    location="Hall",
+                    date_time=timezone.now() + timedelta(days=i - 2),
+                    schedule="Schedule",
+                    speakers="Someone",
+                    category="Music",
+                    numTickets=100,
+                    created_by=self.creator,
+                )
+
+        # The first visit caches the creator's role
+        client.get(url)
+        grow()
+        # Session, user, creator profile, the summary (rebuilt since
+        # new events invalidate it), and the events with their chat rooms
+        response = self.assertBudget(5, lambda: client.get(url), grow)
+        self.assertContains(response, "Open Chat Room", count=10)
+
+    def test_chat_room_redirects_non_members(self):
+        self.add_events(1, chat=True)
+        room = ChatRoom.objects.get()
+        RoomMember.objects.filter(user=self.user).update(is_kicked=True)
+
+        response = self.client.get(reverse("chat_room", args=[room.id]))
+        self.assertRedirects(
+            response,
+            reverse("join_chat", args=[room.event_id]),
+            fetch_redirect_response=False,
+        )
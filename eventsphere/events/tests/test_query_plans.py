@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import (
+    ChatRoom,
+    CreatorProfile,
+    Event,
+    Notification,
+    RoomMember,
+    Ticket,
+    UserProfile,
+)
+from events.tests import streamed_content
+
+
+class QueryPlanTest(TestCase):
+    """
+    Runs the hot views, captures the SQL they issue and checks that the
+    database plans those queries as index lookups rather than table scans.
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="attendee", password="pass")
+        UserProfile.objects.create(user=self.user)
+        creator_user = User.objects.create_user(username="creator", password="pass")
+        creator = CreatorProfile.objects.create(creator=creator_user)
+        self.event = Event.objects.create(
+            name="Indexed Event",
+            location="Hall",
+            date_time=timezone.now() + timedelta(days=1),
+            schedule="All day",
+            speakers="Someone",
+            latitude=40.7,
+            longitude=-74.0,
+            created_by=creator,
+        )
+        self.room = ChatRoom.objects.get(event=self.event)
+        RoomMember.objects.create(room=self.room, user=self.user)
+        Ticket.objects.create(user=self.user, event=self.event, quantity=1)
+        Notification.objects.create(
+            user=self.user, title="New Message", message="hi", url_link="1"
+        )
+        self.client.login(username="attendee", password="pass")
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                return "\n".join(str(row[-1]) for row in cursor.fetchall())
+            # Tiny test tables are always cheaper to scan; take that option
+            # away so the plan shows whether an index is usable at all
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql)
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def assertViewUsesIndex(self, url, table, index_names):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+            if response.streaming:
+                streamed_content(response)
+        self.assertEqual(response.status_code, 200)
+
+        queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith("SELECT")
+            and f'FROM "{table}"' in query["sql"]
+            and "WHERE" in query["sql"]
+        ]
+        self.assertTrue(queries, f"{url} issued no filtered query on {table}")
+        for sql in queries:
+            plan = self.explain(sql)
+            self.assertTrue(
+                any(name in plan for name in index_names),
+                f"Expected one of {index_names} in plan for:\n{sql}\n{plan}",
+            )
+
+    def test_notifications_use_unread_index(self):
+        self.assertViewUsesIndex(
+            reverse("notifications"),
+            "events_notification",
+            ["notif_unread_idx", "notif_user_read_created_idx"],
+        )
+
+    def test_event_search_uses_search_index(self):
+        self.assertViewUsesIndex(
+            reverse("user_event_list") + "?q=index",
+            "events_event",
+            ["events_event_fts", "event_search_vector_idx", "event_name_trgm_idx"],
+        )
+
+    def test_map_events_use_lat_lng_index(self):
+        self.assertViewUsesIndex(
+            reverse("map_events") + "?bbox=-75,40,-73,41&zoom=16",
+            "events_event",
+            ["event_lat_lng_idx", "event_date_time_idx"],
+        )
+
+    def test_ticket_sales_use_event_created_index(self):
+        self.assertViewUsesIndex(
+            reverse("fetch_filter_wise_data") + f"?event_id={self.event.id}",
+            "events_ticket",
+            ["ticket_event_created_idx"],
+        )
+
+    def test_chat_room_uses_member_and_message_indexes(self):
+        url = reverse("chat_room", args=[self.room.id])
+        self.assertViewUsesIndex(
+            url, "events_roommember", ["roommember_room_kicked_idx"]
+        )
+        self.assertViewUsesIndex(url, "events_chatmessage", ["chatmsg_room_ts_id_idx"])
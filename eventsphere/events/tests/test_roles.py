@@ -0,0 +1,84 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from events import roles
+from events.models import CreatorProfile, UserProfile
+from events.roles import get_role
+from events.utils import creator_required, user_required
+
+
+def ok(request):
+    return "ok"
+
+
+class RoleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="host", password="pass")
+
+    def test_role_is_resolved_in_one_query_then_cached(self):
+        profile = CreatorProfile.objects.create(creator=self.user)
+
+        with self.assertNumQueries(1):
+            role = get_role(self.user)
+        self.assertTrue(role.is_creator)
+        self.assertFalse(role.is_user)
+        self.assertEqual(role.creator_id, profile.id)
+        self.assertEqual(role.home, "creator_dashboard")
+
+        hits = roles.stats["hits"]
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role(self.user), role)
+        self.assertEqual(roles.stats["hits"], hits + 1)
+
+    def test_new_profile_invalidates_the_cached_role(self):
+        self.assertFalse(get_role(self.user).is_user)
+
+        profile = UserProfile.objects.create(user=self.user)
+        self.assertEqual(get_role(self.user).user_profile_id, profile.id)
+
+        profile.delete()
+        self.assertFalse(get_role(self.user).is_user)
+
+    def test_reused_primary_key_does_not_inherit_role(self):
+        CreatorProfile.objects.create(creator=self.user)
+        get_role(self.user)
+        user_id = self.user.id
+        User.objects.filter(id=user_id).delete()
+
+        # Cache entry survives when rows are removed without signals
+        cache.set(roles.role_cache_key(user_id), (None, 1, None))
+        fresh = User.objects.create_user(username="newcomer", id=user_id)
+        self.assertFalse(get_role(fresh).is_creator)
+
+    def test_admin_and_anonymous(self):
+        self.user.is_superuser = True
+        self.assertEqual(get_role(self.user).home, "event_list")
+        self.assertFalse(get_role(AnonymousUser()).is_creator)
+
+    def test_decorators_resolve_role_without_middleware(self):
+        CreatorProfile.objects.create(creator=self.user)
+        request = RequestFactory().get("/")
+        request.user = self.user
+
+        self.assertEqual(creator_required(ok)(request), "ok")
+        self.assertEqual(user_required(ok)(request).url, reverse("not_authorized"))
+
+    def test_decorated_view_costs_no_role_queries(self):
+        CreatorProfile.objects.create(creator=self.user)
+        self.client.login(username="host", password="pass")
+        url = reverse("creator_profile")
+        self.client.get(url)
+
+        # Session and user lookups, then the view's own profile fetch
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_authorized_links_role_home(self):
+        CreatorProfile.objects.create(creator=self.user)
+        self.client.login(username="host", password="pass")
+        response = self.client.get(reverse("not_authorized"))
+        self.assertEqual(response.context["redirect_url"], "creator_dashboard")
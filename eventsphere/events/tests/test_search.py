@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import Event
+from events.search import (
+    SQLITE_TRIGGERS,
+    install_search_index,
+    search_events,
+    search_terms,
+    upcoming_and_past_events,
+)
+
+
+def create_event(name, days, location="Main Hall", category="Music"):
+    return Event.objects.create(
+        name=name,
+        location=location,
+        date_time=timezone.now() + timedelta(days=days),
+        schedule="All day",
+        speakers="Someone",
+        category=category,
+    )
+
+
+class SearchEventsTest(TestCase):
+    def setUp(self):
+        self.jazz = create_event("Jazz Night", days=3, location="Blue Note")
+        self.jazz_past = create_event("Summer Jazz Festival", days=-3)
+        self.tech = create_event(
+            "Python Conference", days=10, location="Jazz Street", category="Tech"
+        )
+        self.art = create_event("Modern Art Expo", days=5, category="Art")
+
+    def names(self, events):
+        return [event.name for event in events]
+
+    def test_prefix_match_and_partitions_in_one_query(self):
+        with self.assertNumQueries(1):
+            upcoming, past = upcoming_and_past_events("jaz")
+        self.assertEqual(set(self.names(upcoming)), {"Jazz Night", "Python Conference"})
+        self.assertEqual(self.names(past), ["Summer Jazz Festival"])
+
+    def test_name_matches_rank_above_location_matches(self):
+        upcoming, _ = upcoming_and_past_events("jazz")
+        self.assertEqual(self.names(upcoming), ["Jazz Night", "Python Conference"])
+
+    def test_all_terms_must_match(self):
+        upcoming, past = upcoming_and_past_events("jazz festival")
+        self.assertEqual(upcoming, [])
+        self.assertEqual(self.names(past), ["Summer Jazz Festival"])
+
+    def test_category_filter(self):
+        upcoming, past = upcoming_and_past_events("jazz", category="tech")
+        self.assertEqual(self.names(upcoming), ["Python Conference"])
+        self.assertEqual(past, [])
+
+    def test_without_query_orders_by_date(self):
+        upcoming, past = upcoming_and_past_events()
+        self.assertEqual(
+            self.names(upcoming), ["Jazz Night", "Modern Art Expo", "Python Conference"]
+        )
+        self.assertEqual(self.names(past), ["Summer Jazz Festival"])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.art.name = "Modern Jazz Expo"
+        self.art.save()
+        self.jazz.delete()
+
+        matches = search_events(Event.objects.all(), "jazz")
+        self.assertEqual(
+            set(self.names(matches)),
+            {"Modern Jazz Expo", "Summer Jazz Festival", "Python Conference"},
+        )
+
+    def test_punctuation_only_query_matches_everything(self):
+        self.assertEqual(search_terms('"*"'), [])
+        self.assertEqual(search_events(Event.objects.all(), '"*"').count(), 4)
+
+    def test_install_restores_dropped_triggers(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite keeps the index in sync with triggers")
+        with connection.cursor() as cursor:
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {name}")
+        create_event("Jazz Brunch", days=1)
+
+        install_search_index()
+        upcoming, _ = upcoming_and_past_events("brunch")
+        self.assertEqual(self.names(upcoming), ["Jazz Brunch"])
@@ -0,0 +1,117 @@
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from events import throttling
+from events.consumers import ChatConsumer
+from events.models import ChatRoom, RoomMember
+from events.throttling import (
+    LocalRateLimiter,
+    TokenBucket,
+    chat_rate_limit,
+    chat_role,
+)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2.0, burst=3, now=0.0)
+        self.assertEqual([bucket.take(0.0) for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.take(0.0), 0.5)
+
+        # Half a second buys one more message, never more than the burst
+        self.assertEqual(bucket.take(0.5), 0.0)
+        self.assertGreater(bucket.take(0.5), 0)
+        bucket.take(100.0)
+        self.assertAlmostEqual(bucket.tokens, 2.0)
+
+
+class ChatRateLimitTest(unittest.IsolatedAsyncioTestCase):
+    @override_settings(
+        CHAT_RATE_LIMITS={"member": (1.0, 5), "creator": (None, 0)},
+        CHAT_ROOM_RATE_LIMITS={7: {"member": (0.1, 1)}},
+    )
+    def test_limits_by_role_and_room(self):
+        self.assertEqual(chat_rate_limit(1, "member"), (1.0, 5))
+        self.assertEqual(chat_rate_limit(7, "member"), (0.1, 1))
+        self.assertEqual(chat_rate_limit(7, "creator"), (None, 0))
+        self.assertEqual(chat_rate_limit(1, "unknown"), (1.0, 5))
+
+    def test_chat_role(self):
+        user = MagicMock(spec=User, id=5, is_superuser=False)
+        room = MagicMock(spec=ChatRoom)
+        room.creator.creator_id = 5
+        self.assertEqual(chat_role(user, room), "creator")
+        room.creator.creator_id = 6
+        self.assertEqual(chat_role(user, room), "member")
+        user.is_superuser = True
+        self.assertEqual(chat_role(user, room), "admin")
+
+    async def test_local_limiter_keys_are_independent(self):
+        limiter = LocalRateLimiter(max_buckets=2)
+        self.assertEqual(await limiter.hit("1:1", 0.01, 1), 0.0)
+        self.assertGreater(await limiter.hit("1:1", 0.01, 1), 0)
+        self.assertEqual(await limiter.hit("2:1", 0.01, 1), 0.0)
+
+        # Only the most recently used buckets are kept
+        await limiter.hit("3:1", 0.01, 1)
+        self.assertNotIn("1:1", limiter._buckets)
+
+    @patch.object(throttling, "MAX_THROTTLED_ROOMS", 4)
+    @patch.object(throttling, "throttled_rooms", throttling.Counter())
+    @patch.object(throttling, "get_rate_limiter")
+    async def test_throttled_rooms_keeps_the_busiest(self, get_rate_limiter):
+        get_rate_limiter.return_value.hit = AsyncMock(return_value=1.0)
+        for room_id in [1, 1, 1, 2, 2, 3, 4]:
+            await throttling.check_chat_rate(room_id, 9, "member")
+        self.assertEqual(len(throttling.throttled_rooms), 4)
+
+        # A fifth room trims the counter to the two busiest
+        await throttling.check_chat_rate(5, 9, "member")
+        self.assertEqual(throttling.throttled_rooms, {1: 3, 2: 2})
+
+
+class ChatConsumerFloodTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        throttling._limiters.clear()
+        self.addCleanup(throttling._limiters.clear)
+        self.user = MagicMock(spec=User, id=9, username="flooder", is_superuser=False)
+
+    @override_settings(CHAT_RATE_LIMITS={"member": (0.01, 2)})
+    @patch("events.consumers.notification_queue.enqueue", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_chat_room", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.get_room_member", new_callable=AsyncMock)
+    @patch("events.consumers.ChatConsumer.save_message", new_callable=AsyncMock)
+    async def test_flood_is_rejected_with_error(
+        self, mock_save_message, mock_get_room_member, mock_get_chat_room, _
+    ):
+        mock_get_chat_room.return_value = MagicMock(spec=ChatRoom)
+        mock_get_room_member.return_value = MagicMock(spec=RoomMember, is_kicked=False)
+
+        communicator = WebsocketCommunicator(
+            application=ChatConsumer.as_asgi(), path="/ws/chat/55/"
+        )
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = {"kwargs": {"room_id": 55}}
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        throttled = throttling.stats["throttled"]
+        responses = []
+        for text in ("one", "two", "three"):
+            await communicator.send_json_to({"message": text})
+            responses.append(json.loads(await communicator.receive_from()))
+
+        self.assertEqual([r.get("message") for r in responses[:2]], ["one", "two"])
+        self.assertEqual(responses[2]["type"], "rate_limited")
+        self.assertGreater(responses[2]["retry_after"], 0)
+        self.assertIn("too quickly", responses[2]["error"])
+        self.assertEqual(mock_save_message.await_count, 2)
+        self.assertEqual(throttling.stats["throttled"], throttled + 1)
+        self.assertGreaterEqual(throttling.throttled_rooms[55], 1)
+
+        await communicator.disconnect()
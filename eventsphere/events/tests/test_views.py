@@ -1,13 +1,15 @@
+import hashlib
 import json
 from datetime import timedelta
-from unittest.mock import patch, MagicMock, ANY
+from unittest.mock import patch, MagicMock
+from botocore.exceptions import ClientError
 
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User
 from django.contrib.messages import get_messages
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.timezone import now
@@ -24,10 +26,14 @@ from events.models import (
     CreatorProfile,
     UserProfile,
     ChatRoom,
+    ChatMessage,
     RoomMember,
     Ticket,
     Notification,
+    NotificationCounter,
 )
+from events import images
+from events.tests import streamed_content
 from events.views import fetch_unread_notif_db
 
 
@@ -151,36 +157,31 @@ class NotificationTests(TestCase):
         )
         self.assertEqual(result, mock_queryset.values.return_value)
 
-    @patch("events.models.Notification.objects.get")
-    def test_mark_as_read_success(self, mock_get):
+    def test_mark_as_read_success(self):
         """
         Test that the mark_as_read view successfully marks a notification as read.
         """
-        mock_notification = MagicMock(spec=Notification)
-        mock_get.return_value = mock_notification
+        notification = Notification.objects.create(
+            user=self.user, title="Title", message="Hello", url_link="1"
+        )
 
         login = self.client.login(username="testuser", password="testpass")
         self.assertTrue(login, "User failed to log in.")
 
-        response = self.client.post(
-            reverse("mark_as_read", args=[self.notification_id])
-        )
+        response = self.client.post(reverse("mark_as_read", args=[notification.id]))
 
-        mock_get.assert_called_once_with(id=self.notification_id, user=self.user)
-        mock_notification.save.assert_called_once()
+        notification.refresh_from_db()
+        self.assertTrue(notification.is_read)
         self.assertEqual(response.status_code, 200)
         self.assertJSONEqual(
             response.content,
             {"success": True, "message": "Notification marked as read."},
         )
 
-    @patch("events.models.Notification.objects.get")
-    def test_mark_as_read_notification_not_found(self, mock_get):
+    def test_mark_as_read_notification_not_found(self):
         """
         Test that the mark_as_read view returns a 404 response when the notification does not exist.
         """
-        mock_get.side_effect = Notification.DoesNotExist
-
         login = self.client.login(username="testuser", password="testpass")
         self.assertTrue(login, "User failed to log in.")
 
@@ -188,7 +189,6 @@ class NotificationTests(TestCase):
             reverse("mark_as_read", args=[self.notification_id])
         )
 
-        mock_get.assert_called_once_with(id=self.notification_id, user=self.user)
         self.assertEqual(response.status_code, 404)
         self.assertJSONEqual(
             response.content, {"success": False, "message": "Notification not found."}
@@ -200,6 +200,7 @@ class NotificationTests(TestCase):
         Test that the mark_all_as_read view successfully marks all unread notifications as read.
         """
         mock_queryset = MagicMock()
+        mock_queryset.update.return_value = 2
         mock_filter.return_value = mock_queryset
 
         login = self.client.login(username="testuser", password="testpass")
@@ -567,7 +568,7 @@ class UpdateEventViewTest(TestCase):
         )
 
     @patch("events.views.get_object_or_404")
-    @patch("events.views.boto3.client")
+    @patch("events.images.boto3.client")
     @patch("events.views.EventForm")
     def test_post_request_valid_form_no_image(
         self, mock_event_form, mock_boto_client, mock_get_object
@@ -598,12 +599,16 @@ class UpdateEventViewTest(TestCase):
             response, reverse("creator_dashboard"), target_status_code=200
         )
 
+    @override_settings(IMAGE_STORE="events.images.S3ImageStore")
     @patch("events.views.get_object_or_404")
-    @patch("events.views.boto3.client")
+    @patch("events.images.boto3.client")
     @patch("events.views.EventForm")
     def test_post_request_valid_form_with_image(
         self, mock_event_form, mock_boto_client, mock_get_object
     ):
+        images._stores.clear()
+        self.addCleanup(images._stores.clear)
+
         # Mock event retrieval
         mock_event = MagicMock()
         mock_event.id = 1
@@ -615,8 +620,11 @@ class UpdateEventViewTest(TestCase):
         mock_form.save.return_value = mock_event
         mock_event_form.return_value = mock_form
 
-        # Mock the S3 client
+        # Mock the S3 client; the image is not stored yet
         mock_s3 = mock_boto_client.return_value
+        mock_s3.head_object.side_effect = ClientError(
+            {"Error": {"Code": "404"}}, "HeadObject"
+        )
 
         # Create a mock image file as an InMemoryUploadedFile
         image_mock = SimpleUploadedFile(
@@ -633,12 +641,18 @@ class UpdateEventViewTest(TestCase):
             format="multipart",
         )
 
-        # Verify image upload to S3
-        mock_s3.upload_fileobj.assert_called_once_with(
-            ANY,  # Ignore the exact file type, just ensure it's passed as a file object
-            "eventsphere-images",
-            "events/test_image.jpg",
-            ExtraArgs={"ContentType": "image/jpeg"},
+        # Verify image upload to S3 under its content hash
+        image_key = f"events/{hashlib.sha256(b'file_content').hexdigest()}.jpg"
+        mock_s3.put_object.assert_called_once_with(
+            Bucket="eventsphere-images",
+            Key=image_key,
+            Body=b"file_content",
+            ContentType="image/jpeg",
+            CacheControl="public, max-age=31536000, immutable",
+        )
+        self.assertEqual(
+            mock_event.image_url,
+            f"https://eventsphere-images.s3.amazonaws.com/{image_key}",
         )
         # Ensure form.save() was called and user is redirected to event_list
         mock_form.save.assert_called_once()
@@ -1426,7 +1440,7 @@ class CreateEventViewTest(TestCase):
         self.assertTemplateUsed(response, "events/create_event.html")
         self.assertIsInstance(response.context["form"], EventForm)
 
-    @patch("events.views.boto3.client")
+    @patch("events.images.boto3.client")
     def test_create_event_post_creator_invalid(self, mock_boto_client):
         self.client.login(username="creator", password="creatorpass")
         response = self.client.post(
@@ -1476,7 +1490,7 @@ class CreateEventTest(TestCase):
         self.user.creatorprofile = self.creator_profile
         self.client.login(username="testuser", password="testpassword")
 
-    @patch("events.views.boto3.client")
+    @patch("events.images.boto3.client")
     @patch("events.forms.EventForm.is_valid", return_value=True)
     @patch("events.forms.EventForm.save")
     def test_create_event_with_image(self, mock_save, mock_is_valid, mock_boto_client):
@@ -1511,7 +1525,7 @@ class CreateEventTest(TestCase):
             any("Event created successfully!" in str(m.message) for m in messages)
         )
 
-    @patch("events.views.boto3.client")
+    @patch("events.images.boto3.client")
     @patch("events.forms.EventForm.is_valid", return_value=True)
     @patch("events.forms.EventForm.save")
     def test_create_event_without_image(
@@ -1658,6 +1672,18 @@ class BuyTicketsViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "events/buy_tickets.html")
 
+    def test_buy_tickets_post_success(self):
+        response = self.client.post(
+            reverse("buy_tickets", args=[self.event.id]),
+            {"email": "user@example.com", "phone_number": "1234567890", "quantity": 3},
+        )
+        self.assertRedirects(response, reverse("event_detail", args=[self.event.id]))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.ticketsSold, 3)
+        self.assertEqual(
+            Ticket.objects.get(user=self.user, event=self.event).quantity, 3
+        )
+
     def test_buy_tickets_unauthenticated(self):
         self.client.logout()
         response = self.client.get(reverse("buy_tickets", args=[self.event.id]))
@@ -1929,26 +1955,71 @@ class MapViewTestCase(TestCase):
         )
 
     def test_map_view_renders_correctly(self):
-        # Mock the timezone.now function
-        with patch("django.utils.timezone.now", return_value=self.current_time):
-            response = self.client.get("/mapview/")  # URL of the view
+        response = self.client.get("/mapview/")  # URL of the view
 
-        # Check the response status
         self.assertEqual(response.status_code, 200)
-
-        # Check the rendered template
         self.assertTemplateUsed(response, "events/map_view.html")
+        self.assertContains(response, reverse("map_events"))
 
-        # Check that only events with valid coordinates are included in the context
-        events_json = json.loads(response.context["events_json"])
-        self.assertEqual(len(events_json), 1)
-        self.assertEqual(events_json[0]["id"], self.event_with_coordinates.id)
-        self.assertEqual(events_json[0]["name"], "Event With Coordinates")
-        self.assertEqual(events_json[0]["latitude"], 12.3456)
-        self.assertEqual(events_json[0]["longitude"], 78.9012)
-        self.assertEqual(events_json[0]["location"], "Location 1")
-        self.assertEqual(events_json[0]["image_url"], "http://example.com/image.jpg")
-        self.assertEqual(events_json[0]["description"], "Event schedule")
+    def get_features(self, bbox, **params):
+        with patch("django.utils.timezone.now", return_value=self.current_time):
+            response = self.client.get(
+                reverse("map_events"), {"bbox": bbox, "zoom": 16, **params}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/geo+json")
+        return json.loads(streamed_content(response))["features"]
+
+    def test_map_events_returns_geojson_in_bbox(self):
+        features = self.get_features("78,12,79,13")
+
+        # Only events with coordinates inside the box are included
+        self.assertEqual(len(features), 1)
+        feature = features[0]
+        self.assertEqual(feature["id"], self.event_with_coordinates.id)
+        self.assertEqual(feature["geometry"]["coordinates"], [78.9012, 12.3456])
+        self.assertEqual(feature["properties"]["name"], "Event With Coordinates")
+        self.assertEqual(feature["properties"]["location"], "Location 1")
+        self.assertEqual(
+            feature["properties"]["image_url"], "http://example.com/image.jpg"
+        )
+        self.assertEqual(feature["properties"]["description"], "Event schedule")
+
+    def test_map_events_outside_bbox(self):
+        self.assertEqual(self.get_features("-75,40,-73,41"), [])
+
+    def test_map_events_across_antimeridian(self):
+        Event.objects.create(
+            name="Fiji",
+            location="Suva",
+            date_time=self.current_time,
+            latitude=-18.1,
+            longitude=178.4,
+            schedule="",
+        )
+        Event.objects.create(
+            name="Samoa",
+            location="Apia",
+            date_time=self.current_time,
+            latitude=-13.8,
+            longitude=-171.8,
+            schedule="",
+        )
+        # Leaflet reports east past 180 after panning across the date line
+        features = self.get_features("170,-20,190,-10")
+        self.assertEqual({f["properties"]["name"] for f in features}, {"Fiji", "Samoa"})
+
+    def test_map_events_rejects_bad_params(self):
+        for params in (
+            {},
+            {"bbox": "1,2,3"},
+            {"bbox": "a,b,c,d"},
+            {"bbox": "0,10,1,5"},
+            {"bbox": "0,0,1,1", "zoom": "30"},
+            {"bbox": "0,0,1,1", "zoom": "far"},
+        ):
+            response = self.client.get(reverse("map_events"), params)
+            self.assertEqual(response.status_code, 400, params)
 
 
 class JoinChatTestCase(TestCase):
@@ -2020,3 +2091,143 @@ class JoinChatTestCase(TestCase):
         self.assertRedirects(
             response, reverse("event_detail", kwargs={"pk": self.event.id})
         )
+
+
+class ChatHistoryPaginationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.creator_user = User.objects.create_user(
+            username="creator", password="password"
+        )
+        self.member_user = User.objects.create_user(
+            username="member", password="password"
+        )
+        creator_profile = CreatorProfile.objects.create(creator=self.creator_user)
+        event = Event.objects.create(
+            name="Paginated Event",
+            location="Test Location",
+            date_time=timezone.now(),
+            schedule="Sample Schedule",
+            speakers="Sample Speaker",
+            created_by=creator_profile,
+        )
+        self.chat_room = ChatRoom.objects.get(event=event)
+        RoomMember.objects.create(room=self.chat_room, user=self.member_user)
+        ChatMessage.objects.bulk_create(
+            [
+                ChatMessage(room=self.chat_room, user=self.member_user, content=f"m{i}")
+                for i in range(7)
+            ]
+        )
+        # Identical timestamps force the id tie-breaker to keep pages stable
+        ChatMessage.objects.update(timestamp=timezone.now())
+        ChatMessage.objects.create(
+            room=self.chat_room,
+            user=self.creator_user,
+            content="[Announcement] Doors open",
+        )
+        self.client.login(username="member", password="password")
+
+    @patch("events.views.CHAT_HISTORY_PAGE_SIZE", 3)
+    def test_chat_room_renders_latest_page(self):
+        response = self.client.get(reverse("chat_room", args=[self.chat_room.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [message.content for message in response.context["messages"]],
+            ["m4", "m5", "m6"],
+        )
+        self.assertEqual(
+            [message.content for message in response.context["announcements"]],
+            ["[Announcement] Doors open"],
+        )
+        self.assertIsNotNone(response.context["next_cursor"])
+
+    @patch("events.views.CHAT_HISTORY_PAGE_SIZE", 3)
+    def test_history_pages_through_older_messages(self):
+        response = self.client.get(reverse("chat_room", args=[self.chat_room.id]))
+        cursor = response.context["next_cursor"]
+
+        pages = []
+        while cursor:
+            data = self.client.get(
+                reverse("chat_history", args=[self.chat_room.id]), {"before": cursor}
+            ).json()
+            pages.append([message["message"] for message in data["messages"]])
+            cursor = data["next_cursor"]
+
+        self.assertEqual(pages, [["m1", "m2", "m3"], ["m0"]])
+
+    def test_history_rejects_invalid_cursor(self):
+        response = self.client.get(
+            reverse("chat_history", args=[self.chat_room.id]), {"before": "garbage"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_history_requires_membership(self):
+        self.client.login(username="creator", password="password")
+        response = self.client.get(reverse("chat_history", args=[self.chat_room.id]))
+        self.assertEqual(response.status_code, 403)
+
+
+class UnreadNotificationCounterTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="reader", password="password")
+        self.notifications = [
+            Notification.objects.create(
+                user=self.user, title="New Message", message=f"n{i}", url_link="1"
+            )
+            for i in range(3)
+        ]
+        NotificationCounter.objects.create(user=self.user, unread=3)
+        self.client.login(username="reader", password="password")
+
+    def test_unread_count_endpoint(self):
+        response = self.client.get(reverse("unread_notification_count"))
+        self.assertEqual(response.status_code, 200)
+        self.assertJSONEqual(response.content, {"count": 3})
+
+    def test_unread_count_without_counter(self):
+        NotificationCounter.objects.all().delete()
+        response = self.client.get(reverse("unread_notification_count"))
+        self.assertJSONEqual(response.content, {"count": 0})
+
+    def test_mark_as_read_decrements_once(self):
+        url = reverse("mark_as_read", args=[self.notifications[0].id])
+        self.client.post(url)
+        self.client.post(url)  # already read, must not decrement again
+
+        self.assertEqual(NotificationCounter.unread_for(self.user), 2)
+
+    def test_mark_as_read_uses_conditional_update(self):
+        url = reverse("mark_as_read", args=[self.notifications[0].id])
+        # A concurrent request got there first: the row is already read
+        Notification.objects.filter(id=self.notifications[0].id).update(is_read=True)
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(NotificationCounter.unread_for(self.user), 3)
+
+    def test_mark_all_as_read_clears_counter(self):
+        self.client.post(reverse("mark_all_as_read"))
+
+        self.assertEqual(NotificationCounter.unread_for(self.user), 0)
+        self.assertFalse(
+            Notification.objects.filter(user=self.user, is_read=False).exists()
+        )
+
+    @patch("events.views.NOTIFICATIONS_PAGE_SIZE", 2)
+    def test_list_unread_notifications_paginates(self):
+        first = self.client.get(reverse("list_unread_notifications")).json()
+        second = self.client.get(
+            reverse("list_unread_notifications"), {"page": 2}
+        ).json()
+
+        self.assertEqual(len(first["results"]), 2)
+        self.assertTrue(first["has_next"])
+        self.assertEqual(len(second["results"]), 1)
+        self.assertFalse(second["has_next"])
+        seen = [n["id"] for n in first["results"] + second["results"]]
+        self.assertCountEqual(seen, [n.id for n in self.notifications])
@@ -0,0 +1,210 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import ChatMessage, ChatRoom, CreatorProfile, Event
+from events.write_behind import ChatMessageBuffer
+
+
+class ChatMessageBufferTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="chatter", password="pass")
+        creator = CreatorProfile.objects.create(creator=self.user)
+        rooms = []
+        for name in ("Room A", "Room B"):
+            event = Event.objects.create(
+                name=name,
+                location="Hall",
+                date_time=timezone.now(),
+                schedule="All day",
+                speakers="Someone",
+                created_by=creator,
+            )
+            rooms.append(ChatRoom.objects.get(event=event))
+        self.room, self.other_room = rooms
+
+    def contents(self, room):
+        return list(
+            ChatMessage.objects.filter(room=room)
+            .order_by("id")
+            .values_list("content", flat=True)
+        )
+
+    async def test_flushes_when_batch_is_full(self):
+        buffer = ChatMessageBuffer(max_size=3, flush_interval=60)
+
+        for i in range(2):
+            await buffer.add(self.room.id, self.user, f"message {i}")
+        self.assertEqual(await ChatMessage.objects.acount(), 0)
+        self.assertEqual(buffer.pending_count(self.room.id), 2)
+
+        await buffer.add(self.room.id, self.user, "message 2")
+
+        self.assertEqual(
+            await sync_to_async(self.contents)(self.room),
+            ["message 0", "message 1", "message 2"],
+        )
+        self.assertEqual(buffer.pending_count(), 0)
+        self.assertEqual(buffer.stats["flushes"], 1)
+
+    async def test_flushes_after_interval(self):
+        buffer = ChatMessageBuffer(max_size=100, flush_interval=0.01)
+
+        await buffer.add(self.room.id, self.user, "hello")
+        await asyncio.sleep(0.05)
+        await buffer.flush_all()
+
+        self.assertEqual(buffer.stats["flushed"], 1)
+        self.assertEqual(buffer.pending_count(), 0)
+        self.assertEqual(await ChatMessage.objects.acount(), 1)
+
+    async def test_flush_all_writes_every_room_in_order(self):
+        buffer = ChatMessageBuffer(max_size=100, flush_interval=60)
+        for i in range(5):
+            await buffer.add(self.room.id, self.user, f"a{i}")
+            await buffer.add(self.other_room.id, self.user, f"b{i}")
+
+        await buffer.flush_all()
+
+        self.assertEqual(
+            await sync_to_async(self.contents)(self.room),
+            [f"a{i}" for i in range(5)],
+        )
+        self.assertEqual(
+            await sync_to_async(self.contents)(self.other_room),
+            [f"b{i}" for i in range(5)],
+        )
+        self.assertEqual(buffer.stats["flushes"], 2)
+
+    async def test_messages_keep_the_time_they_were_sent(self):
+        buffer = ChatMessageBuffer(max_size=100, flush_interval=60)
+        sent_at = timezone.now() - timedelta(minutes=5)
+        with patch("events.write_behind.timezone.now", return_value=sent_at):
+            await buffer.add(self.room.id, self.user, "early")
+        await buffer.add(self.room.id, self.user, "late")
+
+        await buffer.flush_all()
+
+        timestamps = await sync_to_async(list)(
+            ChatMessage.objects.order_by("id").values_list("timestamp", flat=True)
+        )
+        self.assertEqual(timestamps[0], sent_at)
+        self.assertLess(timestamps[1], timezone.now())
+        self.assertGreater(timestamps[1], sent_at)
+
+    async def test_failed_flush_is_requeued(self):
+        buffer = ChatMessageBuffer(max_size=100, flush_interval=60)
+        await buffer.add(self.room.id, self.user, "kept")
+
+        with patch(
+            "events.write_behind.save_messages",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("db down"),
+        ):
+            with self.assertLogs("events.write_behind", level="ERROR"):
+                await buffer.flush(self.room.id)
+
+        self.assertEqual(buffer.stats["failed"], 1)
+        self.assertEqual(buffer.pending_count(self.room.id), 1)
+
+        await buffer.flush(self.room.id)
+        self.assertEqual(await sync_to_async(self.contents)(self.room), ["kept"])
+
+    async def test_requeued_messages_are_bounded(self):
+        buffer = ChatMessageBuffer(max_size=100, flush_interval=60, max_retained=3)
+        for i in range(5):
+            await buffer.add(self.room.id, self.user, f"m{i}")
+
+        with patch(
+            "events.write_behind.save_messages",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("db down"),
+        ):
+            with self.assertLogs("events.write_behind", level="ERROR") as logs:
+                await buffer.flush(self.room.id)
+
+        self.assertEqual(buffer.stats["dropped"], 2)
+        self.assertIn("Dropping 2 oldest", logs.output[-1])
+        self.assertEqual(
+            [m.content for m in buffer._pending[self.room.id]], ["m2", "m3", "m4"]
+        )
+
+    async def test_flush_from_another_loop_runs_on_the_owner(self):
+        buffer = ChatMessageBuffer(max_size=100, flush_interval=60)
+        owner = asyncio.new_event_loop()
+        thread = threading.Thread(target=owner.run_forever)
+        thread.start()
+        self.addCleanup(owner.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(owner.call_soon_threadsafe, owner.stop)
+
+        asyncio.run_coroutine_threadsafe(
+            buffer.add(self.room.id, self.user, "hello"), owner
+        ).result()
+        with patch("events.write_behind.save_messages", new_callable=AsyncMock) as save:
+            await buffer.flush(self.room.id)
+
+        self.assertEqual([m.content for m in save.await_args.args[0]], ["hello"])
+        self.assertEqual(buffer.pending_count(), 0)
+
+
+# Buffers a message under daphne, then stops it with SIGTERM like a deploy
+DAPHNE_SHUTDOWN_SCRIPT = textwrap.dedent(
+    """
+    import asyncio, os, signal, sys
+
+    import django
+
+    django.setup()
+    from daphne.server import Server
+    from twisted.internet import reactor
+
+    from eventsphere.asgi import application
+    from events import write_behind
+
+    async def save_messages(messages):
+        with open(sys.argv[1], "w") as f:
+            f.write("\\n".join(message.content for message in messages))
+
+    write_behind.save_messages = save_messages
+
+    async def buffer_then_terminate():
+        await write_behind.chat_message_buffer.add(1, None, "last words")
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    reactor.callLater(0.1, lambda: asyncio.ensure_future(buffer_then_terminate()))
+    Server(application, endpoints=["tcp:port=0:interface=127.0.0.1"]).run()
+    """
+)
+
+
+class DaphneShutdownFlushTest(TestCase):
+    @patch.dict(os.environ, {"DJANGO_SETTINGS_MODULE": "eventsphere.settings"})
+    def test_buffered_messages_are_written_when_daphne_stops(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = Path(tmp) / "saved"
+            # "test" in argv selects the test settings in the child too
+            result = subprocess.run(
+                [sys.executable, "-c", DAPHNE_SHUTDOWN_SCRIPT, str(saved), "test"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertTrue(saved.exists(), result.stderr)
+            self.assertEqual(saved.read_text(), "last words")
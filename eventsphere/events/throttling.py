@@ -0,0 +1,162 @@
+# events/throttling.py
+
+import logging
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+MEMBER = "member"
+CREATOR = "creator"
+ADMIN = "admin"
+
+# (messages per second, burst) per role, unless overridden in settings
+DEFAULT_CHAT_RATE_LIMITS = {MEMBER: (1.0, 5), CREATOR: (5.0, 20), ADMIN: (5.0, 20)}
+
+stats = {"allowed": 0, "throttled": 0}
+# Throttled frames per chat room, to spot where floods come from. Past
+# MAX_THROTTLED_ROOMS rooms only the busiest half is kept.
+throttled_rooms = Counter()
+MAX_THROTTLED_ROOMS = 1000
+
+
+def chat_role(user, chat_room):
+    """The role whose limits apply to `user` in `chat_room`."""
+    if user.is_superuser:
+        return ADMIN
+    if chat_room.creator.creator_id == user.id:
+        return CREATOR
+    return MEMBER
+
+
+def chat_rate_limit(room_id, role):
+    """(rate, burst) for `role` in room `room_id`; a rate of None is unlimited."""
+    limits = {
+        **DEFAULT_CHAT_RATE_LIMITS,
+        **getattr(settings, "CHAT_RATE_LIMITS", {}),
+        **getattr(settings, "CHAT_ROOM_RATE_LIMITS", {}).get(room_id, {}),
+    }
+    return limits.get(role, limits[MEMBER])
+
+
+class TokenBucket:
+    """Holds up to `burst` tokens, refilled at `rate` tokens a second."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = now
+
+    def take(self, now):
+        """Spend a token; returns 0 on success, else seconds until one is free."""
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class LocalRateLimiter:
+    """
+    Token buckets kept in this process. Limits hold per app server, which is
+    enough to stop one socket flooding the room it is connected to.
+    """
+
+    def __init__(self, max_buckets=100_000):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+
+    async def hit(self, key, rate, burst):
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None or (bucket.rate, bucket.burst) != (rate, burst):
+            bucket = self._buckets[key] = TokenBucket(rate, burst, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_buckets:
+            # The least recently used bucket has had longest to refill
+            self._buckets.popitem(last=False)
+        return bucket.take(now)
+
+
+class RedisRateLimiter:
+    """
+    Token buckets kept in Redis, by default the channel layer's, so a user's
+    limit holds across every app server. Redis errors let messages through.
+    """
+
+    # Refill and spend atomically, on the server's clock; returns the wait
+    # in milliseconds (0 when a token was spent)
+    SCRIPT = """
+        local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+        local clock = redis.call("TIME")
+        local now = clock[1] + clock[2] / 1000000
+        local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+        local tokens = tonumber(state[1]) or burst
+        local updated_at = tonumber(state[2]) or now
+        tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+        local wait = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+        else
+            wait = math.ceil((1 - tokens) / rate * 1000)
+        end
+        redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+        redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 1)
+        return wait
+    """
+
+    def __init__(self, url=None):
+        import redis.asyncio as redis
+
+        url = url or getattr(settings, "CHAT_RATE_LIMIT_REDIS_URL", None)
+        if url is None:
+            url = settings.CHANNEL_LAYERS["default"]["CONFIG"]["hosts"][0]
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(self.SCRIPT)
+
+    async def hit(self, key, rate, burst):
+        try:
+            wait = await self.script(keys=[f"chat_rate:{key}"], args=[rate, burst])
+        except Exception:
+            logger.warning("Chat rate limit check failed", exc_info=True)
+            return 0.0
+        return wait / 1000
+
+
+_limiters = {}
+
+
+def get_rate_limiter():
+    path = getattr(settings, "CHAT_RATE_LIMITER", "events.throttling.LocalRateLimiter")
+    if path not in _limiters:
+        _limiters[path] = import_string(path)()
+    return _limiters[path]
+
+
+async def check_chat_rate(room_id, user_id, role):
+    """
+    Count a chat message from `user_id` in `room_id` against their limit.
+    Returns 0 if it may be sent, else the seconds to wait before retrying.
+    """
+    rate, burst = chat_rate_limit(room_id, role)
+    if rate is None:
+        return 0.0
+    retry_after = await get_rate_limiter().hit(f"{room_id}:{user_id}", rate, burst)
+    if retry_after:
+        stats["throttled"] += 1
+        throttled_rooms[room_id] += 1
+        if len(throttled_rooms) > MAX_THROTTLED_ROOMS:
+            busiest = throttled_rooms.most_common(MAX_THROTTLED_ROOMS // 2)
+            throttled_rooms.clear()
+            throttled_rooms.update(dict(busiest))
+    else:
+        stats["allowed"] += 1
+    return retry_after
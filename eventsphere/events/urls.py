@@ -44,6 +44,11 @@ urlpatterns = [
     path("profile/", user_profile, name="user_profile"),
     path("my_tickets/", my_tickets, name="my_tickets"),
     path("events/<int:event_id>/buy-tickets/", views.buy_tickets, name="buy_tickets"),
+    path(
+        "events/<int:event_id>/badges.zip",
+        views.export_event_badges,
+        name="export_event_badges",
+    ),
     path(
         "creator/", views.creator_dashboard, name="creator_dashboard"
     ),  # creator dashboard url
@@ -55,6 +60,7 @@ urlpatterns = [
     path("creatorprofile/", views.creator_profile, name="creator_profile"),
     path("event/<int:event_id>/join_chat/", views.join_chat, name="join_chat"),
     path("chat_room/<int:room_id>/", views.chat_room, name="chat_room"),
+    path("chat_room/<int:room_id>/history/", views.chat_history, name="chat_history"),
     path(
         "chat_room/<int:room_id>/send_message/", views.send_message, name="send_message"
     ),
@@ -86,7 +92,21 @@ urlpatterns = [
         views.get_user_unread_notifications,
         name="get_user_unread_notifications",
     ),
+    path(
+        "notifications/unread_count",
+        views.get_unread_notification_count,
+        name="unread_notification_count",
+    ),
+    path(
+        "notifications/unread",
+        views.list_unread_notifications,
+        name="list_unread_notifications",
+    ),
     path("mapview/", map_view, name="map_view"),  # Map View
+    path("mapview/events/", views.map_events, name="map_events"),
+    path("geocode/", views.geocode_search, name="geocode_search"),
+    path("image-upload/", views.image_upload_url, name="image_upload_url"),
+    path("image-upload/local/", views.local_image_upload, name="local_image_upload"),
     path("password_reset/", CustomPasswordResetView.as_view(), name="password_reset"),
     path(
         "password_reset/done/",
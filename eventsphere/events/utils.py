@@ -1,11 +1,11 @@
 from django.shortcuts import redirect
 from django.urls import reverse
-from .models import CreatorProfile, UserProfile
+from .roles import request_role
 
 
 def admin_required(view_func):
     def _wrapped_view_func(request, *args, **kwargs):
-        if not request.user.is_superuser:
+        if not request_role(request).is_admin:
             return redirect(reverse("not_authorized"))
         return view_func(request, *args, **kwargs)
 
@@ -14,7 +14,7 @@ def admin_required(view_func):
 
 def creator_required(view_func):
     def _wrapped_view_func(request, *args, **kwargs):
-        if not CreatorProfile.objects.filter(creator=request.user).exists():
+        if not request_role(request).is_creator:
             return redirect(reverse("not_authorized"))
         return view_func(request, *args, **kwargs)
 
@@ -23,7 +23,7 @@ def creator_required(view_func):
 
 def user_required(view_func):
     def _wrapped_view_func(request, *args, **kwargs):
-        if not UserProfile.objects.filter(user=request.user).exists():
+        if not request_role(request).is_user:
             return redirect(reverse("not_authorized"))
         return view_func(request, *args, **kwargs)
 
@@ -32,10 +32,8 @@ def user_required(view_func):
 
 def admin_or_creator_required(view_func):
     def _wrapped_view_func(request, *args, **kwargs):
-        if (
-            not request.user.is_superuser
-            and not CreatorProfile.objects.filter(creator=request.user).exists()
-        ):
+        role = request_role(request)
+        if not role.is_admin and not role.is_creator:
             return redirect(reverse("not_authorized"))
         return view_func(request, *args, **kwargs)
 
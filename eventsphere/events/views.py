@@ -1,11 +1,11 @@
 import base64
-from datetime import timedelta
-from io import BytesIO
-from better_profanity import profanity
-import boto3
-from django.http import JsonResponse
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta
+from django.core import signing
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 import json
-import qrcode  # type: ignore
 from asgiref.sync import async_to_sync, sync_to_async
 from botocore.exceptions import BotoCoreError, ClientError
 from channels.layers import get_channel_layer
@@ -15,13 +15,13 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User
 from django.contrib.auth.views import PasswordResetView
-from django.db.models import Q, Sum, F, FloatField, Case, When, Count
-from django.db import transaction
-from django.db.models.functions import Coalesce, TruncDate
+from django.db.models import Q, Sum
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
+from django.utils.safestring import mark_safe
 from django.urls import reverse_lazy
-from django.contrib.auth.models import AnonymousUser
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from .forms import (
     UserProfileForm,
     CreatorProfileForm,
@@ -38,10 +38,50 @@ from .models import (
     ChatRoom,
     ChatMessage,
     RoomMember,
+    RegisteredEmail,
     Favorite,
     Notification,
+    NotificationCounter,
 )
+from . import moderation
+from .analytics import parse_range_param, ticket_timeseries
+from .badges import stream_badge_zip
 from .consumers import notify_group_members
+from .dashboard import get_creator_summary, invalidate_creator_summary
+from .geocoding import GeocodingError, GeocodingThrottled, geocode, geocode_address
+from .images import (
+    UPLOAD_EXPIRES,
+    UPLOAD_EXTENSIONS,
+    UPLOAD_TOKEN_SALT,
+    LocalImageStore,
+    clear_image_variants,
+    get_image_store,
+    key_digest,
+    max_upload_size,
+    queue_event_image,
+    save_uploaded_image,
+    upload_key,
+)
+from .detail_cache import get_event_detail, live_event_state
+from .inventory import purchase_tickets
+from .maps import (
+    CLUSTER_MAX_ZOOM,
+    MAX_ZOOM,
+    clustered_features,
+    events_in_bbox,
+    parse_bbox,
+    parse_zoom,
+    stream_feature_collection,
+)
+from .querysets import (
+    chat_room_with_members,
+    chat_rooms_for,
+    event_cards,
+    tickets_for,
+)
+from .qr_codes import FORMATS as QR_FORMATS, get_qr_code, ticket_qr_payload
+from .roles import request_role
+from .search import upcoming_and_past_events
 from .utils import (
     admin_required,
     creator_required,
@@ -52,7 +92,7 @@ from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from django.utils.timezone import now  # Ensure this is imported
 
-profanity.load_censor_words()
+logger = logging.getLogger(__name__)
 
 
 def contacts(request):
@@ -62,7 +102,7 @@ def contacts(request):
 @login_required
 def profile_chats(request):
     # Fetch all chat rooms the user is a member of
-    chat_rooms = ChatRoom.objects.filter(members__user=request.user).distinct()
+    chat_rooms = chat_rooms_for(request.user)
 
     return render(
         request,
@@ -91,7 +131,9 @@ def toggle_favorite(request, event_id):
 @login_required
 def profile_favorites(request):  # pragma: no cover
     # Get the user's favorited events
-    favorited_events = Event.objects.filter(favorited_by__user=request.user)
+    favorited_events = event_cards(
+        Event.objects.filter(favorited_by__user=request.user)
+    )
 
     return render(
         request,
@@ -104,25 +146,48 @@ def profile_favorites(request):  # pragma: no cover
 
 @login_required
 def map_view(request):
-    current_time = timezone.now()
-    events = Event.objects.filter(date_time__gte=current_time)
-    events_data = [
-        {
-            "id": event.id,
-            "name": event.name,
-            "latitude": event.latitude,
-            "longitude": event.longitude,
-            "location": event.location,
-            "image_url": event.image_url,
-            "description": event.schedule,
-        }
-        for event in events
-        if event.latitude and event.longitude  # Ensure events with valid coordinates
-    ]
-    context = {
-        "events_json": json.dumps(events_data),  # Serialize the data
-    }
-    return render(request, "events/map_view.html", context)
+    return render(request, "events/map_view.html")
+
+
+@login_required
+def map_events(request):
+    """Upcoming events inside the map viewport, streamed as GeoJSON."""
+    try:
+        south, north, ranges = parse_bbox(request.GET.get("bbox"))
+        zoom = parse_zoom(request.GET.get("zoom", MAX_ZOOM))
+        if zoom <= CLUSTER_MAX_ZOOM:
+            features = clustered_features(south, north, ranges, zoom)
+            return JsonResponse(
+                {"type": "FeatureCollection", "features": features},
+                content_type="application/geo+json",
+            )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    events = events_in_bbox(south, north, ranges)
+    return StreamingHttpResponse(
+        stream_feature_collection(events), content_type="application/geo+json"
+    )
+
+
+@login_required
+def geocode_search(request):
+    """Address suggestions for the location fields, served from the geocode cache."""
+    query = request.GET.get("q", "").strip()
+    if len(query) < 3:
+        return JsonResponse({"results": []})
+    try:
+        results = geocode(query, request.GET.get("countrycodes"))
+    except GeocodingThrottled as e:
+        # Cached queries still answer; new ones wait for the provider's limit
+        response = JsonResponse(
+            {"error": "Too many lookups, retry shortly."}, status=429
+        )
+        response["Retry-After"] = str(math.ceil(e.retry_after))
+        return response
+    except GeocodingError:
+        return JsonResponse({"error": "Location lookup is unavailable."}, status=502)
+    return JsonResponse({"results": results})
 
 
 @login_required
@@ -160,31 +225,114 @@ def join_chat(request, event_id):
     return redirect("chat_room", room_id=chat_room.id)
 
 
+CHAT_HISTORY_PAGE_SIZE = 50
+
+
+def encode_chat_cursor(message):
+    raw = f"{message.timestamp.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_chat_cursor(cursor):
+    try:
+        timestamp, message_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(timestamp), int(message_id)
+    except ValueError:
+        return None
+
+
+def fetch_chat_history(chat_room, before=None, limit=None):
+    """
+    Return up to `limit` chat messages older than the `before` cursor (or the
+    latest ones), oldest first, plus the cursor for the next older page.
+    Walks the (room, timestamp, id) index instead of loading the whole room.
+    """
+    limit = limit or CHAT_HISTORY_PAGE_SIZE
+    history = (
+        ChatMessage.objects.filter(room=chat_room)
+        .exclude(content__contains="[Announcement]")
+        .select_related("user")
+        .order_by("-timestamp", "-id")
+    )
+    if before:
+        timestamp, message_id = before
+        history = history.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id)
+        )
+
+    page = list(history[: limit + 1])
+    next_cursor = encode_chat_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit][::-1], next_cursor
+
+
 @login_required
 def chat_room(request, room_id):
-    # Load the chat room and its message history
-    chat_room = get_object_or_404(ChatRoom, id=room_id)
-    messages = ChatMessage.objects.filter(room=chat_room).order_by("timestamp")
-    members = RoomMember.objects.filter(room=chat_room, is_kicked=False)
+    # Load the chat room and the latest page of its message history
+    chat_room = get_object_or_404(chat_room_with_members(), id=room_id)
+    members = [member for member in chat_room.members.all() if not member.is_kicked]
 
     # Check if the user is a member and redirect if they're not
-    if not members.filter(user=request.user).exists():
-        return redirect("join_chat", event_id=chat_room.event.id)
+    if not any(member.user_id == request.user.id for member in members):
+        return redirect("join_chat", event_id=chat_room.event_id)
 
     # mark_event_as_read(request.user, room_id)
 
+    messages, next_cursor = fetch_chat_history(chat_room)
+    announcements = ChatMessage.objects.filter(
+        room=chat_room, content__contains="[Announcement]"
+    ).order_by("-timestamp", "-id")[:CHAT_HISTORY_PAGE_SIZE]
+
     return render(
         request,
         "events/chat_room.html",
         {
             "chat_room": chat_room,
             "messages": messages,
+            "announcements": list(announcements)[::-1],
+            "next_cursor": next_cursor,
             "members": members,
             "is_creator": chat_room.creator.creator == request.user,
         },
     )
 
 
+@login_required
+def chat_history(request, room_id):
+    chat_room = get_object_or_404(ChatRoom, id=room_id)
+    if not RoomMember.objects.filter(
+        room=chat_room, user=request.user, is_kicked=False
+    ).exists():
+        return JsonResponse({"error": "You are not a member of this chat."}, status=403)
+
+    before = None
+    if request.GET.get("before"):
+        before = decode_chat_cursor(request.GET["before"])
+        if before is None:
+            return JsonResponse({"error": "Invalid cursor."}, status=400)
+
+    messages, next_cursor = fetch_chat_history(chat_room, before)
+    creator_id = chat_room.creator.creator_id
+    return JsonResponse(
+        {
+            "messages": [
+                {
+                    "id": message.id,
+                    "username": message.user.username,
+                    "message": message.content,
+                    "timestamp": timezone.localtime(message.timestamp).strftime(
+                        "%Y-%m-%d %H:%M"
+                    ),
+                    "is_creator": message.user_id == creator_id,
+                }
+                for message in messages
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
 @login_required
 def send_message(request, room_id):
     chat_room = get_object_or_404(ChatRoom, id=room_id)
@@ -200,7 +348,7 @@ def send_message(request, room_id):
         )
 
     if content:
-        if profanity.contains_profanity(content):  # pragma: no cover
+        if moderation.contains_profanity(content):  # pragma: no cover
             return JsonResponse(
                 {
                     "error": "Your message contains inappropriate language. Please revise."
@@ -307,6 +455,41 @@ def get_user_unread_notifications(request):
     )
 
 
+@login_required
+def get_unread_notification_count(request):
+    # Backed by the per-user counter, so the badge costs one indexed lookup
+    return JsonResponse({"count": NotificationCounter.unread_for(request.user)})
+
+
+NOTIFICATIONS_PAGE_SIZE = 20
+
+
+@login_required
+def list_unread_notifications(request):
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    offset = (page - 1) * NOTIFICATIONS_PAGE_SIZE
+    # Fetch one extra row to know whether there is a next page without a COUNT
+    end = offset + NOTIFICATIONS_PAGE_SIZE + 1
+
+    notifications = list(
+        Notification.objects.filter(user=request.user, is_read=False)
+        .order_by("-created_at")
+        .values(
+            "id", "message", "created_at", "type", "title", "sub_title", "url_link"
+        )[offset:end]
+    )
+    return JsonResponse(
+        {
+            "results": notifications[:NOTIFICATIONS_PAGE_SIZE],
+            "page": page,
+            "has_next": len(notifications) > NOTIFICATIONS_PAGE_SIZE,
+        }
+    )
+
+
 def fetch_unread_notif_db(user):
     res = Notification.objects.filter(user=user, is_read=False).order_by("-created_at")
     return list(
@@ -319,19 +502,19 @@ def fetch_unread_notif_db(user):
 @login_required
 def mark_as_read(request, notification_id):
     if request.method == "POST":
-        try:
-            notification = Notification.objects.get(
-                id=notification_id, user=request.user
-            )
-            notification.is_read = True
-            notification.save()
-            return JsonResponse(
-                {"success": True, "message": "Notification marked as read."}
-            )
-        except Notification.DoesNotExist:
+        notifications = Notification.objects.filter(
+            id=notification_id, user=request.user
+        )
+        # Only the request that actually flips the flag decrements the counter
+        if notifications.filter(is_read=False).update(is_read=True):
+            NotificationCounter.decrement(request.user)
+        elif not notifications.exists():
             return JsonResponse(
                 {"success": False, "message": "Notification not found."}, status=404
             )
+        return JsonResponse(
+            {"success": True, "message": "Notification marked as read."}
+        )
     return JsonResponse(
         {"success": False, "message": "Invalid request method."}, status=405
     )
@@ -340,9 +523,10 @@ def mark_as_read(request, notification_id):
 @login_required
 def mark_all_as_read(request):
     if request.method == "POST":
-        Notification.objects.filter(user=request.user, is_read=False).update(
+        marked = Notification.objects.filter(user=request.user, is_read=False).update(
             is_read=True
         )
+        NotificationCounter.decrement(request.user, marked)
         return JsonResponse({"success": True})
     return JsonResponse(
         {"success": False, "message": "Invalid request method."}, status=405
@@ -404,7 +588,7 @@ def login_view(request):
                 return redirect(
                     "event_list"
                 )  # Admin is redirected to event_list (admin dashboard)
-            elif CreatorProfile.objects.filter(creator=request.user).exists():
+            elif request_role(request).is_creator:
                 return redirect("creator_dashboard")
             else:
                 return redirect("user_home")  # Regular user is redirected to user_home
@@ -419,31 +603,24 @@ def home_page(request):
     return render(request, "events/homepage.html")
 
 
+@login_required
 def generate_event_qr_code(request, event_id):
-    user = request.user
-    tickets = Ticket.objects.filter(user=user, event__id=event_id)
+    fmt = request.GET.get("format", "png")
+    if fmt not in QR_FORMATS:
+        return JsonResponse({"error": "Unsupported format."}, status=400)
 
-    if not tickets.exists():
+    qr_data = ticket_qr_payload(request.user, event_id)
+    if qr_data is None:
         return JsonResponse({"error": "No tickets found for this event."}, status=404)
 
-    # Prepare the QR code data
-    qr_data = f"User: {user.username}\nEvent: {tickets.first().event.name}\nTotal Tickets: {tickets.aggregate(total_quantity=Sum('quantity'))['total_quantity']}"
-
-    # Create the QR code
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(qr_data)
-    qr.make(fit=True)
-
-    # Save the image to a BytesIO stream
-    img = qr.make_image(fill="black", back_color="white")
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-
-    # Convert the image to base64
-    img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-    # Return as JSON response
-    return JsonResponse({"qr_code": img_str})
+    qr_code = get_qr_code(qr_data, fmt)
+    if qr_code is None:
+        # Still rendering on the worker pool, or the render failed and was
+        # logged; either way the client asks again shortly
+        response = JsonResponse({"pending": True}, status=202)
+        response["Retry-After"] = "1"
+        return response
+    return JsonResponse({"qr_code": qr_code, "format": fmt})
 
 
 def user_home(request):
@@ -484,28 +661,9 @@ def home(request):
 def user_event_list(request):
     query = request.GET.get("q")
     category = request.GET.get("category")
-    current_time = timezone.now()
-
-    # Separate upcoming and past events
-    upcoming_events = Event.objects.filter(date_time__gte=current_time)
-    past_events = Event.objects.filter(date_time__lt=current_time)
-
-    # Apply filters to both upcoming and past events
-    if query:
-        upcoming_events = upcoming_events.filter(
-            Q(name__icontains=query)
-            | Q(location__icontains=query)
-            | Q(category__icontains=query)
-        )
-        past_events = past_events.filter(
-            Q(name__icontains=query)
-            | Q(location__icontains=query)
-            | Q(category__icontains=query)
-        )
-
-    if category:
-        upcoming_events = upcoming_events.filter(category__iexact=category)
-        past_events = past_events.filter(category__iexact=category)
+    upcoming_events, past_events = upcoming_and_past_events(
+        query, category, user=request.user
+    )
 
     return render(
         request,
@@ -523,9 +681,13 @@ def tickets_per_filter(request):  # pragma: no cover
     return JsonResponse()
 
 
+ANALYTICS_DEFAULT_DAYS = 8
+
+
 def fetch_filter_wise_data(request):
     event_id = request.GET.get("event_id")
     category = request.GET.get("category")
+    bucket = request.GET.get("bucket", "day")
 
     # Filter based on selected event and category
     tickets = Ticket.objects.all()
@@ -534,48 +696,29 @@ def fetch_filter_wise_data(request):
     if category:
         tickets = tickets.filter(event__category=category)
 
-    end_date = timezone.now()
-    # start_date = end_date - timedelta(days=10)
-
-    date_range = [end_date - timedelta(days=i) for i in range(8)]
-    start_date = date_range[-1]
-    tickets_sold_per_day = {day: 0 for day in date_range}
-
-    # Filter tickets within the last 10 days
-    tickets_sold_data = (
-        tickets.filter(created_at__range=(start_date, end_date))
-        .annotate(day=TruncDate("created_at"))  # Group by day (created_at)
-        .values("day")
-        .annotate(total_sold=Coalesce(Sum("quantity"), 0))  # Sum quantity per day
-        .order_by("day")  # Order by date for chronological display
-    )
-
-    for entry in tickets_sold_data:
-        tickets_sold_per_day[entry["day"]] = entry["total_sold"]
-
-    unique_users_data = {day: 0 for day in date_range}
-    if event_id:
-        user_counts_per_day = (
-            tickets.filter(event_id=event_id)
-            .filter(created_at__range=(start_date, end_date))
-            .values("created_at", "user_id")
-            .distinct()
-            .annotate(day=TruncDate("created_at"))
-            .values("day")
-            .annotate(unique_users=Count("user_id"))
-            .order_by("day")
-        )
-
-        # unique_users_data = {entry["day"]: entry["unique_users"] for entry in user_counts_per_day}
-        for entry in user_counts_per_day:
-            unique_users_data[entry["day"]] = entry["unique_users"]
+    try:
+        end_date = parse_range_param(request.GET.get("end")) or timezone.now()
+        start_date = parse_range_param(request.GET.get("start"))
+        if start_date is None:
+            days = int(request.GET.get("days", ANALYTICS_DEFAULT_DAYS))
+            if days < 1:
+                raise ValueError("days must be positive.")
+            # `days` spans whole buckets ending with the current one, so
+            # days=2 is 48 hourly buckets but 2 daily ones
+            step = timedelta(hours=1) if bucket == "hour" else timedelta(days=1)
+            start_date = end_date - timedelta(days=days) + step
+        if start_date > end_date:
+            raise ValueError("start must be before end.")
+        series = ticket_timeseries(tickets, start_date, end_date, bucket)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    # print(list(unique_users_data.values()))
-    # Convert the queryset to a list of dictionaries for JSON response
     return JsonResponse(
         {
-            "ticket_sales_data": list(tickets_sold_per_day.values()),
-            "unique_users_data": list(unique_users_data.values()),
+            "labels": series["labels"],
+            "ticket_sales_data": series["tickets_sold"],
+            "unique_users_data": series["unique_users"],
+            "orders_data": series["orders"],
         }
     )
 
@@ -589,59 +732,16 @@ def creator_dashboard(request):
         creator_profile = None
 
     if creator_profile:
-        events = Event.objects.filter(created_by=creator_profile)
-        categories = events.values_list("category", flat=True).distinct()
-
-        # Upcoming events data
-        upcoming_events = events.filter(date_time__gt=timezone.now())
-
-        # Calculate category-wise total tickets sold for upcoming events
-        category_wise_tickets_sold = list(
-            upcoming_events.values("category").annotate(
-                total_sold=Coalesce(Sum("ticketsSold"), 0)
-            )
-        )
-
-        # Calculate percentage of tickets sold for each category in upcoming events
-        category_wise_percentage_sold = list(
-            upcoming_events.values("category")
-            .annotate(
-                total_sold=Coalesce(Sum("ticketsSold"), 0),
-                total_capacity=Coalesce(
-                    Sum("numTickets"), 1
-                ),  # Use 1 to avoid division by zero
-            )
-            .annotate(
-                percentage_sold=Case(
-                    When(
-                        total_capacity__gt=0,
-                        then=(F("total_sold") * 100.0 / F("total_capacity")),
-                    ),
-                    default=0,
-                    output_field=FloatField(),
-                )
-            )
-        )
-
-        # Unsold tickets for past events
-        past_events = events.filter(date_time__lt=timezone.now())
-        unsold_tickets_data = list(
-            past_events.values("category")
-            .annotate(
-                unsold_tickets=Coalesce(Sum(F("numTickets") - F("ticketsSold")), 0),
-                total_capacity=Coalesce(Sum("numTickets"), 1),
-            )
-            .annotate(
-                percentage_unsold=Case(
-                    When(
-                        total_capacity__gt=0,
-                        then=(F("unsold_tickets") * 100.0 / F("total_capacity")),
-                    ),
-                    default=0,
-                    output_field=FloatField(),
-                )
-            )
+        events = Event.objects.filter(created_by=creator_profile).select_related(
+            "chat_room"
         )
+        # Chart aggregates come from a cached per-creator summary that is
+        # invalidated whenever the creator's events or ticket sales change
+        summary = get_creator_summary(creator_profile)
+        categories = summary["categories"]
+        category_wise_tickets_sold = summary["category_wise_tickets_sold"]
+        category_wise_percentage_sold = summary["category_wise_percentage_sold"]
+        unsold_tickets_data = summary["unsold_tickets_data"]
 
     else:
         categories = []
@@ -663,6 +763,17 @@ def creator_dashboard(request):
     )
 
 
+@login_required
+@creator_required
+def export_event_badges(request, event_id):
+    event = get_object_or_404(Event, id=event_id, created_by__creator=request.user)
+    response = StreamingHttpResponse(
+        stream_badge_zip(event), content_type="application/zip"
+    )
+    response["Content-Disposition"] = f'attachment; filename="badges-{event.id}.zip"'
+    return response
+
+
 @login_required
 @admin_required
 def event_list(request):
@@ -671,21 +782,24 @@ def event_list(request):
 
 
 def event_detail(request, pk):
-    event = get_object_or_404(Event, id=pk)
+    live = live_event_state(pk, request.user)
+    detail = live and get_event_detail(pk)
+    if not detail:
+        raise Http404("No Event matches the given query.")
 
-    # Check if user is authenticated before checking favorites
-    if not isinstance(request.user, AnonymousUser):
-        is_favorited = Favorite.objects.filter(user=request.user, event=event).exists()
-    else:
-        is_favorited = False  # Anonymous users can't favorite events
+    # The cached copy is ours to update with the live ticket counts
+    event = detail["event"]
+    event.numTickets = live["numTickets"]
+    event.ticketsSold = live["ticketsSold"]
 
     return render(
         request,
         "events/event_detail.html",
         {
             "event": event,
+            "event_body": mark_safe(detail["body"]),
             "now": timezone.now(),
-            "is_favorited": is_favorited,
+            "is_favorited": live["is_favorited"],
         },
     )
 
@@ -724,18 +838,7 @@ def signup(request):
                 messages.error(request, "Enter a valid email address.")
                 return render(request, "events/signup.html")
 
-            # Admin email check
-            if AdminProfile.objects.filter(email=email).exists():
-                messages.error(request, "This email is already in use.")
-                return render(request, "events/signup.html")
-
-            # Creator email check
-            if CreatorProfile.objects.filter(organization_email=email).exists():
-                messages.error(request, "This email is already in use.")
-                return render(request, "events/signup.html")
-
-            # User check
-            if UserProfile.objects.filter(email=email).exists():
+            if RegisteredEmail.in_use(email):
                 messages.error(request, "This email is already in use.")
                 return render(request, "events/signup.html")
 
@@ -787,6 +890,12 @@ class CustomPasswordResetView(PasswordResetView):
     success_url = reverse_lazy("password_reset_done")
 
 
+def fill_coordinates(event):
+    # Typed-in addresses that weren't picked from the suggestions still get
+    # coordinates, so the event shows up on the map
+    event.latitude, event.longitude = geocode_address(event.location) or (None, None)
+
+
 @login_required
 @creator_required
 def create_event(request):
@@ -794,27 +903,23 @@ def create_event(request):
         form = EventForm(request.POST, request.FILES)
         if form.is_valid():
             event = form.save(commit=False)
-            image = request.FILES.get("image")
-            event.created_by = request.user.creatorprofile
-
-            if image:
-                # Upload the image to S3
-                s3 = boto3.client("s3")
-                bucket_name = "eventsphere-images"
-                image_key = f"events/{image.name}"
-
-                # Upload the file
-                s3.upload_fileobj(
-                    image,
-                    bucket_name,
-                    image_key,
-                    ExtraArgs={"ContentType": image.content_type},
-                )
+            event.created_by_id = request_role(request).creator_id
+            if event.latitude is None or event.longitude is None:
+                fill_coordinates(event)
 
-                # Get the image URL
-                event.image_url = f"https://{bucket_name}.s3.amazonaws.com/{image_key}"
+            try:
+                image_key, image_data = attach_image(
+                    event, request.FILES.get("image"), request.POST.get("image_key")
+                )
+            except (BotoCoreError, ClientError) as e:
+                logger.warning("Could not store event image: %s", e)
+                form.add_error("image", "Failed to upload image. Please try again.")
+                return render(request, "events/create_event.html", {"form": form})
 
             event.save()
+            if image_key:
+                # Thumbnails and the blurhash are made off the request path
+                queue_event_image(event, image_key, image_data)
             messages.success(request, "Event created successfully!")
             if request.user.is_superuser:  # pragma: no cover
                 return redirect("event_list")
@@ -825,6 +930,87 @@ def create_event(request):
     return render(request, "events/create_event.html", {"form": form})
 
 
+def attach_image(event, image, image_key):
+    """
+    Point `event` at its new image: a file posted with the form is stored
+    here, while a key means the browser already uploaded it to storage.
+    Returns the key and, for posted files, the bytes (or Nones if there is
+    no new image).
+    """
+    store = get_image_store()
+    image_data = None
+    if image:
+        image_key, image_data = save_uploaded_image(image, store)
+    elif key_digest(image_key) is None or not store.exists(image_key):
+        return None, None
+    event.image_url = store.url(image_key)
+    clear_image_variants(event)
+    return image_key, image_data
+
+
+@login_required
+@admin_or_creator_required
+@require_POST
+def image_upload_url(request):
+    """
+    Where the browser should upload an event image to, keyed by the SHA-256
+    it computed. Reports `exists` instead when the image is already stored.
+    """
+    digest = request.POST.get("sha256", "").lower()
+    content_type = request.POST.get("content_type", "")
+    try:
+        size = int(request.POST.get("size", ""))
+    except ValueError:
+        return JsonResponse({"error": "Invalid size."}, status=400)
+    if content_type not in UPLOAD_EXTENSIONS:
+        return JsonResponse({"error": "Unsupported image type."}, status=400)
+    if not 0 < size <= max_upload_size():
+        return JsonResponse({"error": "Image is too large."}, status=400)
+
+    image_key = upload_key(digest, content_type)
+    if key_digest(image_key) is None:
+        return JsonResponse({"error": "Invalid digest."}, status=400)
+
+    store = get_image_store()
+    if store.exists(image_key):
+        return JsonResponse({"key": image_key, "exists": True})
+    upload = store.presigned_post(image_key, content_type)
+    return JsonResponse(
+        {
+            "key": image_key,
+            "exists": False,
+            "url": upload["url"],
+            "fields": upload["fields"],
+        }
+    )
+
+
+@csrf_exempt
+@require_POST
+def local_image_upload(request):
+    """Accepts the form image_upload_url hands out when images are stored locally."""
+    store = get_image_store()
+    if not isinstance(store, LocalImageStore):
+        raise Http404
+    try:
+        signed = signing.loads(
+            request.POST.get("token", ""),
+            salt=UPLOAD_TOKEN_SALT,
+            max_age=UPLOAD_EXPIRES,
+        )
+    except signing.BadSignature:
+        return JsonResponse({"error": "Invalid upload token."}, status=403)
+
+    upload = request.FILES.get("file")
+    if upload is None or not 0 < upload.size <= max_upload_size():
+        return JsonResponse({"error": "Invalid file."}, status=400)
+    data = upload.read()
+    if hashlib.sha256(data).hexdigest() != key_digest(signed["key"]):
+        return JsonResponse({"error": "File does not match its key."}, status=400)
+    store.save(signed["key"], data, signed["content_type"])
+    return HttpResponse(status=204)
+
+
 @login_required
 @admin_or_creator_required
 def update_event_view(request, event_id):
@@ -846,6 +1032,8 @@ def update_event_view(request, event_id):
                 # Update latitude and longitude if a new location is provided
                 event.latitude = form.cleaned_data.get("latitude")
                 event.longitude = form.cleaned_data.get("longitude")
+                if event.latitude is None or event.longitude is None:
+                    fill_coordinates(event)
             else:
                 # Retain existing latitude and longitude
                 event.latitude = initial_latitude
@@ -857,36 +1045,25 @@ def update_event_view(request, event_id):
             if form.cleaned_data.get("numTickets") is None:
                 event.numTickets = initial_numTickets
 
-            # Handle image upload if a new image is uploaded
-            image = request.FILES.get("image")
-            if image:
-                try:
-                    s3 = boto3.client("s3")
-                    bucket_name = "eventsphere-images"
-                    image_key = f"events/{image.name}"
-
-                    s3.upload_fileobj(
-                        image,
-                        bucket_name,
-                        image_key,
-                        ExtraArgs={"ContentType": image.content_type},
-                    )
-                    event.image_url = (
-                        f"https://{bucket_name}.s3.amazonaws.com/{image_key}"
-                    )
-
-                except (BotoCoreError, ClientError) as e:
-                    print(f"Error uploading to S3: {e}")
-                    return render(
-                        request,
-                        "events/update_event.html",
-                        {
-                            "form": form,
-                            "errors": ["Failed to upload image. Please try again."],
-                        },
-                    )
+            # Attach a new image if one was uploaded
+            try:
+                image_key, image_data = attach_image(
+                    event, request.FILES.get("image"), request.POST.get("image_key")
+                )
+            except (BotoCoreError, ClientError) as e:
+                logger.warning("Could not store event image: %s", e)
+                return render(
+                    request,
+                    "events/update_event.html",
+                    {
+                        "form": form,
+                        "errors": ["Failed to upload image. Please try again."],
+                    },
+                )
 
             event.save()
+            if image_key:
+                queue_event_image(event, image_key, image_data)
             if request.user.is_superuser:
                 return redirect("event_list")
             return redirect("creator_dashboard")
@@ -974,7 +1151,7 @@ def creator_profile(request):
 
 @login_required
 def my_tickets(request):
-    tickets = Ticket.objects.filter(user=request.user)
+    tickets = tickets_for(request.user)
     return render(request, "events/my_tickets.html", {"tickets": tickets})
 
 
@@ -994,9 +1171,12 @@ def buy_tickets(request, event_id):
     if request.method == "POST":
         form = TicketPurchaseForm(request.POST)
         if form.is_valid():
-            quantity = form.cleaned_data["quantity"]
-            # Check ticket availability early
-            if quantity > event.tickets_left:
+            ticket = form.save(commit=False)
+            ticket.user = request.user
+            ticket.created_at = timezone.now().date()
+
+            # Availability is checked and claimed in a single conditional UPDATE
+            if not purchase_tickets(ticket, event.id):
                 messages.error(
                     request,
                     "Not enough tickets available!",
@@ -1004,19 +1184,7 @@ def buy_tickets(request, event_id):
                 return render(
                     request, "events/buy_tickets.html", {"event": event, "form": form}
                 )
-
-            with transaction.atomic():
-                ticket = form.save(commit=False)
-                ticket.user = request.user
-                ticket.event = event
-                ticket.created_at = timezone.now().date()
-
-                # Save the ticket
-                ticket.save()
-
-                # Update the event's ticketsSold
-                event.ticketsSold += ticket.quantity
-                event.save(update_fields=["ticketsSold"])
+            invalidate_creator_summary(event.created_by_id)
 
             if ticket.quantity == 1:
                 messages.success(request, "Ticket purchased successfully!")
@@ -1040,15 +1208,8 @@ def buy_tickets(request, event_id):
 
 def not_authorized(request):
     # Determine the user's homepage based on their role
-    if request.user.is_superuser:
-        redirect_url = "event_list"  # Admin dashboard
-    elif CreatorProfile.objects.filter(creator=request.user).exists():
-        redirect_url = "creator_dashboard"  # Creator dashboard
-    else:
-        redirect_url = "user_home"  # User homepage
-
     context = {
-        "redirect_url": redirect_url,
+        "redirect_url": request_role(request).home,
     }
 
     return render(request, "events/not_authorized.html", context, status=403)
@@ -0,0 +1,158 @@
+# events/write_behind.py
+
+import asyncio
+import logging
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .delivery import shutdown_hooks
+from .models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+
+class ChatMessageBuffer:
+    """
+    Per-room write-behind buffer for chat messages. Messages are collected in
+    memory and written with one bulk_create once a room has max_size pending
+    messages or flush_interval seconds have passed since the first one.
+    Flushes for a room are serialized, so rows are inserted in send order.
+    A failed write puts the batch back, up to max_retained messages per room,
+    and tries again after flush_interval.
+    """
+
+    def __init__(self, max_size, flush_interval, max_retained=None):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.max_retained = max_retained or max_size * 20
+        self.stats = {
+            "buffered": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "failed": 0,
+            "dropped": 0,
+        }
+        self._loop = None
+        self._pending = {}  # room_id -> [ChatMessage, ...] in send order
+        self._reset()
+
+    def _reset(self):
+        self._locks = {}
+        self._timers = {}
+        self._tasks = set()
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Locks and timers belong to the loop that created them; pending
+            # messages carry over and get a timer on the new loop
+            self._reset()
+            self._loop = loop
+            for room_id in self._pending:
+                self._start_timer(room_id)
+        return loop
+
+    def _start_timer(self, room_id):
+        if room_id not in self._timers:
+            self._timers[room_id] = self._loop.call_later(
+                self.flush_interval, self._schedule_flush, room_id
+            )
+
+    def pending_count(self, room_id=None):
+        if room_id is not None:
+            return len(self._pending.get(room_id, []))
+        return sum(len(messages) for messages in self._pending.values())
+
+    async def add(self, room_id, user, content):
+        self._bind_loop()
+        pending = self._pending.setdefault(room_id, [])
+        # Stamped now, not when the batch is written, so stored times and
+        # order match what the room saw
+        pending.append(
+            ChatMessage(
+                room_id=room_id, user=user, content=content, timestamp=timezone.now()
+            )
+        )
+        self.stats["buffered"] += 1
+
+        if len(pending) >= self.max_size:
+            await self.flush(room_id)
+        else:
+            self._start_timer(room_id)
+
+    def _schedule_flush(self, room_id):
+        self._timers.pop(room_id, None)
+        task = self._loop.create_task(self.flush(room_id))
+        # Keep a reference so the task isn't garbage collected mid-flush
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, room_id):
+        loop = asyncio.get_running_loop()
+        if self._loop is not None and self._loop is not loop:
+            if self._loop.is_running():
+                # The owning loop runs in another thread; flush over there
+                future = asyncio.run_coroutine_threadsafe(
+                    self.flush(room_id), self._loop
+                )
+                await asyncio.wrap_future(future)
+                return
+            # The owning loop is gone, so this one takes the buffer over
+            self._bind_loop()
+        timer = self._timers.pop(room_id, None)
+        if timer is not None:
+            timer.cancel()
+
+        lock = self._locks.setdefault(room_id, asyncio.Lock())
+        async with lock:
+            batch = self._pending.pop(room_id, [])
+            if not batch:
+                return
+            try:
+                await save_messages(batch)
+                self.stats["flushed"] += len(batch)
+                self.stats["flushes"] += 1
+            except Exception:
+                self.stats["failed"] += len(batch)
+                logger.exception(
+                    "Failed to write %d buffered messages for room %s, will retry",
+                    len(batch),
+                    room_id,
+                )
+                self._requeue(room_id, batch)
+
+    def _requeue(self, room_id, batch):
+        pending = batch + self._pending.get(room_id, [])
+        overflow = len(pending) - self.max_retained
+        if overflow > 0:
+            self.stats["dropped"] += overflow
+            logger.error(
+                "Dropping %d oldest buffered messages for room %s",
+                overflow,
+                room_id,
+            )
+            pending = pending[overflow:]
+        self._pending[room_id] = pending
+        self._start_timer(room_id)
+
+    async def flush_all(self):
+        for room_id in list(self._pending):
+            await self.flush(room_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+
+@database_sync_to_async
+def save_messages(messages):  # pragma: no cover
+    ChatMessage.objects.bulk_create(messages)
+
+
+chat_message_buffer = ChatMessageBuffer(
+    max_size=getattr(settings, "CHAT_WRITE_BEHIND_BATCH_SIZE", 50),
+    flush_interval=getattr(settings, "CHAT_WRITE_BEHIND_FLUSH_INTERVAL", 0.5),
+)
+
+# Run by daphne's reactor shutdown (see delivery.install_reactor_shutdown_trigger)
+shutdown_hooks.append(chat_message_buffer.flush_all)
@@ -4,6 +4,7 @@ import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
+from events.delivery import install_reactor_shutdown_trigger, lifespan
 from events.routing import websocket_urlpatterns
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eventsphere.settings")
@@ -12,5 +13,9 @@ application = ProtocolTypeRouter(
     {
         "http": get_asgi_application(),
         "websocket": AuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+        "lifespan": lifespan,
     }
 )
+
+# Daphne never sends the lifespan scope above, so drain on its reactor's shutdown
+install_reactor_shutdown_trigger()
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import os
 import sys
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -69,6 +70,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "events.roles.RoleMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -110,6 +112,61 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared cache so invalidations reach every app server process
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://35.95.70.66:6379/1",
+    }
+}
+
+# Max chat notification fan-out jobs buffered in-process before senders wait
+NOTIFICATION_QUEUE_SIZE = 1000
+
+# Buffer chat messages in-process and write them in batches (per room) once
+# CHAT_WRITE_BEHIND_BATCH_SIZE messages are pending or after
+# CHAT_WRITE_BEHIND_FLUSH_INTERVAL seconds
+CHAT_WRITE_BEHIND = False
+CHAT_WRITE_BEHIND_BATCH_SIZE = 50
+CHAT_WRITE_BEHIND_FLUSH_INTERVAL = 0.5
+
+# Chat flood control: each user gets a token bucket per room, refilled at
+# the given messages per second up to a burst, by role ("member", "creator"
+# for the room's host, "admin"). CHAT_ROOM_RATE_LIMITS overrides them per
+# room id, e.g. {42: {"member": (0.2, 2)}}; a rate of None lifts the limit.
+# events.throttling.RedisRateLimiter shares the buckets across servers
+CHAT_RATE_LIMITS = {"member": (1.0, 5), "creator": (5.0, 20), "admin": (5.0, 20)}
+CHAT_ROOM_RATE_LIMITS = {}
+CHAT_RATE_LIMITER = "events.throttling.LocalRateLimiter"
+
+# Server-side geocoding provider and the size of its database-backed cache
+GEOCODER = "events.geocoding.NominatimGeocoder"
+GEOCODER_USER_AGENT = "EventSphere/1.0 (support@eventsphere.com)"
+GEOCODE_CACHE_MAX_ENTRIES = 10000
+
+# Ticket QR codes missing from the cache are rendered on QR_WORKERS threads;
+# requests wait up to QR_WAIT_SECONDS before telling the client to retry
+QR_WORKERS = 2
+QR_WAIT_SECONDS = 2
+
+# Where event images and their generated variants are stored, and the
+# threads that generate the variants after an upload (0 runs them inline)
+IMAGE_STORE = "events.images.S3ImageStore"
+IMAGE_BUCKET = "eventsphere-images"
+IMAGE_WORKERS = 2
+# Largest image browsers may upload straight to storage
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+# Processes rendering creator badge exports; None uses one per CPU
+BADGE_WORKERS = None
+
+# Outbox delivery by the send_queued_mail worker: messages sent per batch,
+# attempts before giving up, and the first retry delay in seconds (doubled
+# after every further failure)
+MAIL_BATCH_SIZE = 50
+MAIL_MAX_ATTEMPTS = 5
+MAIL_RETRY_DELAY = 60
+
 # WSGI Application
 WSGI_APPLICATION = "eventsphere.wsgi.application"
 
@@ -175,3 +232,8 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10 MB
 if "test" in sys.argv:
     DATABASES["default"] = {"ENGINE": "django.db.backends.sqlite3"}
     CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    GEOCODER = "events.geocoding.StaticGeocoder"
+    IMAGE_STORE = "events.images.LocalImageStore"
+    IMAGE_STORE_ROOT = os.path.join(tempfile.gettempdir(), "eventsphere-test-images")
+    IMAGE_WORKERS = 0
@@ -4,6 +4,8 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from events.images import LocalImageStore, get_image_store
+
 urlpatterns = [
     path("", include("events.urls")),
     path("admin/", admin.site.urls),
@@ -12,3 +14,8 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+    # Serve event images during development when they are kept locally
+    image_store = get_image_store()
+    if isinstance(image_store, LocalImageStore):
+        urlpatterns += static(image_store.base_url, document_root=image_store.root)
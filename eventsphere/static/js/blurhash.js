@@ -0,0 +1,81 @@
+// Paints the blurhash placeholder of every [data-blurhash] image as its
+// background, so cards show the image's colors while the image loads.
+(function () {
+    const BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~";
+    const SIZE = 32;
+
+    function decode83(str) {
+        let value = 0;
+        for (const c of str) {
+            value = value * 83 + BASE83.indexOf(c);
+        }
+        return value;
+    }
+
+    function srgbToLinear(value) {
+        const v = value / 255;
+        return v <= 0.04045 ? v / 12.92 : Math.pow((v + 0.055) / 1.055, 2.4);
+    }
+
+    function linearToSrgb(value) {
+        const v = Math.max(0, Math.min(1, value));
+        return v <= 0.0031308
+            ? Math.round(v * 12.92 * 255)
+            : Math.round((1.055 * Math.pow(v, 1 / 2.4) - 0.055) * 255);
+    }
+
+    function signPow(value, exponent) {
+        return Math.sign(value) * Math.pow(Math.abs(value), exponent);
+    }
+
+    function decode(hash, width, height) {
+        const size = decode83(hash[0]);
+        const nx = (size % 9) + 1;
+        const ny = Math.floor(size / 9) + 1;
+        const maxValue = (decode83(hash[1]) + 1) / 166;
+
+        const dc = decode83(hash.substring(2, 6));
+        const colors = [[srgbToLinear(dc >> 16), srgbToLinear((dc >> 8) & 255), srgbToLinear(dc & 255)]];
+        for (let i = 1; i < nx * ny; i++) {
+            const value = decode83(hash.substring(4 + i * 2, 6 + i * 2));
+            colors.push([
+                signPow((Math.floor(value / 361) - 9) / 9, 2) * maxValue,
+                signPow((Math.floor(value / 19) % 19 - 9) / 9, 2) * maxValue,
+                signPow((value % 19 - 9) / 9, 2) * maxValue,
+            ]);
+        }
+
+        const pixels = new Uint8ClampedArray(width * height * 4);
+        for (let y = 0; y < height; y++) {
+            for (let x = 0; x < width; x++) {
+                let r = 0, g = 0, b = 0;
+                for (let j = 0; j < ny; j++) {
+                    for (let i = 0; i < nx; i++) {
+                        const basis = Math.cos(Math.PI * x * i / width) * Math.cos(Math.PI * y * j / height);
+                        const color = colors[i + j * nx];
+                        r += color[0] * basis;
+                        g += color[1] * basis;
+                        b += color[2] * basis;
+                    }
+                }
+                const offset = 4 * (x + y * width);
+                pixels[offset] = linearToSrgb(r);
+                pixels[offset + 1] = linearToSrgb(g);
+                pixels[offset + 2] = linearToSrgb(b);
+                pixels[offset + 3] = 255;
+            }
+        }
+        return pixels;
+    }
+
+    document.querySelectorAll("[data-blurhash]").forEach((element) => {
+        const canvas = document.createElement("canvas");
+        canvas.width = canvas.height = SIZE;
+        const context = canvas.getContext("2d");
+        const imageData = context.createImageData(SIZE, SIZE);
+        imageData.data.set(decode(element.dataset.blurhash, SIZE, SIZE));
+        context.putImageData(imageData, 0, 0);
+        element.style.backgroundImage = `url(${canvas.toDataURL()})`;
+        element.style.backgroundSize = "cover";
+    });
+})();
@@ -0,0 +1,64 @@
+// Uploads the chosen event image straight to storage as soon as it is
+// picked, then posts only the stored object's key with the form. Browsers
+// without SubtleCrypto, or a failed upload, fall back to posting the file.
+(function () {
+    const input = document.getElementById("id_image");
+    const keyField = document.getElementById("id_image_key");
+    if (!input || !keyField || !window.crypto || !window.crypto.subtle) {
+        return;
+    }
+    const form = input.form;
+    const csrfToken = form.querySelector("[name=csrfmiddlewaretoken]").value;
+    let pendingUpload = null;
+
+    async function sha256Hex(file) {
+        const digest = await crypto.subtle.digest("SHA-256", await file.arrayBuffer());
+        return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("");
+    }
+
+    async function uploadImage(file) {
+        const response = await fetch(form.dataset.uploadUrl, {
+            method: "POST",
+            headers: { "X-CSRFToken": csrfToken },
+            body: new URLSearchParams({
+                sha256: await sha256Hex(file),
+                content_type: file.type,
+                size: file.size,
+            }),
+        });
+        const upload = await response.json();
+        if (!response.ok) {
+            throw new Error(upload.error || "Upload was refused");
+        }
+        if (!upload.exists) {
+            const body = new FormData();
+            Object.entries(upload.fields).forEach(([name, value]) => body.append(name, value));
+            body.append("file", file); // storage expects the file last
+            const stored = await fetch(upload.url, { method: "POST", body });
+            if (!stored.ok) {
+                throw new Error(`Upload failed with status ${stored.status}`);
+            }
+        }
+        return upload.key;
+    }
+
+    input.addEventListener("change", () => {
+        keyField.value = "";
+        pendingUpload = input.files.length ? uploadImage(input.files[0]) : null;
+    });
+
+    form.addEventListener("submit", async (event) => {
+        if (!pendingUpload) {
+            return;
+        }
+        event.preventDefault();
+        try {
+            keyField.value = await pendingUpload;
+            input.value = ""; // already stored; don't send the bytes again
+        } catch (error) {
+            console.error("Direct upload failed, posting the file instead:", error);
+        }
+        pendingUpload = null;
+        form.submit();
+    });
+})();